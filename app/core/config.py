@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 
 SECRET_KEY = (
@@ -9,3 +10,75 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 hora
 
 def get_access_token_expires() -> timedelta:
     return timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+def _env_int(nome: str, padrao: int) -> int:
+    valor = os.getenv(nome)
+    return int(valor) if valor else padrao
+
+
+# Banco de dados (perfil do SQLite aplicado em cada nova conexão)
+DATABASE_URL = os.getenv("VIDA_PLUS_DATABASE_URL", "sqlite:///./vida_plus.db")
+SQLITE_JOURNAL_MODE = os.getenv("VIDA_PLUS_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("VIDA_PLUS_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = _env_int("VIDA_PLUS_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+# Negativo = tamanho em KiB (padrão: 64 MiB por conexão)
+SQLITE_CACHE_SIZE = _env_int("VIDA_PLUS_SQLITE_CACHE_SIZE", -64_000)
+SQLITE_BUSY_TIMEOUT_MS = _env_int("VIDA_PLUS_SQLITE_BUSY_TIMEOUT_MS", 5_000)
+# Pool de conexões somente leitura usado pelas rotas GET
+SQLITE_POOL_LEITURA = _env_int("VIDA_PLUS_SQLITE_POOL_LEITURA", 8)
+# "async": rotas usam AsyncSession (aiosqlite); "sync": Session síncrona no threadpool
+DB_MODO = os.getenv("VIDA_PLUS_DB_MODO", "async").lower()
+# Esquema: a inicialização só confere a versão gravada no banco; as migrações
+# rodam à parte (python -m app.migracoes). 1 = aplicar as pendentes ao iniciar
+# (desenvolvimento, instância única)
+MIGRAR_AO_INICIAR = _env_int("VIDA_PLUS_MIGRAR_AO_INICIAR", 0)
+
+
+# Perfil de SQL: instruções acima do limite vão para o log com o plano de
+# execução (0 desativa). O trace por requisição exige o cabeçalho
+# X-Debug-SQL com este token; sem token configurado, o trace fica desligado.
+SQL_LENTA_MS = _env_int("VIDA_PLUS_SQL_LENTA_MS", 200)
+SQL_TRACE_TOKEN = os.getenv("VIDA_PLUS_SQL_TRACE_TOKEN")
+SQL_PLANOS_CACHE = 1_000
+
+
+# Auditoria (logs_sistema): fila em memória drenada em lotes por uma thread
+AUDITORIA_TAMANHO_FILA = 10_000
+AUDITORIA_TAMANHO_LOTE = 500
+AUDITORIA_INTERVALO_FLUSH_SEGUNDOS = 1.0
+
+# Retenção de logs_sistema: registros mais antigos que LOGS_RETENCAO_DIAS são
+# movidos para arquivos NDJSON gzip por mês em LOGS_ARQUIVO_DIR (0 desativa)
+LOGS_RETENCAO_DIAS = _env_int("VIDA_PLUS_LOGS_RETENCAO_DIAS", 90)
+LOGS_ARQUIVO_DIR = os.getenv("VIDA_PLUS_LOGS_ARQUIVO_DIR", "./arquivo_logs")
+LOGS_ARQUIVAMENTO_INTERVALO_SEGUNDOS = _env_int("VIDA_PLUS_LOGS_ARQUIVAMENTO_INTERVALO_SEGUNDOS", 3600)
+# Registros por lote: cada lote é removido em uma transação curta
+LOGS_ARQUIVAMENTO_LOTE = _env_int("VIDA_PLUS_LOGS_ARQUIVAMENTO_LOTE", 1_000)
+
+# Cache de usuários autenticados em get_current_user
+PRINCIPAIS_CACHE_CAPACIDADE = 10_000
+PRINCIPAIS_CACHE_TTL_SEGUNDOS = 300
+
+# Diretório em memória de unidades e profissionais: recarga completa após o TTL,
+# para limitar a defasagem quando outro processo (worker) grava
+DIRETORIO_TTL_SEGUNDOS = _env_int("VIDA_PLUS_DIRETORIO_TTL_SEGUNDOS", 300)
+
+# Pool de processos para hash/verificação de senhas (pbkdf2)
+HASH_PROCESSOS = _env_int("VIDA_PLUS_HASH_PROCESSOS", max(1, (os.cpu_count() or 2) // 2))
+# Máximo de operações de hash em execução ou aguardando; acima disso responde 503
+HASH_FILA_MAXIMA = HASH_PROCESSOS * 8
+# Lotes de importação simultâneos no pool: um processo fica livre para logins
+# (com um único processo, a importação divide a fila com eles)
+HASH_IMPORTACAO_LOTES = max(1, HASH_PROCESSOS - 1)
+
+# Importação em lote de pacientes
+PACIENTES_BULK_MAX_LINHAS = 50_000
+# Tamanho máximo do corpo (Content-Length conferido antes da leitura)
+PACIENTES_BULK_MAX_BYTES = _env_int("VIDA_PLUS_PACIENTES_BULK_MAX_BYTES", 64 * 1024 * 1024)
+
+# Grade de horários usada na busca de disponibilidade da agenda
+AGENDA_INICIO_EXPEDIENTE_HORA = 7
+AGENDA_FIM_EXPEDIENTE_HORA = 19
+AGENDA_SLOT_MINUTOS = 30
+AGENDA_JANELA_MAXIMA_DIAS = 90
@@ -1,13 +1,31 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
-from .config import SECRET_KEY, ALGORITHM
+from .config import (
+    SECRET_KEY,
+    ALGORITHM,
+    HASH_FILA_MAXIMA,
+    HASH_IMPORTACAO_LOTES,
+    HASH_PROCESSOS,
+)
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+_hash_vagas = threading.BoundedSemaphore(HASH_FILA_MAXIMA)
+# Compartilhado por todas as importações do processo (não por chamada);
+# criado no event loop que o usa (ver _vagas_importacao)
+_importacao_vagas: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -17,6 +35,97 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _obter_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # "spawn" evita herdar, via fork, threads e locks do processo da API
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=HASH_PROCESSOS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool
+
+
+def encerrar_hash_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True, cancel_futures=True)
+            _hash_pool = None
+
+
+async def _executar_no_hash_pool(funcao, *args):
+    """
+    Executa ``funcao`` no pool de processos de hash.
+
+    Controle de admissão: se já houver ``HASH_FILA_MAXIMA`` operações em
+    andamento, responde 503 na hora em vez de enfileirar e atrasar as
+    demais rotas.
+    """
+    if not _hash_vagas.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de autenticação sobrecarregado. Tente novamente.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_obter_hash_pool(), funcao, *args)
+    finally:
+        _hash_vagas.release()
+
+
+def _vagas_importacao() -> asyncio.Semaphore:
+    global _importacao_vagas
+    loop = asyncio.get_running_loop()
+    if _importacao_vagas is None or _importacao_vagas[0] is not loop:
+        _importacao_vagas = (loop, asyncio.Semaphore(HASH_IMPORTACAO_LOTES))
+    return _importacao_vagas[1]
+
+
+def _hash_lote(senhas: list[str]) -> list[str]:
+    return [get_password_hash(s) for s in senhas]
+
+
+async def get_password_hashes_async(senhas: list[str], tamanho_lote: int = 64) -> list[str]:
+    """
+    Gera os hashes de muitas senhas em paralelo, em lotes de ``tamanho_lote``.
+
+    No máximo ``HASH_IMPORTACAO_LOTES`` lotes (somando todas as importações
+    em curso) ocupam o pool ao mesmo tempo, deixando processos livres para
+    logins. Cada lote conta como uma operação em ``_hash_vagas``: com a fila
+    cheia, a importação responde 503 antes de gravar qualquer registro. Se
+    um lote falhar (503 incluso), os que ainda não chegaram ao pool são
+    cancelados.
+    """
+    vagas = _vagas_importacao()
+
+    async def _processar(lote: list[str]) -> list[str]:
+        async with vagas:
+            return await _executar_no_hash_pool(_hash_lote, lote)
+
+    lotes = [senhas[i:i + tamanho_lote] for i in range(0, len(senhas), tamanho_lote)]
+    tarefas = [asyncio.ensure_future(_processar(lote)) for lote in lotes]
+    try:
+        resultados = await asyncio.gather(*tarefas)
+    except BaseException:
+        # 503 em um lote (ou requisição cancelada): os demais não seguem no pool
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        raise
+    return [h for lote in resultados for h in lote]
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _executar_no_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _executar_no_hash_pool(get_password_hash, password)
+
+
 def create_access_token(
     data: dict,
     expires_delta: Optional[timedelta] = None,
@@ -0,0 +1,21 @@
+import unicodedata
+
+
+def normalizar_busca(texto: str) -> str:
+    """
+    Forma de comparação usada nas buscas por nome: sem acentos, em
+    minúsculas (casefold) e com espaços internos colapsados.
+    "  José  da SILVA " -> "jose da silva".
+    """
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def limite_prefixo(prefixo: str) -> str:
+    """
+    Menor string maior que todas as que começam com ``prefixo``: a busca
+    por prefixo vira o intervalo ``[prefixo, limite)``, que usa o índice
+    (LIKE 'x%' não usa, pois no SQLite o LIKE ignora caixa).
+    """
+    return prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
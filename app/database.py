@@ -1,13 +1,174 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import CursorResult, Engine, FrozenResult, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import (
+    DATABASE_URL,
+    DB_MODO,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_POOL_LEITURA,
+    SQLITE_SYNCHRONOUS,
+)
+
+if DB_MODO not in ("async", "sync"):
+    raise RuntimeError(f"VIDA_PLUS_DB_MODO inválido: {DB_MODO!r} (use 'async' ou 'sync').")
+
+
+def _aplicar_perfil_sqlite(engine: Engine, somente_leitura: bool = False) -> None:
+    """
+    Aplica os PRAGMAs do perfil em cada nova conexão do pool.
+
+    Em WAL, leitores não bloqueiam o escritor (e vice-versa), e
+    synchronous=NORMAL faz fsync só nos checkpoints, não a cada commit.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        if somente_leitura:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
 
-DATABASE_URL = "sqlite:///./vida_plus.db"
 
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} 
+    connect_args={"check_same_thread": False}
 )
+_aplicar_perfil_sqlite(engine)
+
+# Banco em memória não pode ser aberto por um segundo pool: leitura usa a mesma engine
+_em_memoria = engine.dialect.name == "sqlite" and engine.url.database in (None, "", ":memory:")
+
+if _em_memoria:
+    read_engine = engine
+else:
+    read_engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=SQLITE_POOL_LEITURA,
+        max_overflow=SQLITE_POOL_LEITURA,
+    )
+    _aplicar_perfil_sqlite(read_engine, somente_leitura=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
+
+
+class SessaoEmThreadpool:
+    """
+    Subconjunto da API de AsyncSession usado pelas rotas, sobre uma
+    Session síncrona (modo "sync").
+
+    Toda operação que pode ir ao banco roda no threadpool e os resultados
+    voltam já bufferizados, como na AsyncSession; assim as mesmas rotas
+    ``async def`` funcionam nos dois modos.
+    """
+
+    def __init__(self, sessao: Session):
+        self.sync_session = sessao
+
+    async def __aenter__(self) -> "SessaoEmThreadpool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def add(self, instancia) -> None:
+        self.sync_session.add(instancia)
+
+    def expunge(self, instancia) -> None:
+        self.sync_session.expunge(instancia)
+
+    async def execute(self, stmt, params=None, **kwargs):
+        def _executar():
+            resultado = self.sync_session.execute(stmt, params, **kwargs)
+            if isinstance(resultado, CursorResult) and not resultado.returns_rows:
+                return resultado
+            return resultado.freeze()
+
+        resultado = await run_in_threadpool(_executar)
+        return resultado() if isinstance(resultado, FrozenResult) else resultado
+
+    async def scalars(self, stmt, params=None, **kwargs):
+        return (await self.execute(stmt, params, **kwargs)).scalars()
+
+    async def scalar(self, stmt, params=None, **kwargs):
+        return (await self.execute(stmt, params, **kwargs)).scalar()
+
+    async def get(self, entidade, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entidade, ident, **kwargs)
+
+    async def refresh(self, instancia) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instancia)
+
+    async def delete(self, instancia) -> None:
+        await run_in_threadpool(self.sync_session.delete, instancia)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, funcao, *args, **kwargs):
+        return await run_in_threadpool(funcao, self.sync_session, *args, **kwargs)
+
+
+# Banco em memória fica sempre no modo sync: um segundo driver abriria outro banco
+MODO_ASSINCRONO = DB_MODO == "async" and not _em_memoria
+
+if MODO_ASSINCRONO:
+    _url_async = make_url(DATABASE_URL)
+    if _url_async.get_backend_name() == "sqlite":
+        _url_async = _url_async.set(drivername="sqlite+aiosqlite")
+
+    async_engine = create_async_engine(_url_async)
+    _aplicar_perfil_sqlite(async_engine.sync_engine)
+    async_read_engine = create_async_engine(
+        _url_async,
+        pool_size=SQLITE_POOL_LEITURA,
+        max_overflow=SQLITE_POOL_LEITURA,
+    )
+    _aplicar_perfil_sqlite(async_read_engine.sync_engine, somente_leitura=True)
+
+    # Sem expirar no commit: atributos expirados exigiriam I/O implícito fora do await
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    async_engine = async_read_engine = None
+
+    def AsyncSessionLocal() -> SessaoEmThreadpool:
+        return SessaoEmThreadpool(SessionLocal(expire_on_commit=False))
+
+    def AsyncReadSessionLocal() -> SessaoEmThreadpool:
+        return SessaoEmThreadpool(ReadSessionLocal(expire_on_commit=False))
+
+
+async def encerrar_engines_async() -> None:
+    for engine_async in (async_engine, async_read_engine):
+        if engine_async is not None:
+            await engine_async.dispose()
@@ -1,29 +1,39 @@
-from typing import Generator
+from typing import AsyncGenerator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import SessionLocal
+from app.database import AsyncReadSessionLocal, AsyncSessionLocal
 from app.models.user import User
 from app.core.config import SECRET_KEY 
 from app.core.security import ALGORITHM        
+from app.services.auth_cache import cache_principais
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db() -> Generator:
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sessão de escrita: AsyncSession no modo "async" ou uma Session
+    síncrona adaptada (SessaoEmThreadpool) no modo "sync".
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sessão do pool somente leitura, para rotas que não gravam.
+    """
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    db: AsyncSession = Depends(get_read_db),
     token: str = Depends(oauth2_scheme),
 ) -> User:
     """
@@ -43,8 +53,29 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Acerto no cache dispensa a leitura em usuarios
+    user = cache_principais.obter(int(user_id), token)
+    if user is not None:
+        return user
+
+    user = await db.get(User, int(user_id))
     if user is None:
         raise credentials_exception
 
+    # Desanexa da sessão da requisição antes de compartilhar entre requisições
+    db.expunge(user)
+    cache_principais.guardar(user.id, token, user, payload["exp"])
+
     return user
+
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Restringe a rota a usuários do tipo ADMIN.
+    """
+    if current_user.tipo != "ADMIN":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a administradores.",
+        )
+    return current_user
@@ -1,25 +1,62 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.database import Base, engine
+from app.core.config import MIGRAR_AO_INICIAR
+from app.core.security import encerrar_hash_pool
+from app.database import AsyncReadSessionLocal, encerrar_engines_async, engine
+from app.migracoes import migrar, verificar_esquema
 from app.routers import (
     auth_router, 
     patients_router, 
     professionals_router, 
     units_router, 
     consultations_router,
-    medical_records_router
+    medical_records_router,
+    exports_router,
+    sistema_router,
+    agenda_router,
+    estatisticas_router,
+    logs_router,
+    metricas_router,
     )
+from app.services.diretorio import diretorio
+from app.services.arquivo_logs import arquivador_logs
+from app.services.logs import gravador_auditoria
+from app.services.metricas import MiddlewareMetricas, instalar_eventos_sql
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MIGRAR_AO_INICIAR:
+        migrar(engine)
+    # Só lê PRAGMA user_version; banco atrasado impede a subida do worker
+    verificar_esquema(engine)
+    gravador_auditoria.iniciar()
+    arquivador_logs.iniciar()
+    async with AsyncReadSessionLocal() as db:
+        await diretorio.carregar(db)
+    yield
+    arquivador_logs.parar()
+    # Grava o que ainda estiver na fila antes de encerrar o worker
+    gravador_auditoria.parar()
+    encerrar_hash_pool()
+    await encerrar_engines_async()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Vida Plus - SGHSS (Back-end)",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# Server-Timing e histogramas por rota (/metrics)
+instalar_eventos_sql()
+app.add_middleware(MiddlewareMetricas)
+
 
 @app.get("/health", tags=["Sistema"])
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 
@@ -29,4 +66,10 @@ app.include_router(patients_router)
 app.include_router(professionals_router)
 app.include_router(units_router)
 app.include_router(consultations_router)
-app.include_router(medical_records_router)
\ No newline at end of file
+app.include_router(medical_records_router)
+app.include_router(exports_router)
+app.include_router(sistema_router)
+app.include_router(agenda_router)
+app.include_router(estatisticas_router)
+app.include_router(logs_router)
+app.include_router(metricas_router)
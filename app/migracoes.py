@@ -0,0 +1,376 @@
+"""
+Migrações versionadas do esquema do banco.
+
+A versão aplicada fica em ``PRAGMA user_version`` (cabeçalho do arquivo
+do SQLite). A inicialização da aplicação só lê esse número e recusa
+subir com um banco atrasado, em vez de inspecionar todas as tabelas em
+cada worker. As migrações rodam uma vez por deploy, antes dos workers:
+
+    python -m app.migracoes
+    python -m app.migracoes --verificar   # só informa; código 1 se houver pendências
+
+Cada migração roda em uma transação própria (``BEGIN IMMEDIATE``, que
+também serializa execuções simultâneas) junto com a nova versão. Os
+passos são idempotentes: um banco criado pelo antigo ``create_all`` na
+inicialização (versão 0, com parte das colunas e índices já presentes)
+percorre a sequência inteira sem erro.
+
+Alteração de esquema nova = nova função no fim de ``MIGRACOES``; as
+anteriores não mudam.
+"""
+import argparse
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.texto import normalizar_busca
+from app.database import engine
+from app.models.estatistica import reconstruir_estatisticas
+from app.models.medical_record import criar_indice_busca
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Linhas por UPDATE no preenchimento de colunas novas
+_LOTE_PREENCHIMENTO = 5_000
+
+
+@dataclass(frozen=True)
+class Migracao:
+    versao: int
+    descricao: str
+    aplicar: Callable[[Connection], None]
+
+
+def _executar(conexao: Connection, *instrucoes: str) -> None:
+    for instrucao in instrucoes:
+        conexao.exec_driver_sql(instrucao)
+
+
+def _adicionar_coluna(conexao: Connection, tabela: str, coluna: str, definicao: str) -> None:
+    existentes = {linha[1] for linha in conexao.exec_driver_sql(f"PRAGMA table_info({tabela})")}
+    if coluna not in existentes:
+        conexao.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+
+
+def _esquema_inicial(conexao: Connection) -> None:
+    # Tabelas e índices da primeira versão do projeto
+    _executar(
+        conexao,
+        """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER NOT NULL,
+            nome_completo VARCHAR NOT NULL,
+            email VARCHAR NOT NULL,
+            senha_hash VARCHAR NOT NULL,
+            tipo VARCHAR NOT NULL,
+            criado_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+            atualizado_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_id ON usuarios (id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_usuarios_email ON usuarios (email)",
+        """
+        CREATE TABLE IF NOT EXISTS unidades (
+            id INTEGER NOT NULL,
+            nome VARCHAR NOT NULL,
+            tipo_unidade VARCHAR NOT NULL,
+            endereco VARCHAR NOT NULL,
+            telefone VARCHAR NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_unidades_id ON unidades (id)",
+        """
+        CREATE TABLE IF NOT EXISTS pacientes (
+            id INTEGER NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            cpf VARCHAR NOT NULL,
+            data_nascimento DATE NOT NULL,
+            telefone VARCHAR NOT NULL,
+            endereco VARCHAR NOT NULL,
+            plano_saude VARCHAR,
+            numero_carteirinha VARCHAR,
+            PRIMARY KEY (id),
+            UNIQUE (usuario_id),
+            FOREIGN KEY(usuario_id) REFERENCES usuarios (id),
+            UNIQUE (cpf)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_pacientes_id ON pacientes (id)",
+        """
+        CREATE TABLE IF NOT EXISTS profissionais (
+            id INTEGER NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            cpf VARCHAR NOT NULL,
+            registro_conselho VARCHAR NOT NULL,
+            tipo_conselho VARCHAR NOT NULL,
+            especialidade VARCHAR NOT NULL,
+            unidade_id INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (usuario_id),
+            FOREIGN KEY(usuario_id) REFERENCES usuarios (id),
+            UNIQUE (cpf),
+            FOREIGN KEY(unidade_id) REFERENCES unidades (id) ON DELETE RESTRICT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_profissionais_id ON profissionais (id)",
+        """
+        CREATE TABLE IF NOT EXISTS logs_sistema (
+            id INTEGER NOT NULL,
+            usuario_id INTEGER,
+            acao VARCHAR NOT NULL,
+            detalhes TEXT,
+            criado_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id),
+            FOREIGN KEY(usuario_id) REFERENCES usuarios (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_logs_sistema_id ON logs_sistema (id)",
+        """
+        CREATE TABLE IF NOT EXISTS consultas (
+            id INTEGER NOT NULL,
+            paciente_id INTEGER NOT NULL,
+            profissional_id INTEGER NOT NULL,
+            unidade_id INTEGER NOT NULL,
+            data_hora DATETIME NOT NULL,
+            tipo_atendimento VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            observacoes TEXT,
+            criada_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+            atualizada_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id),
+            FOREIGN KEY(paciente_id) REFERENCES pacientes (id),
+            FOREIGN KEY(profissional_id) REFERENCES profissionais (id),
+            FOREIGN KEY(unidade_id) REFERENCES unidades (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_consultas_id ON consultas (id)",
+        """
+        CREATE TABLE IF NOT EXISTS prontuarios (
+            id INTEGER NOT NULL,
+            paciente_id INTEGER NOT NULL,
+            profissional_id INTEGER NOT NULL,
+            consulta_id INTEGER,
+            data_registro DATETIME DEFAULT CURRENT_TIMESTAMP,
+            descricao TEXT NOT NULL,
+            tipo_registro VARCHAR NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(paciente_id) REFERENCES pacientes (id),
+            FOREIGN KEY(profissional_id) REFERENCES profissionais (id),
+            FOREIGN KEY(consulta_id) REFERENCES consultas (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_prontuarios_id ON prontuarios (id)",
+    )
+
+
+def _indices_paginacao(conexao: Connection) -> None:
+    _executar(
+        conexao,
+        "CREATE INDEX IF NOT EXISTS ix_consultas_data_hora_id ON consultas (data_hora, id)",
+        "CREATE INDEX IF NOT EXISTS ix_consultas_paciente_data_hora ON consultas (paciente_id, data_hora, id)",
+        "CREATE INDEX IF NOT EXISTS ix_consultas_profissional_data_hora ON consultas (profissional_id, data_hora, id)",
+        "CREATE INDEX IF NOT EXISTS ix_prontuarios_paciente_data_registro ON prontuarios (paciente_id, data_registro, id)",
+        "CREATE INDEX IF NOT EXISTS ix_prontuarios_data_registro_id ON prontuarios (data_registro, id)",
+    )
+
+
+def _duracao_consultas(conexao: Connection) -> None:
+    _adicionar_coluna(conexao, "consultas", "duracao_minutos", "INTEGER NOT NULL DEFAULT 30")
+
+
+def _versoes_etag(conexao: Connection) -> None:
+    for tabela, coluna in (
+        ("usuarios", "versao"),
+        ("pacientes", "versao"),
+        ("prontuarios", "versao"),
+        ("profissionais", "agenda_versao"),
+    ):
+        _adicionar_coluna(conexao, tabela, coluna, "INTEGER NOT NULL DEFAULT 1")
+
+
+def _busca_prontuarios(conexao: Connection) -> None:
+    # Cria a tabela FTS5 e os gatilhos e indexa os prontuários existentes
+    criar_indice_busca(conexao)
+
+
+def _busca_pacientes(conexao: Connection) -> None:
+    _adicionar_coluna(conexao, "usuarios", "nome_busca", "VARCHAR")
+    usuarios = User.__table__
+    # A normalização (sem acentos) não existe em SQL: preenche em Python, em lotes
+    while True:
+        pendentes = conexao.execute(
+            select(usuarios.c.id, usuarios.c.nome_completo)
+            .where(usuarios.c.nome_busca.is_(None))
+            .limit(_LOTE_PREENCHIMENTO)
+        ).all()
+        if not pendentes:
+            break
+        for usuario_id, nome in pendentes:
+            conexao.execute(
+                update(usuarios)
+                .where(usuarios.c.id == usuario_id)
+                .values(nome_busca=normalizar_busca(nome))
+            )
+    _executar(
+        conexao,
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_nome_busca ON usuarios (nome_busca, id)",
+        "CREATE INDEX IF NOT EXISTS ix_pacientes_numero_carteirinha ON pacientes (numero_carteirinha)",
+    )
+
+
+def _estatisticas_consultas(conexao: Connection) -> None:
+    _executar(
+        conexao,
+        """
+        CREATE TABLE IF NOT EXISTS estatisticas_consultas (
+            dia DATE NOT NULL,
+            unidade_id INTEGER NOT NULL,
+            profissional_id INTEGER NOT NULL,
+            status VARCHAR NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (dia, unidade_id, profissional_id, status)
+        )
+        """,
+    )
+    reconstruir_estatisticas(conexao)
+
+
+def _indices_logs(conexao: Connection) -> None:
+    _executar(
+        conexao,
+        "CREATE INDEX IF NOT EXISTS ix_logs_sistema_criado_em_id ON logs_sistema (criado_em, id)",
+        "CREATE INDEX IF NOT EXISTS ix_logs_sistema_usuario_criado_em ON logs_sistema (usuario_id, criado_em, id)",
+        "CREATE INDEX IF NOT EXISTS ix_logs_sistema_acao_criado_em ON logs_sistema (acao, criado_em, id)",
+    )
+
+
+def _normalizar_datas(conexao: Connection, tabela: str, coluna: str) -> None:
+    # CURRENT_TIMESTAMP (server_default) grava 'AAAA-MM-DD HH:MM:SS'; o
+    # SQLAlchemy grava e compara com '.ffffff'. Como a comparação é textual,
+    # linhas no formato curto não batem com o cursor de paginação nem com
+    # os limites de período. Os gatilhos corrigem o que ainda for gravado
+    # pelo default do banco (inserções sem a coluna, fora do ORM).
+    _executar(
+        conexao,
+        f"UPDATE {tabela} SET {coluna} = {coluna} || '.000000' WHERE length({coluna}) = 19",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {tabela}_{coluna}_ai AFTER INSERT ON {tabela}
+        WHEN length(new.{coluna}) = 19 BEGIN
+            UPDATE {tabela} SET {coluna} = new.{coluna} || '.000000' WHERE id = new.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {tabela}_{coluna}_au AFTER UPDATE OF {coluna} ON {tabela}
+        WHEN length(new.{coluna}) = 19 BEGIN
+            UPDATE {tabela} SET {coluna} = new.{coluna} || '.000000' WHERE id = new.id;
+        END
+        """,
+    )
+
+
+def _datas_com_microssegundos(conexao: Connection) -> None:
+    for tabela, coluna in (("prontuarios", "data_registro"), ("logs_sistema", "criado_em")):
+        _normalizar_datas(conexao, tabela, coluna)
+
+
+def _cadastro_usuarios_com_microssegundos(conexao: Connection) -> None:
+    # Filtro de período da exportação de pacientes
+    _normalizar_datas(conexao, "usuarios", "criado_em")
+
+
+MIGRACOES = (
+    Migracao(1, "esquema inicial", _esquema_inicial),
+    Migracao(2, "índices de paginação de consultas e prontuários", _indices_paginacao),
+    Migracao(3, "duração das consultas", _duracao_consultas),
+    Migracao(4, "versões de linha (ETag)", _versoes_etag),
+    Migracao(5, "busca de texto completo em prontuários", _busca_prontuarios),
+    Migracao(6, "busca de pacientes por nome e carteirinha", _busca_pacientes),
+    Migracao(7, "estatísticas de consultas", _estatisticas_consultas),
+    Migracao(8, "índices de consulta de logs_sistema", _indices_logs),
+    Migracao(9, "datas no formato com microssegundos", _datas_com_microssegundos),
+    Migracao(10, "data de cadastro de usuários com microssegundos", _cadastro_usuarios_com_microssegundos),
+)
+
+VERSAO_ESQUEMA = MIGRACOES[-1].versao
+
+
+def versao_banco(conexao: Connection) -> int:
+    return conexao.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrar(destino: Engine = engine) -> list[Migracao]:
+    """
+    Aplica as migrações pendentes, uma transação por migração. Retorna
+    as que foram aplicadas.
+    """
+    aplicadas = []
+    for migracao in MIGRACOES:
+        with destino.begin() as conexao:
+            # Trava de escrita já no início: outra execução simultânea
+            # espera e, ao entrar, encontra a versão nova e pula
+            conexao.exec_driver_sql("BEGIN IMMEDIATE")
+            if versao_banco(conexao) >= migracao.versao:
+                continue
+            inicio = time.perf_counter()
+            migracao.aplicar(conexao)
+            conexao.exec_driver_sql(f"PRAGMA user_version = {migracao.versao}")
+        logger.info(
+            "Migração %d aplicada (%s) em %.2fs",
+            migracao.versao,
+            migracao.descricao,
+            time.perf_counter() - inicio,
+        )
+        aplicadas.append(migracao)
+    return aplicadas
+
+
+def verificar_esquema(destino: Engine = engine) -> None:
+    """
+    Checagem da inicialização: só lê a versão gravada no banco.
+    """
+    with destino.connect() as conexao:
+        versao = versao_banco(conexao)
+    if versao < VERSAO_ESQUEMA:
+        raise RuntimeError(
+            f"Esquema do banco na versão {versao}; esta versão da aplicação requer "
+            f"{VERSAO_ESQUEMA}. Execute: python -m app.migracoes"
+        )
+    if versao > VERSAO_ESQUEMA:
+        # Banco já migrado por uma versão mais nova (deploy em andamento)
+        logger.warning(
+            "Esquema do banco na versão %d, mais nova que a %d desta aplicação.",
+            versao,
+            VERSAO_ESQUEMA,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aplica as migrações pendentes do esquema.")
+    parser.add_argument(
+        "--verificar",
+        action="store_true",
+        help="Só informa a versão do banco e as migrações pendentes",
+    )
+    args = parser.parse_args()
+
+    with engine.connect() as _conexao:
+        atual = versao_banco(_conexao)
+    pendentes = [m for m in MIGRACOES if m.versao > atual]
+    if args.verificar:
+        print(f"Banco na versão {atual}; aplicação na versão {VERSAO_ESQUEMA}.")
+        for m in pendentes:
+            print(f"  pendente: {m.versao} - {m.descricao}")
+        sys.exit(1 if pendentes else 0)
+
+    inicio = time.perf_counter()
+    for m in migrar():
+        print(f"{m.versao} - {m.descricao}")
+    print(f"Esquema na versão {VERSAO_ESQUEMA} em {time.perf_counter() - inicio:.2f}s")
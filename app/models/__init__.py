@@ -4,4 +4,6 @@ from .professional import Profissional
 from .unit import Unidade
 from .consultation import Consulta
 from .medical_record import Prontuario 
-from .log import LogSistema
\ No newline at end of file
+from .log import LogSistema
+from .estatistica import EstatisticaConsulta
+from . import versionamento  # noqa: F401  (registra os eventos de versão)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,6 +7,13 @@ from app.database import Base
 
 class Consulta(Base):
     __tablename__ = "consultas"
+    __table_args__ = (
+        # Índices das chaves de paginação (data_hora, id)
+        Index("ix_consultas_data_hora_id", "data_hora", "id"),
+        Index("ix_consultas_paciente_data_hora", "paciente_id", "data_hora", "id"),
+        # Também atende a verificação de conflitos de agenda do profissional
+        Index("ix_consultas_profissional_data_hora", "profissional_id", "data_hora", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -15,6 +22,7 @@ class Consulta(Base):
     unidade_id = Column(Integer, ForeignKey("unidades.id"), nullable=False)
 
     data_hora = Column(DateTime, nullable=False)
+    duracao_minutos = Column(Integer, nullable=False, default=30, server_default="30")
     tipo_atendimento = Column(String, nullable=False)  # "PRESENCIAL" ou "TELEMEDICINA"
     status = Column(String, nullable=False, default="AGENDADA")
     observacoes = Column(Text, nullable=True)
@@ -0,0 +1,119 @@
+"""
+Contagem de consultas por dia, unidade, profissional e status.
+
+Mantida pelos eventos do mapper de Consulta, na mesma transação da
+gravação: criar, remarcar, trocar de profissional/unidade ou mudar o
+status só move uma unidade de contagem entre duas linhas. Cargas via
+Core (benchmarks, restauração de backup) não disparam os eventos; depois
+delas, reconstrua a tabela:
+
+    python -m app.services.estatisticas
+"""
+from sqlalchemy import Column, Date, Integer, String, event, func, inspect, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from app.database import Base
+
+from .consultation import Consulta
+
+
+class EstatisticaConsulta(Base):
+    __tablename__ = "estatisticas_consultas"
+
+    # A chave começa pelo dia: os relatórios sempre filtram por período
+    dia = Column(Date, primary_key=True)
+    unidade_id = Column(Integer, primary_key=True)
+    profissional_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+_tabela = EstatisticaConsulta.__table__
+
+
+def _chave(data_hora, unidade_id, profissional_id, status) -> dict:
+    return {
+        "dia": data_hora.date(),
+        "unidade_id": unidade_id,
+        "profissional_id": profissional_id,
+        "status": status,
+    }
+
+
+def _somar(connection, chave: dict, delta: int) -> None:
+    if delta > 0:
+        connection.execute(
+            insert(_tabela)
+            .values(**chave, total=delta)
+            .on_conflict_do_update(
+                index_elements=list(chave),
+                set_={"total": _tabela.c.total + delta},
+            )
+        )
+    else:
+        connection.execute(
+            update(_tabela)
+            .where(*(_tabela.c[k] == v for k, v in chave.items()))
+            .values(total=_tabela.c.total + delta)
+        )
+
+
+_CAMPOS_CHAVE = ("data_hora", "unidade_id", "profissional_id", "status")
+
+
+@event.listens_for(Consulta, "after_insert")
+def _consulta_criada(mapper, connection, target) -> None:
+    _somar(connection, _chave(*(getattr(target, c) for c in _CAMPOS_CHAVE)), 1)
+
+
+@event.listens_for(Consulta, "after_delete")
+def _consulta_removida(mapper, connection, target) -> None:
+    _somar(connection, _chave(*(getattr(target, c) for c in _CAMPOS_CHAVE)), -1)
+
+
+@event.listens_for(Consulta, "after_update")
+def _consulta_atualizada(mapper, connection, target) -> None:
+    estado = inspect(target)
+    antes = []
+    mudou = False
+    for campo in _CAMPOS_CHAVE:
+        historico = estado.attrs[campo].history
+        if historico.deleted:
+            mudou = True
+            antes.append(historico.deleted[0])
+        else:
+            antes.append(getattr(target, campo))
+    if not mudou:
+        return
+    anterior = _chave(*antes)
+    atual = _chave(*(getattr(target, c) for c in _CAMPOS_CHAVE))
+    if anterior != atual:
+        _somar(connection, anterior, -1)
+        _somar(connection, atual, 1)
+
+
+def reconstruir_estatisticas(conexao) -> int:
+    """
+    Recalcula a tabela inteira a partir de consultas. Retorna o número
+    de linhas agregadas.
+    """
+    consultas = Consulta.__table__
+    conexao.execute(_tabela.delete())
+    conexao.execute(
+        _tabela.insert().from_select(
+            ["dia", "unidade_id", "profissional_id", "status", "total"],
+            select(
+                func.date(consultas.c.data_hora),
+                consultas.c.unidade_id,
+                consultas.c.profissional_id,
+                consultas.c.status,
+                func.count(),
+            ).group_by(
+                func.date(consultas.c.data_hora),
+                consultas.c.unidade_id,
+                consultas.c.profissional_id,
+                consultas.c.status,
+            ),
+        )
+    )
+    return conexao.execute(select(func.count()).select_from(_tabela)).scalar()
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,6 +9,13 @@ from app.database import Base
 
 class LogSistema(Base):
     __tablename__ = "logs_sistema"
+    __table_args__ = (
+        # Seleção dos registros vencidos pelo arquivamento, em ordem
+        Index("ix_logs_sistema_criado_em_id", "criado_em", "id"),
+        # Consultas de auditoria por usuário ou por ação em um período
+        Index("ix_logs_sistema_usuario_criado_em", "usuario_id", "criado_em", "id"),
+        Index("ix_logs_sistema_acao_criado_em", "acao", "criado_em", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -15,6 +24,8 @@ class LogSistema(Base):
 
     acao = Column(String, nullable=False)       # Ex.: "LOGIN_SUCESSO", "CRIAR_CONSULTA"
     detalhes = Column(Text, nullable=True)      # JSON/Texto livre com contexto
-    criado_em = Column(DateTime(timezone=True), server_default=func.now())
+    # Mesmo formato (com microssegundos) dos parâmetros do cursor e dos
+    # filtros de período; ver _datas_com_microssegundos em app/migracoes.py
+    criado_em = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
 
     usuario = relationship("User", backref="logs")
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,6 +9,10 @@ from app.database import Base
 
 class Prontuario(Base):
     __tablename__ = "prontuarios"
+    __table_args__ = (
+        Index("ix_prontuarios_paciente_data_registro", "paciente_id", "data_registro", "id"),
+        Index("ix_prontuarios_data_registro_id", "data_registro", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -14,10 +20,71 @@ class Prontuario(Base):
     profissional_id = Column(Integer, ForeignKey("profissionais.id"), nullable=False)
     consulta_id = Column(Integer, ForeignKey("consultas.id"), nullable=True)
 
-    data_registro = Column(DateTime(timezone=True), server_default=func.now())
+    # O default no lado Python grava o mesmo formato (com microssegundos) usado
+    # nos parâmetros do cursor; CURRENT_TIMESTAMP grava só até os segundos.
+    data_registro = Column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        server_default=func.now(),
+    )
     descricao = Column(Text, nullable=False)
     tipo_registro = Column(String, nullable=False)  # EX: "EVOLUCAO", "PRESCRICAO", "ALTA"
 
+    # Versão da linha (ETag); incrementada a cada UPDATE (ver versionamento.py)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+
     paciente = relationship("Paciente", backref="prontuarios")
     profissional = relationship("Profissional", backref="prontuarios")
     consulta = relationship("Consulta", backref="prontuarios")
+
+
+# Índice de texto completo de prontuarios.descricao (FTS5 com conteúdo
+# externo: guarda só o índice, o texto continua em prontuarios). Os
+# gatilhos mantêm o índice em dia inclusive para inserções via Core.
+DDL_BUSCA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS prontuarios_fts USING fts5(
+        descricao,
+        content='prontuarios',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prontuarios_fts_ai AFTER INSERT ON prontuarios BEGIN
+        INSERT INTO prontuarios_fts(rowid, descricao) VALUES (new.id, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prontuarios_fts_ad AFTER DELETE ON prontuarios BEGIN
+        INSERT INTO prontuarios_fts(prontuarios_fts, rowid, descricao)
+        VALUES ('delete', old.id, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prontuarios_fts_au AFTER UPDATE OF descricao ON prontuarios BEGIN
+        INSERT INTO prontuarios_fts(prontuarios_fts, rowid, descricao)
+        VALUES ('delete', old.id, old.descricao);
+        INSERT INTO prontuarios_fts(rowid, descricao) VALUES (new.id, new.descricao);
+    END
+    """,
+)
+
+
+def criar_indice_busca(conexao) -> bool:
+    """
+    Cria a tabela FTS5 e os gatilhos, se ainda não existirem. Quando a
+    tabela é criada agora sobre dados já existentes, indexa tudo.
+    Retorna True se o índice foi criado.
+    """
+    if conexao.dialect.name != "sqlite":
+        return False
+
+    existia = conexao.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'prontuarios_fts'"
+    ).first()
+    for ddl in DDL_BUSCA:
+        conexao.exec_driver_sql(ddl)
+    if not existia:
+        conexao.exec_driver_sql("INSERT INTO prontuarios_fts(prontuarios_fts) VALUES ('rebuild')")
+    return not existia
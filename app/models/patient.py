@@ -15,6 +15,9 @@ class Paciente(Base):
     telefone = Column(String, nullable=False)
     endereco = Column(String, nullable=False)
     plano_saude = Column(String, nullable=True)
-    numero_carteirinha = Column(String, nullable=True)
+    numero_carteirinha = Column(String, nullable=True, index=True)
+
+    # Versão da linha (ETag); incrementada a cada UPDATE (ver versionamento.py)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
 
     usuario = relationship("User", backref="paciente", uselist=False)
@@ -22,4 +22,7 @@ class Profissional(Base):
         nullable=False,
     )
 
+    # Incrementada a cada gravação em consultas do profissional (ETag da agenda)
+    agenda_versao = Column(Integer, nullable=False, default=1, server_default="1")
+
     unidade = relationship("Unidade", back_populates="profissionais")
\ No newline at end of file
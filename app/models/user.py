@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, event, inspect
 from sqlalchemy.sql import func
 
+from app.core.texto import normalizar_busca
 from app.database import Base
 
 
+def _nome_busca_inicial(context) -> str:
+    # Default por linha: vale também para INSERTs em lote via Core
+    return normalizar_busca(context.get_current_parameters()["nome_completo"])
+
+
 class User(Base):
     __tablename__ = "usuarios"
 
@@ -12,9 +20,28 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     senha_hash = Column(String, nullable=False)
     tipo = Column(String, nullable=False)  # "PACIENTE", "PROFISSIONAL", "ADMIN"
-    criado_em = Column(DateTime(timezone=True), server_default=func.now())
+    # Com microssegundos, como os limites do filtro de período da exportação;
+    # ver _cadastro_usuarios_com_microssegundos em app/migracoes.py
+    criado_em = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     atualizado_em = Column(
         DateTime(timezone=True),
         server_default=func.now(),
         onupdate=func.now()
     )
+    # atualizado_em tem resolução de segundos; a versão distingue
+    # atualizações no mesmo segundo (ETag de PacienteRead)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    # nome_completo normalizado (sem acentos, minúsculo) para a busca por
+    # prefixo; mantido em sincronia com o nome
+    nome_busca = Column(String, nullable=True, default=_nome_busca_inicial)
+
+    __table_args__ = (
+        # (nome_busca, id) cobre o filtro por prefixo e a ordenação
+        Index("ix_usuarios_nome_busca", "nome_busca", "id"),
+    )
+
+
+@event.listens_for(User, "before_update")
+def _atualizar_nome_busca(mapper, connection, target) -> None:
+    if inspect(target).attrs.nome_completo.history.has_changes():
+        target.nome_busca = normalizar_busca(target.nome_completo)
@@ -0,0 +1,46 @@
+"""
+Versões de linha usadas nas ETags.
+
+A versão é incrementada no próprio UPDATE (``versao = versao + 1``),
+então duas gravações concorrentes nunca produzem a mesma versão. Só
+vale para gravações feitas pelo ORM; cargas via Core (benchmarks,
+importação em lote) inserem com a versão inicial.
+"""
+from sqlalchemy import event, inspect, update
+
+from .consultation import Consulta
+from .medical_record import Prontuario
+from .patient import Paciente
+from .professional import Profissional
+from .user import User
+
+
+def _incrementar_versao(mapper, connection, target) -> None:
+    target.versao = mapper.class_.versao + 1
+
+
+for _modelo in (User, Paciente, Prontuario):
+    event.listen(_modelo, "before_update", _incrementar_versao)
+
+
+def _incrementar_agenda(connection, *profissional_ids) -> None:
+    ids = {i for i in profissional_ids if i is not None}
+    if ids:
+        connection.execute(
+            update(Profissional.__table__)
+            .where(Profissional.__table__.c.id.in_(ids))
+            .values(agenda_versao=Profissional.__table__.c.agenda_versao + 1)
+        )
+
+
+@event.listens_for(Consulta, "after_insert")
+@event.listens_for(Consulta, "after_delete")
+def _consulta_gravada(mapper, connection, target) -> None:
+    _incrementar_agenda(connection, target.profissional_id)
+
+
+@event.listens_for(Consulta, "after_update")
+def _consulta_atualizada(mapper, connection, target) -> None:
+    # Troca de profissional muda as duas agendas
+    historico = inspect(target).attrs.profissional_id.history
+    _incrementar_agenda(connection, target.profissional_id, *historico.deleted)
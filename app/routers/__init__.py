@@ -1,6 +1,31 @@
-from .auth import router as auth_router
-from .patients import router as patients_router
-from .professionals import router as professionals_router
-from .units import router as units_router
-from .consultations import router as consultations_router
-from .medical_records import router as medical_records_router
\ No newline at end of file
+"""
+Routers por domínio. Os módulos são importados sob demanda (PEP 562):
+``from app.routers import logs_router`` carrega só ``app.routers.logs``.
+"""
+from importlib import import_module
+
+_MODULOS = {
+    "auth_router": "auth",
+    "patients_router": "patients",
+    "professionals_router": "professionals",
+    "units_router": "units",
+    "consultations_router": "consultations",
+    "medical_records_router": "medical_records",
+    "exports_router": "exports",
+    "sistema_router": "sistema",
+    "agenda_router": "agenda",
+    "estatisticas_router": "estatisticas",
+    "logs_router": "logs",
+    "metricas_router": "metricas",
+}
+
+__all__ = list(_MODULOS)
+
+
+def __getattr__(nome: str):
+    modulo = _MODULOS.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    router = import_module(f".{modulo}", __name__).router
+    globals()[nome] = router
+    return router
@@ -0,0 +1,65 @@
+import heapq
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import AGENDA_JANELA_MAXIMA_DIAS
+from app.deps import get_read_db, get_current_user
+from app.models.user import User
+from app.schemas.agenda import SlotDisponivel
+from app.services.agenda import agendas, local_sem_fuso
+from app.services.diretorio import diretorio
+
+router = APIRouter(prefix="/agenda", tags=["Agenda"])
+
+
+@router.get("/disponibilidade", response_model=list[SlotDisponivel])
+async def buscar_disponibilidade(
+    especialidade: str,
+    unidade_id: int | None = None,
+    de: datetime | None = None,
+    ate: datetime | None = None,
+    limite: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Primeiros horários livres dos profissionais da especialidade (e,
+    opcionalmente, da unidade), em ordem cronológica.
+    """
+    # A grade e data_hora estão em horário local sem fuso
+    de = local_sem_fuso(de) if de else datetime.now()
+    ate = local_sem_fuso(ate) if ate else de + timedelta(days=30)
+    if ate <= de or ate - de > timedelta(days=AGENDA_JANELA_MAXIMA_DIAS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Intervalo inválido (máximo de {AGENDA_JANELA_MAXIMA_DIAS} dias).",
+        )
+
+    profissionais = await diretorio.filtrar_profissionais(db, especialidade, unidade_id)
+    # Uma leitura de agenda_versao para todos: cópias defasadas por outro
+    # worker são recarregadas antes de oferecer horários
+    atualizadas = await agendas.obter_atualizadas(db, [p.id for p in profissionais])
+
+    candidatos = []
+    for profissional in profissionais:
+        agenda = atualizadas.get(profissional.id)
+        if agenda is None:
+            # Removido por outro worker depois da última carga do diretório
+            continue
+        # Leitura sem o lock: as alterações da agenda acontecem no event loop
+        # sem pontos de espera no meio, então o estado visto é sempre consistente
+        livres = agenda.slots_livres(de, ate, limite)
+        candidatos.append(
+            [
+                (inicio, profissional.id, profissional.unidade_id, fim)
+                for inicio, fim in livres
+            ]
+        )
+
+    # Cada lista já vem ordenada; o merge só precisa dos ``limite`` primeiros
+    return [
+        SlotDisponivel(profissional_id=p, unidade_id=u, inicio=inicio, fim=fim)
+        for inicio, p, u, fim in heapq.merge(*candidatos)
+    ][:limite]
@@ -2,14 +2,15 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.models.user import User
 from app.core.config import ALGORITHM, SECRET_KEY, get_access_token_expires
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
 )
 from app.deps import get_db
@@ -21,16 +22,16 @@ router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     # verifica se email já existe
-    existing = db.query(User).filter(User.email == user_in.email).first()
+    existing = await db.scalar(select(User).where(User.email == user_in.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="E-mail já cadastrado.",
         )
 
-    hashed_password = get_password_hash(user_in.senha)
+    hashed_password = await get_password_hash_async(user_in.senha)
 
     db_user = User(
         nome_completo=user_in.nome_completo,
@@ -39,19 +40,15 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
         tipo=user_in.tipo,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: LoginRequest, db: Session = Depends(get_db)):
-    user = (
-        db.query(User)
-        .filter(User.email == form_data.email)
-        .first()
-    )
-    if not user or not verify_password(form_data.senha, user.senha_hash):
+async def login(form_data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == form_data.email))
+    if not user or not await verify_password_async(form_data.senha, user.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas.",
@@ -62,15 +59,9 @@ def login(form_data: LoginRequest, db: Session = Depends(get_db)):
         data={"sub": str(user.id), "tipo": user.tipo},
         expires_delta=access_token_expires,
     )
-    access_token_expires = get_access_token_expires()
-    access_token = create_access_token(
-        data={"sub": str(user.id), "tipo": user.tipo},
-        expires_delta=access_token_expires,
-    )
 
     # Novo: registra log de login bem-sucedido
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="LOGIN_SUCESSO",
         usuario=user,
         detalhes=f"Login realizado para o usuário ID={user.id}, tipo={user.tipo}",
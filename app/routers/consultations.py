@@ -1,45 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import timedelta
 
-from app.deps import get_db, get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.deps import get_db, get_read_db, get_current_user
 from app.models.user import User  
 from app.models.consultation import Consulta
 from app.models.patient import Paciente
 from app.models.professional import Profissional
-from app.models.unit import Unidade
 from app.schemas.consultation import (
     ConsultaCreate,
     ConsultaRead,
     ConsultaUpdate,
     ConsultaStatusUpdate,
 )
+from app.schemas.pagination import Pagina
+from app.services.agenda import (
+    agendas,
+    confirmar_agenda,
+    garantir_horario_livre,
+    local_sem_fuso,
+    ocupa_agenda,
+    sincronizar_agenda,
+)
+from app.services.diretorio import diretorio
+from app.services.etag import (
+    RESPOSTA_304,
+    aplicar_etag,
+    etag_confere,
+    gerar_etag,
+    nao_modificado,
+)
 from app.services.logs import registrar_log
+from app.services.pagination import (
+    ParametrosPaginacao,
+    aplicar_cursor,
+    parametros_paginacao,
+)
+from app.services.serializacao import (
+    RespostaJSON,
+    dicionarios,
+    pagina_json,
+    parametro_campos,
+    projecao,
+    restringir,
+)
 
 router = APIRouter(prefix="/consultas", tags=["Consultas"])
 
+# Chave de ordenação/paginação das listagens de consultas
+CHAVES_CONSULTA = (Consulta.data_hora, Consulta.id)
+
+
+def _consulta_read(campos: tuple[str, ...] | None, chaves=()):
+    return restringir(select(*projecao(ConsultaRead, Consulta)), campos, chaves)
+
+
+def _fim(consulta: Consulta):
+    return consulta.data_hora + timedelta(minutes=consulta.duracao_minutos)
+
 
 @router.post("/", response_model=ConsultaRead, status_code=status.HTTP_201_CREATED)
-def criar_consulta(
+async def criar_consulta(
     consulta_in: ConsultaCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     # valida se paciente existe
-    if not db.get(Paciente, consulta_in.paciente_id):
+    if not await db.get(Paciente, consulta_in.paciente_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Paciente não encontrado.",
         )
 
-    # valida se profissional existe
-    if not db.get(Profissional, consulta_in.profissional_id):
+    # valida se profissional existe (diretório em memória)
+    if not await diretorio.obter_profissional(db, consulta_in.profissional_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Profissional não encontrado.",
         )
 
-    # valida se unidade existe
-    if not db.get(Unidade, consulta_in.unidade_id):
+    # valida se unidade existe (diretório em memória)
+    if not await diretorio.obter_unidade(db, consulta_in.unidade_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Unidade não encontrada.",
@@ -49,17 +92,24 @@ def criar_consulta(
         paciente_id=consulta_in.paciente_id,
         profissional_id=consulta_in.profissional_id,
         unidade_id=consulta_in.unidade_id,
-        data_hora=consulta_in.data_hora,
+        data_hora=local_sem_fuso(consulta_in.data_hora),
+        duracao_minutos=consulta_in.duracao_minutos,
         tipo_atendimento=consulta_in.tipo_atendimento,
         status="AGENDADA",
         observacoes=consulta_in.observacoes,
     )
-    db.add(db_consulta)
-    db.commit()
-    db.refresh(db_consulta)
+
+    # verifica conflito de horário e grava sob o lock da agenda do profissional
+    agenda = await agendas.obter(db, consulta_in.profissional_id)
+    async with agenda.lock:
+        await sincronizar_agenda(db, agenda, consulta_in.profissional_id)
+        garantir_horario_livre(agenda, db_consulta.data_hora, _fim(db_consulta))
+        db.add(db_consulta)
+        await confirmar_agenda(db, agenda, consulta_in.profissional_id)
+        await db.refresh(db_consulta)
+        agenda.adicionar(db_consulta.data_hora, _fim(db_consulta), db_consulta.id)
     
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_CONSULTA",
         usuario=current_user,
         detalhes=f"Consulta ID={db_consulta.id} criada pelo usuário ID={current_user.id}",
@@ -68,88 +118,120 @@ def criar_consulta(
     return db_consulta
 
 
-@router.get("/", response_model=list[ConsultaRead])
-def listar_consultas(db: Session = Depends(get_db)):
-    return db.query(Consulta).all()
+@router.get("/", response_model=Pagina[ConsultaRead])
+async def listar_consultas(
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ConsultaRead)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    consulta = aplicar_cursor(_consulta_read(campos, CHAVES_CONSULTA), CHAVES_CONSULTA, pagina)
+    return pagina_json(await db.execute(consulta), CHAVES_CONSULTA, pagina, ConsultaRead, campos)
 
 
 @router.get("/{consulta_id}", response_model=ConsultaRead)
-def obter_consulta(
+async def obter_consulta(
     consulta_id: int,
-    db: Session = Depends(get_db),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ConsultaRead)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    consulta = db.query(Consulta).get(consulta_id)
+    resultado = await db.execute(_consulta_read(campos).where(Consulta.id == consulta_id))
+    consulta = resultado.first()
     if not consulta:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consulta não encontrada.",
         )
         
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_CONSULTA",
         usuario=current_user,
-        detalhes=f"Consulta ID={obter_consulta.id} criada pelo usuário ID={current_user.id}",
+        detalhes=f"Consulta ID={consulta_id} consultada pelo usuário ID={current_user.id}",
     )
     
-    return consulta
+    return RespostaJSON(dicionarios(resultado.keys(), [consulta], ConsultaRead, campos)[0])
 
 
-@router.get("/pacientes/{paciente_id}", response_model=list[ConsultaRead])
-def listar_consultas_por_paciente(
+@router.get("/pacientes/{paciente_id}", response_model=Pagina[ConsultaRead])
+async def listar_consultas_por_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ConsultaRead)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_CONSULTA",
         usuario=current_user,
-        detalhes=f"Consulta ID={listar_consultas_por_paciente.id} criada pelo usuário ID={current_user.id}",
+        detalhes=f"Consultas do paciente ID={paciente_id} listadas pelo usuário ID={current_user.id}",
     )
-    
-    return db.query(Consulta).filter(Consulta.paciente_id == paciente_id).all()
+
+    consulta = aplicar_cursor(
+        _consulta_read(campos, CHAVES_CONSULTA).where(Consulta.paciente_id == paciente_id),
+        CHAVES_CONSULTA,
+        pagina,
+    )
+    return pagina_json(await db.execute(consulta), CHAVES_CONSULTA, pagina, ConsultaRead, campos)
 
 
-@router.get("/profissionais/{profissional_id}", response_model=list[ConsultaRead])
-def listar_consultas_por_profissional(
+@router.get(
+    "/profissionais/{profissional_id}",
+    response_model=Pagina[ConsultaRead],
+    responses=RESPOSTA_304,
+)
+async def listar_consultas_por_profissional(
     profissional_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ConsultaRead)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_CONSULTA",
         usuario=current_user,
-        detalhes=f"Consulta ID={listar_consultas_por_profissional.id} criada pelo usuário ID={current_user.id}",
+        detalhes=f"Consultas do profissional ID={profissional_id} listadas pelo usuário ID={current_user.id}",
     )
-    
-    return (
-        db.query(Consulta)
-        .filter(Consulta.profissional_id == profissional_id)
-        .all()
+
+    # A versão da agenda é lida antes das consultas: se alguém gravar no meio,
+    # a ETag fica mais antiga que os dados e a próxima requisição recebe 200
+    agenda_versao = await db.scalar(
+        select(Profissional.agenda_versao).where(Profissional.id == profissional_id)
     )
-    
+    etag = gerar_etag("agenda", profissional_id, agenda_versao or 0, campos=campos)
+    if etag_confere(request, etag):
+        return nao_modificado(etag)
+
+    consulta = aplicar_cursor(
+        _consulta_read(campos, CHAVES_CONSULTA).where(Consulta.profissional_id == profissional_id),
+        CHAVES_CONSULTA,
+        pagina,
+    )
+    resposta = pagina_json(await db.execute(consulta), CHAVES_CONSULTA, pagina, ConsultaRead, campos)
+    aplicar_etag(resposta, etag)
+    return resposta
+
 
 
 @router.put("/{consulta_id}", response_model=ConsultaRead)
-def atualizar_consulta(
+async def atualizar_consulta(
     consulta_id: int,
     consulta_up: ConsultaUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    consulta = db.query(Consulta).get(consulta_id)
+    consulta = await db.get(Consulta, consulta_id)
     if not consulta:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consulta não encontrada.",
         )
 
+    profissional_anterior = consulta.profissional_id
+
     # se atualizar IDs, valida existência
     if consulta_up.paciente_id is not None:
-        if not db.query(Paciente).get(consulta_up.paciente_id):
+        if not await db.get(Paciente, consulta_up.paciente_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Paciente não encontrado.",
@@ -157,7 +239,7 @@ def atualizar_consulta(
         consulta.paciente_id = consulta_up.paciente_id
 
     if consulta_up.profissional_id is not None:
-        if not db.query(Profissional).get(consulta_up.profissional_id):
+        if not await diretorio.obter_profissional(db, consulta_up.profissional_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Profissional não encontrado.",
@@ -165,7 +247,7 @@ def atualizar_consulta(
         consulta.profissional_id = consulta_up.profissional_id
 
     if consulta_up.unidade_id is not None:
-        if not db.query(Unidade).get(consulta_up.unidade_id):
+        if not await diretorio.obter_unidade(db, consulta_up.unidade_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unidade não encontrada.",
@@ -173,51 +255,77 @@ def atualizar_consulta(
         consulta.unidade_id = consulta_up.unidade_id
 
     if consulta_up.data_hora is not None:
-        consulta.data_hora = consulta_up.data_hora
+        consulta.data_hora = local_sem_fuso(consulta_up.data_hora)
+    if consulta_up.duracao_minutos is not None:
+        consulta.duracao_minutos = consulta_up.duracao_minutos
     if consulta_up.tipo_atendimento is not None:
         consulta.tipo_atendimento = consulta_up.tipo_atendimento
     if consulta_up.observacoes is not None:
         consulta.observacoes = consulta_up.observacoes
 
-    db.commit()
-    db.refresh(consulta)
+    agenda = await agendas.obter(db, consulta.profissional_id)
+    async with agenda.lock:
+        await sincronizar_agenda(db, agenda, consulta.profissional_id)
+        if ocupa_agenda(consulta.status):
+            garantir_horario_livre(
+                agenda, consulta.data_hora, _fim(consulta), ignorar_id=consulta.id
+            )
+        await confirmar_agenda(db, agenda, consulta.profissional_id)
+        await db.refresh(consulta)
+        if ocupa_agenda(consulta.status):
+            agenda.adicionar(consulta.data_hora, _fim(consulta), consulta.id)
+
+    if profissional_anterior != consulta.profissional_id:
+        agenda_anterior = await agendas.obter(db, profissional_anterior)
+        async with agenda_anterior.lock:
+            agenda_anterior.remover(consulta.id)
     
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_CONSULTA",
         usuario=current_user,
-        detalhes=f"Consulta ID={atualizar_consulta.id} criada pelo usuário ID={current_user.id}",
+        detalhes=f"Consulta ID={consulta.id} atualizada pelo usuário ID={current_user.id}",
     )
 
     return consulta
 
 
 @router.patch("/{consulta_id}/status", response_model=ConsultaRead)
-def atualizar_status_consulta(
+async def atualizar_status_consulta(
     consulta_id: int,
     status_in: ConsultaStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    consulta = db.query(Consulta).get(consulta_id)
+    consulta = await db.get(Consulta, consulta_id)
     if not consulta:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consulta não encontrada.",
         )
 
-    consulta.status = status_in.status
-    db.commit()
-    db.refresh(consulta)
+    agenda = await agendas.obter(db, consulta.profissional_id)
+    async with agenda.lock:
+        await sincronizar_agenda(db, agenda, consulta.profissional_id)
+        # reativar uma consulta cancelada volta a ocupar o horário
+        if ocupa_agenda(status_in.status) and not ocupa_agenda(consulta.status):
+            garantir_horario_livre(
+                agenda, consulta.data_hora, _fim(consulta), ignorar_id=consulta.id
+            )
+        consulta.status = status_in.status
+        await confirmar_agenda(db, agenda, consulta.profissional_id)
+        await db.refresh(consulta)
+        if ocupa_agenda(consulta.status):
+            agenda.adicionar(consulta.data_hora, _fim(consulta), consulta.id)
+        else:
+            agenda.remover(consulta.id)
     
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_CONSULTA",
         usuario=current_user,
         detalhes=(
             f"Status da consulta ID={consulta.id} atualizado para "
-            f"{consulta.status} pelo usuário ID={current_user.id}",
-        )
+            f"{consulta.status} pelo usuário ID={current_user.id}"
+        ),
     )
     
     return consulta
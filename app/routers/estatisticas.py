@@ -0,0 +1,33 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.deps import get_current_admin, get_read_db
+from app.models.user import User
+from app.schemas.estatistica import Agrupamento, ResumoConsultas
+from app.services.estatisticas import consulta_resumo, montar_resumo
+
+router = APIRouter(prefix="/estatisticas", tags=["Estatísticas"])
+
+
+@router.get("/consultas", response_model=ResumoConsultas)
+async def resumo_consultas(
+    de: date = Query(..., description="Primeiro dia do período"),
+    ate: date = Query(..., description="Último dia do período (inclusive)"),
+    agrupar: Agrupamento = Query("dia"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Volume de consultas por unidade, profissional ou dia, com a divisão
+    por status. Lê só a tabela de agregados.
+    """
+    if de > ate:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'de' deve ser anterior ou igual a 'ate'.",
+        )
+
+    linhas = (await db.execute(consulta_resumo(de, ate, agrupar))).all()
+    return montar_resumo(linhas, de, ate, agrupar)
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+
+from app.deps import get_current_user
+from app.models.consultation import Consulta
+from app.models.medical_record import Prontuario
+from app.models.patient import Paciente
+from app.models.user import User
+from app.services.agenda import local_sem_fuso
+from app.services.exports import FormatoExportacao, resposta_exportacao
+from app.services.logs import registrar_log, utc_sem_fuso
+
+router = APIRouter(prefix="/export", tags=["Exportação"])
+
+
+@router.get("/pacientes")
+async def exportar_pacientes(
+    formato: FormatoExportacao = Query("ndjson"),
+    de: datetime | None = Query(None, description="Cadastro a partir de (sem fuso = UTC)"),
+    ate: datetime | None = Query(None, description="Cadastro até, inclusive (sem fuso = UTC)"),
+    current_user: User = Depends(get_current_user),
+):
+    stmt = (
+        select(
+            Paciente.id,
+            Paciente.usuario_id,
+            User.nome_completo,
+            User.email,
+            Paciente.cpf,
+            Paciente.data_nascimento,
+            Paciente.telefone,
+            Paciente.endereco,
+            Paciente.plano_saude,
+            Paciente.numero_carteirinha,
+            User.criado_em,
+        )
+        .join(User, User.id == Paciente.usuario_id)
+        .order_by(Paciente.id)
+    )
+    if de is not None:
+        stmt = stmt.where(User.criado_em >= utc_sem_fuso(de))
+    if ate is not None:
+        stmt = stmt.where(User.criado_em <= utc_sem_fuso(ate))
+
+    await registrar_log(
+        acao="EXPORTAR_PACIENTES",
+        usuario=current_user,
+        detalhes=f"Exportação de pacientes ({formato}) pelo usuário ID={current_user.id}",
+    )
+
+    return resposta_exportacao(stmt, formato, "pacientes")
+
+
+@router.get("/consultas")
+async def exportar_consultas(
+    formato: FormatoExportacao = Query("ndjson"),
+    de: datetime | None = Query(None, description="Data da consulta a partir de (sem fuso = horário local)"),
+    ate: datetime | None = Query(None, description="Data da consulta até, inclusive (sem fuso = horário local)"),
+    current_user: User = Depends(get_current_user),
+):
+    stmt = select(
+        Consulta.id,
+        Consulta.paciente_id,
+        Consulta.profissional_id,
+        Consulta.unidade_id,
+        Consulta.data_hora,
+        Consulta.tipo_atendimento,
+        Consulta.status,
+        Consulta.observacoes,
+    ).order_by(Consulta.data_hora, Consulta.id)
+    if de is not None:
+        stmt = stmt.where(Consulta.data_hora >= local_sem_fuso(de))
+    if ate is not None:
+        stmt = stmt.where(Consulta.data_hora <= local_sem_fuso(ate))
+
+    await registrar_log(
+        acao="EXPORTAR_CONSULTAS",
+        usuario=current_user,
+        detalhes=f"Exportação de consultas ({formato}) pelo usuário ID={current_user.id}",
+    )
+
+    return resposta_exportacao(stmt, formato, "consultas")
+
+
+@router.get("/prontuarios")
+async def exportar_prontuarios(
+    formato: FormatoExportacao = Query("ndjson"),
+    de: datetime | None = Query(None, description="Registro a partir de (sem fuso = UTC)"),
+    ate: datetime | None = Query(None, description="Registro até, inclusive (sem fuso = UTC)"),
+    current_user: User = Depends(get_current_user),
+):
+    stmt = select(
+        Prontuario.id,
+        Prontuario.paciente_id,
+        Prontuario.profissional_id,
+        Prontuario.consulta_id,
+        Prontuario.data_registro,
+        Prontuario.descricao,
+        Prontuario.tipo_registro,
+    ).order_by(Prontuario.data_registro, Prontuario.id)
+    if de is not None:
+        stmt = stmt.where(Prontuario.data_registro >= utc_sem_fuso(de))
+    if ate is not None:
+        stmt = stmt.where(Prontuario.data_registro <= utc_sem_fuso(ate))
+
+    await registrar_log(
+        acao="EXPORTAR_PRONTUARIOS",
+        usuario=current_user,
+        detalhes=f"Exportação de prontuários ({formato}) pelo usuário ID={current_user.id}",
+    )
+
+    return resposta_exportacao(stmt, formato, "prontuarios")
@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.deps import get_current_admin, get_read_db
+from app.models.log import LogSistema
+from app.models.user import User
+from app.schemas.log import LogRead
+from app.schemas.pagination import Pagina
+from app.services.exports import resposta_exportacao
+from app.services.logs import registrar_log, utc_sem_fuso
+from app.services.pagination import (
+    ParametrosPaginacao,
+    aplicar_cursor,
+    parametros_paginacao,
+)
+from app.services.serializacao import pagina_json, parametro_campos, restringir
+
+router = APIRouter(prefix="/logs", tags=["Logs"])
+
+# Ordem cronológica; (criado_em, id) é o sufixo de todos os índices de logs_sistema
+CHAVES_LOG = (LogSistema.criado_em, LogSistema.id)
+
+
+@router.get(
+    "/",
+    response_model=Pagina[LogRead],
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def listar_logs(
+    usuario_id: int | None = None,
+    acao: str | None = None,
+    de: datetime | None = Query(None, description="A partir de (sem fuso = UTC)"),
+    ate: datetime | None = Query(None, description="Até, inclusive (sem fuso = UTC)"),
+    formato: Literal["json", "ndjson"] = Query(
+        "json", description="ndjson transmite todos os registros a partir do cursor"
+    ),
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(LogRead)),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Logs de auditoria ainda no banco, em ordem cronológica. Filtrar por
+    usuário ou ação percorre o índice correspondente a partir de ``de``
+    (ou do cursor). Logs já arquivados: /sistema/auditoria/arquivo.
+    """
+    consulta = select(
+        LogSistema.id,
+        LogSistema.usuario_id,
+        LogSistema.acao,
+        LogSistema.detalhes,
+        LogSistema.criado_em,
+    )
+    if usuario_id is not None:
+        consulta = consulta.where(LogSistema.usuario_id == usuario_id)
+    if acao is not None:
+        consulta = consulta.where(LogSistema.acao == acao)
+    if de is not None:
+        consulta = consulta.where(LogSistema.criado_em >= utc_sem_fuso(de))
+    if ate is not None:
+        consulta = consulta.where(LogSistema.criado_em <= utc_sem_fuso(ate))
+
+    await registrar_log(
+        acao="CONSULTAR_LOGS",
+        usuario=current_user,
+        detalhes=(
+            f"Consulta de logs (usuario_id={usuario_id}, acao={acao}, de={de}, "
+            f"ate={ate}, formato={formato}) pelo usuário ID={current_user.id}"
+        ),
+    )
+
+    consulta = aplicar_cursor(consulta, CHAVES_LOG, pagina)
+    if formato == "ndjson":
+        # Sem limite de página: o streaming lê em lotes até o fim
+        return resposta_exportacao(restringir(consulta, campos).limit(None), "ndjson", "logs")
+
+    consulta = restringir(consulta, campos, CHAVES_LOG)
+    return pagina_json(await db.execute(consulta), CHAVES_LOG, pagina, LogRead, campos)
@@ -1,26 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.deps import get_db, get_current_user
+from app.deps import get_db, get_read_db, get_current_user
 from app.models.patient import Paciente
-from app.models.professional import Profissional
 from app.models.consultation import Consulta
 from app.models.medical_record import Prontuario
 from app.models.user import User
-from app.schemas.medical_record import ProntuarioCreate, ProntuarioRead
+from app.schemas.medical_record import ProntuarioBuscaItem, ProntuarioCreate, ProntuarioRead
+from app.schemas.pagination import Pagina
+from app.services.busca_prontuarios import montar_busca
+from app.services.diretorio import diretorio
+from app.services.etag import (
+    RESPOSTA_304,
+    aplicar_etag,
+    etag_confere,
+    gerar_etag,
+    nao_modificado,
+)
 from app.services.logs import registrar_log
+from app.services.pagination import (
+    ParametrosPaginacao,
+    aplicar_cursor,
+    parametros_paginacao,
+)
+from app.services.serializacao import (
+    RespostaJSON,
+    dicionarios,
+    pagina_json,
+    parametro_campos,
+    projecao,
+    restringir,
+)
 
 router = APIRouter(prefix="/prontuarios", tags=["Prontuários"])
 
+# Prontuários são listados do mais recente para o mais antigo
+CHAVES_PRONTUARIO = (Prontuario.data_registro, Prontuario.id)
+
 
 @router.post("/", response_model=ProntuarioRead, status_code=status.HTTP_201_CREATED)
-def criar_prontuario(
+async def criar_prontuario(
     prontuario_in: ProntuarioCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     # valida paciente
-    paciente = db.get(Paciente, prontuario_in.paciente_id)
+    paciente = await db.get(Paciente, prontuario_in.paciente_id)
     if not paciente:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,7 +54,7 @@ def criar_prontuario(
         )
 
     # valida profissional
-    profissional = db.get(Profissional, prontuario_in.profissional_id)
+    profissional = await diretorio.obter_profissional(db, prontuario_in.profissional_id)
     if not profissional:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,7 +64,7 @@ def criar_prontuario(
     # se tiver consulta_id, valida consulta
     consulta = None
     if prontuario_in.consulta_id is not None:
-        consulta = db.get(Consulta, prontuario_in.consulta_id)
+        consulta = await db.get(Consulta, prontuario_in.consulta_id)
         if not consulta:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -53,11 +79,10 @@ def criar_prontuario(
         tipo_registro=prontuario_in.tipo_registro,
     )
     db.add(db_prontuario)
-    db.commit()
-    db.refresh(db_prontuario)
+    await db.commit()
+    await db.refresh(db_prontuario)
     
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_PRONTUARIO",
         usuario=current_user,
         detalhes=f"Prontuário ID={db_prontuario.id} criado pelo usuário ID={current_user.id}",
@@ -66,55 +91,117 @@ def criar_prontuario(
     return db_prontuario
 
 
-@router.get("/paciente/{paciente_id}", response_model=list[ProntuarioRead])
-def listar_prontuarios_por_paciente(
+@router.get("/paciente/{paciente_id}", response_model=Pagina[ProntuarioRead])
+async def listar_prontuarios_por_paciente(
     paciente_id: int,
-    db: Session = Depends(get_db),
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ProntuarioRead)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    paciente = db.get(Paciente, paciente_id)
+    paciente = await db.get(Paciente, paciente_id)
     if not paciente:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Paciente não encontrado.",
         )
 
-    registrar_log(
-        db=db,
+    await registrar_log(
         acao="CRIAR_PRONTUARIO",
         usuario=current_user,
-        detalhes=f"Prontuário ID={listar_prontuarios_por_paciente.id} criado pelo usuário ID={current_user.id}",
+        detalhes=f"Prontuários do paciente ID={paciente_id} listados pelo usuário ID={current_user.id}",
     )
-    
-    return (
-        db.query(Prontuario)
-        .filter(Prontuario.paciente_id == paciente_id)
-        .order_by(Prontuario.data_registro.desc())
-        .all()
+
+    consulta = aplicar_cursor(
+        restringir(
+            select(*projecao(ProntuarioRead, Prontuario)), campos, CHAVES_PRONTUARIO
+        ).where(Prontuario.paciente_id == paciente_id),
+        CHAVES_PRONTUARIO,
+        pagina,
+        descendente=True,
+    )
+    return pagina_json(await db.execute(consulta), CHAVES_PRONTUARIO, pagina, ProntuarioRead, campos)
+
+
+# Declarada antes de /{prontuario_id} para "busca" não ser lido como ID
+@router.get("/busca", response_model=Pagina[ProntuarioBuscaItem])
+async def buscar_prontuarios(
+    q: str = Query(..., min_length=1, max_length=200, description="Termos da busca (palavra* busca por prefixo)"),
+    paciente_id: int | None = None,
+    profissional_id: int | None = None,
+    unidade_id: int | None = None,
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ProntuarioBuscaItem)),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Busca de texto completo nas descrições, da mais para a menos
+    relevante (BM25), com um trecho destacado de cada prontuário.
+    """
+    busca = montar_busca(q, paciente_id, profissional_id, unidade_id, campos)
+    chaves = (busca.c.relevancia, busca.c.id)
+    consulta = aplicar_cursor(select(busca), chaves, pagina, descendente=True)
+    resultado = await db.execute(consulta)
+
+    await registrar_log(
+        acao="BUSCAR_PRONTUARIOS",
+        usuario=current_user,
+        detalhes=(
+            f"Busca em prontuários (paciente_id={paciente_id}, "
+            f"profissional_id={profissional_id}, unidade_id={unidade_id}) "
+            f"pelo usuário ID={current_user.id}"
+        ),
+    )
+
+    return pagina_json(resultado, chaves, pagina, ProntuarioBuscaItem, campos)
+
+
+async def _registrar_acesso(prontuario_id: int, usuario: User) -> None:
+    await registrar_log(
+        acao="CRIAR_PRONTUARIO",
+        usuario=usuario,
+        detalhes=(
+            f"Prontuário ID={prontuario_id} consultado pelo usuário "
+            f"ID={usuario.id}"
+        ),
     )
 
 
-@router.get("/{prontuario_id}", response_model=ProntuarioRead)
-def obter_prontuario(
+@router.get("/{prontuario_id}", response_model=ProntuarioRead, responses=RESPOSTA_304)
+async def obter_prontuario(
     prontuario_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ProntuarioRead)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    prontuario = db.get(Prontuario, prontuario_id)
+    # Com If-None-Match, decide o 304 lendo só a versão (sem carregar a descrição)
+    if request.headers.get("if-none-match"):
+        versao = await db.scalar(
+            select(Prontuario.versao).where(Prontuario.id == prontuario_id)
+        )
+        if versao is not None:
+            etag = gerar_etag("prontuario", prontuario_id, versao, campos=campos)
+            if etag_confere(request, etag):
+                # O acesso é auditado mesmo quando o cliente já tem a versão atual
+                await _registrar_acesso(prontuario_id, current_user)
+                return nao_modificado(etag)
+
+    resultado = await db.execute(
+        restringir(select(*projecao(ProntuarioRead, Prontuario)), campos)
+        .add_columns(Prontuario.versao)
+        .where(Prontuario.id == prontuario_id)
+    )
+    prontuario = resultado.first()
     if not prontuario:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prontuário não encontrado.",
         )
-        
-    registrar_log(
-        db=db,
-        acao="CRIAR_PRONTUARIO",
-        usuario=current_user,
-        detalhes=(
-            f"Prontuário ID={prontuario.id} consultado pelo usuário "
-            f"ID={current_user.id}",
-        )
-    )
-    
-    return prontuario
+
+    await _registrar_acesso(prontuario_id, current_user)
+
+    resposta = RespostaJSON(dicionarios(resultado.keys(), [prontuario], ProntuarioRead, campos)[0])
+    aplicar_etag(resposta, gerar_etag("prontuario", prontuario_id, prontuario.versao, campos=campos))
+    return resposta
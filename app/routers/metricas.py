@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.arquivo_logs import arquivador_logs
+from app.services.auth_cache import cache_principais
+from app.services.diretorio import diretorio
+from app.services.logs import gravador_auditoria
+from app.services.metricas import metricas
+from app.services.perfil_sql import perfil_sql
+
+router = APIRouter(tags=["Sistema"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def exportar_metricas():
+    """
+    Métricas no formato texto do Prometheus: histogramas por rota e os
+    contadores dos componentes internos. Sem autenticação, para o coletor;
+    não expõe dados de pacientes.
+    """
+    texto = metricas.exportar({
+        "auditoria": gravador_auditoria.estatisticas(),
+        "arquivamento": arquivador_logs.estatisticas(),
+        "cache_principais": cache_principais.estatisticas(),
+        "diretorio": diretorio.estatisticas(),
+        "perfil_sql": perfil_sql.estatisticas(),
+    })
+    return PlainTextResponse(texto, media_type="text/plain; version=0.0.4; charset=utf-8")
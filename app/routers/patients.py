@@ -1,26 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.models.patient import Paciente
-from app.core.security import get_password_hash
-from app.deps import get_db
+from app.core.security import get_password_hash_async
+from app.core.texto import limite_prefixo, normalizar_busca
+from app.deps import get_db, get_read_db, get_current_admin, get_current_user
 from app.schemas.patient import (
     PacienteCreate,
     PacienteRead,
     PacienteUpdate,
+    PacienteBulkResultado,
+)
+from app.schemas.pagination import Pagina
+from app.schemas.timeline import EventoTimeline, TipoEvento
+from app.services.etag import (
+    RESPOSTA_304,
+    aplicar_etag,
+    etag_confere,
+    gerar_etag,
+    nao_modificado,
+)
+from app.services.logs import registrar_log
+from app.services.patient_import import importar_pacientes, ler_registros
+from app.services.serializacao import (
+    RespostaJSON,
+    dicionarios,
+    pagina_json,
+    parametro_campos,
+    restringir,
+)
+from app.services.timeline import montar_timeline
+from app.services.pagination import (
+    ParametrosPaginacao,
+    aplicar_cursor,
+    parametros_paginacao,
 )
 
 router = APIRouter(prefix="/pacientes", tags=["Pacientes"])
 
 
+def _consulta_paciente_read():
+    """
+    Projeção de PacienteRead em uma única query, com JOIN em usuarios.
+    Evita o lazy load de Paciente.usuario (um SELECT extra por linha, e
+    I/O implícito que a AsyncSession não permite).
+    """
+    return select(
+        Paciente.id,
+        Paciente.usuario_id,
+        User.nome_completo,
+        User.email,
+        Paciente.cpf,
+        Paciente.data_nascimento,
+        Paciente.telefone,
+        Paciente.endereco,
+        Paciente.plano_saude,
+        Paciente.numero_carteirinha,
+    ).join(User, User.id == Paciente.usuario_id)
+
+
 @router.post("/", response_model=PacienteRead, status_code=status.HTTP_201_CREATED)
-def criar_paciente(paciente_in: PacienteCreate, db: Session = Depends(get_db)):
+async def criar_paciente(paciente_in: PacienteCreate, db: AsyncSession = Depends(get_db)):
     # 1) Verifica se email já existe
-    existing_user = (
-        db.query(User)
-        .filter(User.email == paciente_in.email)
-        .first()
+    existing_user = await db.scalar(
+        select(User.id).where(User.email == paciente_in.email)
     )
     if existing_user:
         raise HTTPException(
@@ -29,10 +74,8 @@ def criar_paciente(paciente_in: PacienteCreate, db: Session = Depends(get_db)):
         )
 
     # 2) Verifica se CPF já existe
-    existing_cpf = (
-        db.query(Paciente)
-        .filter(Paciente.cpf == paciente_in.cpf)
-        .first()
+    existing_cpf = await db.scalar(
+        select(Paciente.id).where(Paciente.cpf == paciente_in.cpf)
     )
     if existing_cpf:
         raise HTTPException(
@@ -41,7 +84,7 @@ def criar_paciente(paciente_in: PacienteCreate, db: Session = Depends(get_db)):
         )
 
     # 3) Cria o usuário vinculado (tipo PACIENTE)
-    hashed_password = get_password_hash(paciente_in.senha)
+    hashed_password = await get_password_hash_async(paciente_in.senha)
 
     db_user = User(
         nome_completo=paciente_in.nome_completo,
@@ -50,8 +93,8 @@ def criar_paciente(paciente_in: PacienteCreate, db: Session = Depends(get_db)):
         tipo="PACIENTE",
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # 4) Cria o paciente
     db_paciente = Paciente(
@@ -64,8 +107,8 @@ def criar_paciente(paciente_in: PacienteCreate, db: Session = Depends(get_db)):
         numero_carteirinha=paciente_in.numero_carteirinha,
     )
     db.add(db_paciente)
-    db.commit()
-    db.refresh(db_paciente)
+    await db.commit()
+    await db.refresh(db_paciente)
 
     # Monta objeto de retorno combinando info de user + paciente
     return PacienteRead(
@@ -82,59 +125,204 @@ def criar_paciente(paciente_in: PacienteCreate, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/", response_model=list[PacienteRead])
-def listar_pacientes(db: Session = Depends(get_db)):
-    pacientes = db.query(Paciente).all()
-    result: list[PacienteRead] = []
-    for p in pacientes:
-        u = p.usuario
-        result.append(
-            PacienteRead(
-                id=p.id,
-                usuario_id=u.id,
-                nome_completo=u.nome_completo,
-                email=u.email,
-                cpf=p.cpf,
-                data_nascimento=p.data_nascimento,
-                telefone=p.telefone,
-                endereco=p.endereco,
-                plano_saude=p.plano_saude,
-                numero_carteirinha=p.numero_carteirinha,
-            )
+@router.post(
+    "/bulk",
+    response_model=PacienteBulkResultado,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/PacienteCreate"}}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def criar_pacientes_em_lote(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Cadastro em lote: JSON array, NDJSON ou CSV (cabeçalho com os campos
+    de PacienteCreate). Linhas com erro não impedem as demais.
+    """
+    registros = await ler_registros(request)
+    resultado = await importar_pacientes(db, registros)
+
+    await registrar_log(
+        acao="IMPORTAR_PACIENTES",
+        usuario=current_user,
+        detalhes=(
+            f"Importação de {resultado['total']} pacientes "
+            f"({resultado['criados']} criados) pelo usuário ID={current_user.id}"
+        ),
+    )
+
+    return resultado
+
+
+@router.get("/", response_model=Pagina[PacienteRead])
+async def listar_pacientes(
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(PacienteRead)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    chaves = (Paciente.id,)
+    consulta = aplicar_cursor(restringir(_consulta_paciente_read(), campos, chaves), chaves, pagina)
+    return pagina_json(await db.execute(consulta), chaves, pagina, PacienteRead, campos)
+
+
+# Declarada antes de /{paciente_id} para "busca" não ser lido como ID
+@router.get("/busca", response_model=list[PacienteRead])
+async def buscar_pacientes(
+    nome: str | None = Query(None, min_length=2, max_length=100, description="Início do nome (ignora acentos e maiúsculas)"),
+    cpf: str | None = Query(None, max_length=20),
+    carteirinha: str | None = Query(None, max_length=50, description="Número da carteirinha do plano"),
+    limite: int = Query(20, ge=1, le=100),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(PacienteRead)),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Localiza pacientes por início do nome, CPF exato ou número da
+    carteirinha (informe exatamente um critério). Nomes vêm em ordem
+    alfabética; cada critério é atendido por um índice.
+    """
+    if sum(c is not None for c in (nome, cpf, carteirinha)) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe exatamente um critério: nome, cpf ou carteirinha.",
         )
-    return result
+
+    consulta = restringir(_consulta_paciente_read(), campos)
+    if nome is not None:
+        prefixo = normalizar_busca(nome)
+        if not prefixo:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe ao menos uma letra do nome.",
+            )
+        consulta = consulta.where(
+            User.nome_busca >= prefixo,
+            User.nome_busca < limite_prefixo(prefixo),
+        ).order_by(User.nome_busca, User.id)
+        criterio = "nome"
+    elif cpf is not None:
+        consulta = consulta.where(Paciente.cpf == cpf.strip())
+        criterio = "cpf"
+    else:
+        consulta = consulta.where(
+            Paciente.numero_carteirinha == carteirinha.strip()
+        ).order_by(Paciente.id)
+        criterio = "carteirinha"
+
+    resultado = await db.execute(consulta.limit(limite))
+    linhas = resultado.all()
+
+    await registrar_log(
+        acao="BUSCAR_PACIENTES",
+        usuario=current_user,
+        detalhes=(
+            f"Busca de pacientes por {criterio} "
+            f"pelo usuário ID={current_user.id} ({len(linhas)} resultados)"
+        ),
+    )
+
+    return RespostaJSON(dicionarios(resultado.keys(), linhas, PacienteRead, campos))
 
 
-@router.get("/{paciente_id}", response_model=PacienteRead)
-def obter_paciente(paciente_id: int, db: Session = Depends(get_db)):
-    paciente = db.get(Paciente, paciente_id)
+def _etag_paciente(
+    paciente_id: int,
+    versao_paciente: int,
+    versao_usuario: int,
+    campos: tuple[str, ...] | None,
+) -> str:
+    # PacienteRead inclui nome e e-mail de usuarios: as duas versões entram na ETag
+    return gerar_etag("paciente", paciente_id, versao_paciente, versao_usuario, campos=campos)
+
+
+@router.get("/{paciente_id}", response_model=PacienteRead, responses=RESPOSTA_304)
+async def obter_paciente(
+    paciente_id: int,
+    request: Request,
+    campos: tuple[str, ...] | None = Depends(parametro_campos(PacienteRead)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Com If-None-Match, decide o 304 lendo só as versões (sem carregar a linha)
+    if request.headers.get("if-none-match"):
+        versoes = (
+            await db.execute(
+                select(Paciente.versao, User.versao)
+                .join(User, User.id == Paciente.usuario_id)
+                .where(Paciente.id == paciente_id)
+            )
+        ).first()
+        if versoes is not None:
+            etag = _etag_paciente(paciente_id, *versoes, campos)
+            if etag_confere(request, etag):
+                return nao_modificado(etag)
+
+    resultado = await db.execute(
+        restringir(_consulta_paciente_read(), campos)
+        .add_columns(
+            Paciente.versao.label("versao_paciente"),
+            User.versao.label("versao_usuario"),
+        )
+        .where(Paciente.id == paciente_id)
+    )
+    paciente = resultado.first()
     if not paciente:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Paciente não encontrado.",
         )
-    u = paciente.usuario
-    return PacienteRead(
-        id=paciente.id,
-        usuario_id=u.id,
-        nome_completo=u.nome_completo,
-        email=u.email,
-        cpf=paciente.cpf,
-        data_nascimento=paciente.data_nascimento,
-        telefone=paciente.telefone,
-        endereco=paciente.endereco,
-        plano_saude=paciente.plano_saude,
-        numero_carteirinha=paciente.numero_carteirinha,
+
+    resposta = RespostaJSON(dicionarios(resultado.keys(), [paciente], PacienteRead, campos)[0])
+    aplicar_etag(
+        resposta,
+        _etag_paciente(paciente_id, paciente.versao_paciente, paciente.versao_usuario, campos),
+    )
+    return resposta
+
+
+@router.get("/{paciente_id}/timeline", response_model=Pagina[EventoTimeline])
+async def timeline_paciente(
+    paciente_id: int,
+    tipo: TipoEvento | None = Query(None, description="Só consultas ou só prontuários"),
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(EventoTimeline)),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Consultas e prontuários do paciente intercalados por data, do mais
+    recente para o mais antigo, em uma única query.
+    """
+    if await db.get(Paciente, paciente_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Paciente não encontrado.",
+        )
+
+    await registrar_log(
+        acao="CONSULTAR_TIMELINE",
+        usuario=current_user,
+        detalhes=f"Linha do tempo do paciente ID={paciente_id} consultada pelo usuário ID={current_user.id}",
     )
 
+    consulta, chaves = montar_timeline(paciente_id, pagina, tipo, campos)
+    return pagina_json(await db.execute(consulta), chaves, pagina, EventoTimeline, campos)
+
 
 @router.put("/{paciente_id}", response_model=PacienteRead)
-def atualizar_paciente(
+async def atualizar_paciente(
     paciente_id: int,
     paciente_up: PacienteUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    paciente = db.get(Paciente, paciente_id)
+    paciente = await db.get(Paciente, paciente_id)
     if not paciente:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,33 +339,22 @@ def atualizar_paciente(
     if paciente_up.numero_carteirinha is not None:
         paciente.numero_carteirinha = paciente_up.numero_carteirinha
 
-    db.commit()
-    db.refresh(paciente)
+    await db.commit()
 
-    u = paciente.usuario
-    return PacienteRead(
-        id=paciente.id,
-        usuario_id=u.id,
-        nome_completo=u.nome_completo,
-        email=u.email,
-        cpf=paciente.cpf,
-        data_nascimento=paciente.data_nascimento,
-        telefone=paciente.telefone,
-        endereco=paciente.endereco,
-        plano_saude=paciente.plano_saude,
-        numero_carteirinha=paciente.numero_carteirinha,
-    )
+    return (
+        await db.execute(_consulta_paciente_read().where(Paciente.id == paciente_id))
+    ).one()
 
 
 @router.delete("/{paciente_id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_paciente(paciente_id: int, db: Session = Depends(get_db)):
-    paciente = db.get(Paciente, paciente_id)
+async def deletar_paciente(paciente_id: int, db: AsyncSession = Depends(get_db)):
+    paciente = await db.get(Paciente, paciente_id)
     if not paciente:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Paciente não encontrado.",
         )
 
-    db.delete(paciente)
-    db.commit()
+    await db.delete(paciente)
+    await db.commit()
     return
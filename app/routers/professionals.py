@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash
-from app.deps import get_db
+from app.core.security import get_password_hash_async
+from app.deps import get_db, get_read_db
 from app.models.user import User
 from app.models.professional import Profissional
 from app.schemas.professional import (
@@ -10,17 +11,23 @@ from app.schemas.professional import (
     ProfissionalRead,
     ProfissionalUpdate,
 )
+from app.schemas.pagination import Pagina
+from app.services.diretorio import consulta_profissional_read, diretorio
+from app.services.pagination import ParametrosPaginacao, parametros_paginacao
+from app.services.serializacao import RespostaJSON, parametro_campos, selecionar
 
 router = APIRouter(prefix="/profissionais", tags=["Profissionais"])
 
 
 @router.post("/", response_model=ProfissionalRead, status_code=status.HTTP_201_CREATED)
-def criar_profissional(
+async def criar_profissional(
     profissional_in: ProfissionalCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # 1) Verifica se email já existe
-    existing_user = db.query(User).filter(User.email == profissional_in.email).first()
+    existing_user = await db.scalar(
+        select(User.id).where(User.email == profissional_in.email)
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,9 +35,9 @@ def criar_profissional(
         )
 
     # 2) Verifica se CPF já existe
-    existing_cpf = db.query(Profissional).filter(
-        Profissional.cpf == profissional_in.cpf
-    ).first()
+    existing_cpf = await db.scalar(
+        select(Profissional.id).where(Profissional.cpf == profissional_in.cpf)
+    )
     if existing_cpf:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,7 +45,7 @@ def criar_profissional(
         )
 
     # 3) Cria o usuário vinculado (tipo PROFISSIONAL)
-    hashed_password = get_password_hash(profissional_in.senha)
+    hashed_password = await get_password_hash_async(profissional_in.senha)
 
     db_user = User(
         nome_completo=profissional_in.nome_completo,
@@ -47,8 +54,8 @@ def criar_profissional(
         tipo="PROFISSIONAL",
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # 4) Cria o profissional
     db_prof = Profissional(
@@ -60,10 +67,10 @@ def criar_profissional(
         unidade_id=profissional_in.unidade_id,
     )
     db.add(db_prof)
-    db.commit()
-    db.refresh(db_prof)
+    await db.commit()
+    await db.refresh(db_prof)
 
-    return ProfissionalRead(
+    resultado = ProfissionalRead(
         id=db_prof.id,
         usuario_id=db_user.id,
         nome_completo=db_user.nome_completo,
@@ -74,62 +81,41 @@ def criar_profissional(
         especialidade=db_prof.especialidade,
         unidade_id=db_prof.unidade_id,
     )
+    diretorio.guardar_profissional(resultado)
+    return resultado
 
 
-@router.get("/", response_model=list[ProfissionalRead])
-def listar_profissionais(db: Session = Depends(get_db)):
-    profissionais = db.query(Profissional).all()
-    result: list[ProfissionalRead] = []
-    for p in profissionais:
-        u = p.usuario
-        result.append(
-            ProfissionalRead(
-                id=p.id,
-                usuario_id=u.id,
-                nome_completo=u.nome_completo,
-                email=u.email,
-                cpf=p.cpf,
-                registro_conselho=p.registro_conselho,
-                tipo_conselho=p.tipo_conselho,
-                especialidade=p.especialidade,
-                unidade_id=p.unidade_id,
-            )
-        )
-    return result
+@router.get("/", response_model=Pagina[ProfissionalRead])
+async def listar_profissionais(
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ProfissionalRead)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return RespostaJSON(await diretorio.listar_profissionais(db, pagina, campos))
 
 
 @router.get("/{profissional_id}", response_model=ProfissionalRead)
-def obter_profissional(
+async def obter_profissional(
     profissional_id: int,
-    db: Session = Depends(get_db),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(ProfissionalRead)),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    p = db.get(Profissional, profissional_id)
+    p = await diretorio.obter_profissional(db, profissional_id)
     if not p:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profissional não encontrado.",
         )
-    u = p.usuario
-    return ProfissionalRead(
-        id=p.id,
-        usuario_id=u.id,
-        nome_completo=u.nome_completo,
-        email=u.email,
-        cpf=p.cpf,
-        registro_conselho=p.registro_conselho,
-        tipo_conselho=p.tipo_conselho,
-        especialidade=p.especialidade,
-        unidade_id=p.unidade_id,
-    )
+    return RespostaJSON(selecionar(p.model_dump(), campos))
 
 
 @router.put("/{profissional_id}", response_model=ProfissionalRead)
-def atualizar_profissional(
+async def atualizar_profissional(
     profissional_id: int,
     profissional_up: ProfissionalUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    p = db.get(Profissional, profissional_id)
+    p = await db.get(Profissional, profissional_id)
     if not p:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -145,35 +131,32 @@ def atualizar_profissional(
     if profissional_up.unidade_id is not None:
         p.unidade_id = profissional_up.unidade_id
 
-    db.commit()
-    db.refresh(p)
-
-    u = p.usuario
-    return ProfissionalRead(
-        id=p.id,
-        usuario_id=u.id,
-        nome_completo=u.nome_completo,
-        email=u.email,
-        cpf=p.cpf,
-        registro_conselho=p.registro_conselho,
-        tipo_conselho=p.tipo_conselho,
-        especialidade=p.especialidade,
-        unidade_id=p.unidade_id,
+    await db.commit()
+
+    resultado = ProfissionalRead.model_validate(
+        (
+            await db.execute(
+                consulta_profissional_read().where(Profissional.id == profissional_id)
+            )
+        ).one()
     )
+    diretorio.guardar_profissional(resultado)
+    return resultado
 
 
 @router.delete("/{profissional_id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_profissional(
+async def deletar_profissional(
     profissional_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    p = db.get(Profissional, profissional_id)
+    p = await db.get(Profissional, profissional_id)
     if not p:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profissional não encontrado.",
         )
 
-    db.delete(p)
-    db.commit()
+    await db.delete(p)
+    await db.commit()
+    diretorio.remover_profissional(profissional_id)
     return
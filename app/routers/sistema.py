@@ -0,0 +1,79 @@
+from datetime import datetime
+from itertools import islice
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.deps import get_current_admin, get_read_db
+from app.models.user import User
+from app.schemas.log import LogRead
+from app.services.arquivo_logs import arquivador_logs
+from app.services.auth_cache import cache_principais
+from app.services.diretorio import diretorio
+from app.services.logs import gravador_auditoria
+from app.services.serializacao import RespostaJSON, parametro_campos, selecionar
+
+router = APIRouter(prefix="/sistema", tags=["Sistema"])
+
+
+@router.get("/auditoria")
+async def estatisticas_auditoria(current_user: User = Depends(get_current_admin)):
+    return gravador_auditoria.estatisticas()
+
+
+@router.get("/auditoria/arquivamento")
+async def estatisticas_arquivamento(current_user: User = Depends(get_current_admin)):
+    return arquivador_logs.estatisticas()
+
+
+@router.get("/auditoria/arquivo", response_model=list[LogRead])
+async def ler_arquivo_auditoria(
+    de: datetime,
+    ate: datetime,
+    usuario_id: int | None = None,
+    acao: str | None = None,
+    limite: int = Query(1000, ge=1, le=10_000),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(LogRead)),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Logs já removidos do banco pela retenção, lidos dos segmentos
+    arquivados (período ``[de, ate)``, horários em UTC).
+    """
+    if de >= ate:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'de' deve ser anterior a 'ate'.",
+        )
+
+    def ler() -> list[dict]:
+        registros = islice(arquivador_logs.ler(de, ate, usuario_id, acao), limite)
+        return [selecionar(r, campos) for r in registros]
+
+    # Descompressão e leitura de arquivos: fora do event loop. Os registros
+    # já têm os campos de LogRead, na mesma ordem
+    return RespostaJSON(await run_in_threadpool(ler))
+
+
+@router.get("/cache/principais")
+async def estatisticas_cache_principais(current_user: User = Depends(get_current_admin)):
+    return cache_principais.estatisticas()
+
+
+@router.get("/cache/diretorio")
+async def estatisticas_cache_diretorio(current_user: User = Depends(get_current_admin)):
+    return diretorio.estatisticas()
+
+
+@router.post("/cache/diretorio/recarregar")
+async def recarregar_cache_diretorio(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Recarrega unidades e profissionais do banco (ex.: após cargas feitas
+    fora da API ou gravações de outro worker).
+    """
+    await diretorio.carregar(db)
+    return diretorio.estatisticas()
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.deps import get_db
+from app.deps import get_db, get_read_db
+from app.models.professional import Profissional
 from app.models.unit import Unidade
+from app.schemas.pagination import Pagina
 from app.schemas.unit import UnidadeCreate, UnidadeRead, UnidadeUpdate
+from app.services.diretorio import diretorio
+from app.services.etag import (
+    NONCE_PROCESSO,
+    RESPOSTA_304,
+    aplicar_etag,
+    etag_confere,
+    gerar_etag,
+    nao_modificado,
+)
+from app.services.pagination import ParametrosPaginacao, parametros_paginacao
+from app.services.serializacao import RespostaJSON, parametro_campos, selecionar
 
 router = APIRouter(prefix="/unidades", tags=["Unidades"])
 
 
 @router.post("/", response_model=UnidadeRead, status_code=status.HTTP_201_CREATED)
-def criar_unidade(unidade_in: UnidadeCreate, db: Session = Depends(get_db)):
+async def criar_unidade(unidade_in: UnidadeCreate, db: AsyncSession = Depends(get_db)):
     unidade = Unidade(
         nome=unidade_in.nome,
         tipo_unidade=unidade_in.tipo_unidade,
@@ -17,34 +31,53 @@ def criar_unidade(unidade_in: UnidadeCreate, db: Session = Depends(get_db)):
         telefone=unidade_in.telefone,
     )
     db.add(unidade)
-    db.commit()
-    db.refresh(unidade)
-    return unidade
+    await db.commit()
+    await db.refresh(unidade)
 
+    resultado = UnidadeRead.model_validate(unidade)
+    diretorio.guardar_unidade(resultado)
+    return resultado
 
-@router.get("/", response_model=list[UnidadeRead])
-def listar_unidades(db: Session = Depends(get_db)):
-    return db.query(Unidade).all()
+
+@router.get("/", response_model=Pagina[UnidadeRead], responses=RESPOSTA_304)
+async def listar_unidades(
+    request: Request,
+    pagina: ParametrosPaginacao = Depends(parametros_paginacao),
+    campos: tuple[str, ...] | None = Depends(parametro_campos(UnidadeRead)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # A listagem sai do diretório em memória: a ETag é a geração dele neste processo
+    etag = gerar_etag("unidades", NONCE_PROCESSO, await diretorio.geracao_unidades(db), campos=campos)
+    if etag_confere(request, etag):
+        return nao_modificado(etag)
+
+    resposta = RespostaJSON(await diretorio.listar_unidades(db, pagina, campos))
+    aplicar_etag(resposta, etag)
+    return resposta
 
 
 @router.get("/{unidade_id}", response_model=UnidadeRead)
-def obter_unidade(unidade_id: int, db: Session = Depends(get_db)):
-    unidade = db.get(Unidade, unidade_id)
+async def obter_unidade(
+    unidade_id: int,
+    campos: tuple[str, ...] | None = Depends(parametro_campos(UnidadeRead)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    unidade = await diretorio.obter_unidade(db, unidade_id)
     if not unidade:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Unidade não encontrada.",
         )
-    return unidade
+    return RespostaJSON(selecionar(unidade.model_dump(), campos))
 
 
 @router.put("/{unidade_id}", response_model=UnidadeRead)
-def atualizar_unidade(
+async def atualizar_unidade(
     unidade_id: int,
     unidade_up: UnidadeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    unidade = db.get(Unidade, unidade_id)
+    unidade = await db.get(Unidade, unidade_id)
     if not unidade:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,20 +93,32 @@ def atualizar_unidade(
     if unidade_up.telefone is not None:
         unidade.telefone = unidade_up.telefone
 
-    db.commit()
-    db.refresh(unidade)
-    return unidade
+    await db.commit()
+    await db.refresh(unidade)
+
+    resultado = UnidadeRead.model_validate(unidade)
+    diretorio.guardar_unidade(resultado)
+    return resultado
 
 
 @router.delete("/{unidade_id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_unidade(unidade_id: int, db: Session = Depends(get_db)):
-    unidade = db.get(Unidade, unidade_id)
+async def deletar_unidade(unidade_id: int, db: AsyncSession = Depends(get_db)):
+    unidade = await db.get(Unidade, unidade_id)
     if not unidade:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Unidade não encontrada.",
         )
 
-    db.delete(unidade)
-    db.commit()
+    # Unidade.profissionais tem cascade de exclusão: os profissionais da
+    # unidade saem do banco junto e precisam sair do diretório também
+    profissionais = (
+        await db.scalars(select(Profissional.id).where(Profissional.unidade_id == unidade_id))
+    ).all()
+
+    await db.delete(unidade)
+    await db.commit()
+    diretorio.remover_unidade(unidade_id)
+    for profissional_id in profissionais:
+        diretorio.remover_profissional(profissional_id)
     return
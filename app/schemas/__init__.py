@@ -1,7 +1,18 @@
 from .user import UserCreate, UserRead
 from .auth import LoginRequest, Token
-from .patient import PacienteCreate, PacienteRead, PacienteUpdate
+from .patient import (
+    PacienteCreate,
+    PacienteRead,
+    PacienteUpdate,
+    PacienteBulkItem,
+    PacienteBulkResultado,
+)
 from .professional import ProfissionalCreate, ProfissionalRead, ProfissionalUpdate
 from .unit import UnidadeCreate, UnidadeRead, UnidadeUpdate
 from .consultation import ConsultaCreate, ConsultaRead, ConsultaUpdate, ConsultaStatusUpdate
-from .medical_record import ProntuarioCreate, ProntuarioRead
+from .medical_record import ProntuarioCreate, ProntuarioRead, ProntuarioBuscaItem
+from .pagination import Pagina
+from .agenda import SlotDisponivel
+from .timeline import EventoTimeline
+from .estatistica import GrupoConsultas, ResumoConsultas
+from .log import LogRead
@@ -0,0 +1,10 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SlotDisponivel(BaseModel):
+    profissional_id: int
+    unidade_id: int
+    inicio: datetime
+    fim: datetime
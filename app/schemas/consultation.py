@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PositiveInt
 
 
 class ConsultaBase(BaseModel):
@@ -7,6 +7,7 @@ class ConsultaBase(BaseModel):
     profissional_id: int
     unidade_id: int
     data_hora: datetime
+    duracao_minutos: PositiveInt = 30
     tipo_atendimento: str  # "PRESENCIAL" ou "TELEMEDICINA"
     observacoes: str | None = None
 
@@ -21,6 +22,7 @@ class ConsultaRead(BaseModel):
     profissional_id: int
     unidade_id: int
     data_hora: datetime
+    duracao_minutos: int
     tipo_atendimento: str
     status: str
     observacoes: str | None = None
@@ -33,6 +35,7 @@ class ConsultaUpdate(BaseModel):
     profissional_id: int | None = None
     unidade_id: int | None = None
     data_hora: datetime | None = None
+    duracao_minutos: PositiveInt | None = None
     tipo_atendimento: str | None = None
     observacoes: str | None = None
 
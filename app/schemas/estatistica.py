@@ -0,0 +1,20 @@
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel
+
+Agrupamento = Literal["unidade", "profissional", "dia"]
+
+
+class GrupoConsultas(BaseModel):
+    chave: int | date  # unidade_id, profissional_id ou dia, conforme o agrupamento
+    total: int
+    por_status: dict[str, int]
+
+
+class ResumoConsultas(BaseModel):
+    de: date
+    ate: date
+    agrupar: Agrupamento
+    total: int
+    grupos: list[GrupoConsultas]
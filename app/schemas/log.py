@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class LogRead(BaseModel):
+    id: int
+    usuario_id: int | None = None
+    acao: str
+    detalhes: str | None = None
+    criado_em: datetime
+
+    model_config = ConfigDict(from_attributes=True)
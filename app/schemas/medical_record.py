@@ -24,3 +24,16 @@ class ProntuarioRead(BaseModel):
     tipo_registro: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ProntuarioBuscaItem(BaseModel):
+    id: int
+    paciente_id: int
+    profissional_id: int
+    consulta_id: int | None = None
+    data_registro: datetime
+    tipo_registro: str
+    trecho: str  # trecho da descrição com os termos encontrados entre « »
+    relevancia: float  # BM25 (maior = mais relevante)
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,10 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Pagina(BaseModel, Generic[T]):
+    itens: list[T]
+    proximo_cursor: str | None = None
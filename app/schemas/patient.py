@@ -37,3 +37,17 @@ class PacienteUpdate(BaseModel):
     endereco: str | None = None
     plano_saude: str | None = None
     numero_carteirinha: str | None = None
+
+
+class PacienteBulkItem(BaseModel):
+    linha: int
+    sucesso: bool
+    id: int | None = None
+    erro: str | None = None
+
+
+class PacienteBulkResultado(BaseModel):
+    total: int
+    criados: int
+    erros: int
+    itens: list[PacienteBulkItem]
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
+
+TipoEvento = Literal["CONSULTA", "PRONTUARIO"]
+
+
+class EventoTimeline(BaseModel):
+    tipo: TipoEvento
+    id: int  # ID da consulta ou do prontuário, conforme o tipo
+    data: datetime  # data_hora da consulta ou data_registro do prontuário
+    profissional_id: int
+    categoria: str  # tipo_atendimento (consulta) ou tipo_registro (prontuário)
+    status: str | None = None  # só consultas
+    unidade_id: int | None = None  # só consultas
+    consulta_id: int | None = None  # prontuário vinculado a uma consulta
+    texto: str | None = None  # observações da consulta ou descrição do prontuário
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,404 @@
+import asyncio
+import threading
+import random
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import (
+    AGENDA_FIM_EXPEDIENTE_HORA,
+    AGENDA_INICIO_EXPEDIENTE_HORA,
+    AGENDA_SLOT_MINUTOS,
+)
+from app.models.consultation import Consulta
+from app.models.professional import Profissional
+
+# Consultas nesses status não ocupam horário na agenda
+STATUS_LIVRES = {"CANCELADA"}
+
+
+# Limite de parâmetros por "IN (...)" na conferência de versões
+TAMANHO_LOTE_IN = 500
+
+
+def ocupa_agenda(status_consulta: str) -> bool:
+    return status_consulta not in STATUS_LIVRES
+
+
+SLOT = timedelta(minutes=AGENDA_SLOT_MINUTOS)
+SLOTS_POR_DIA = (AGENDA_FIM_EXPEDIENTE_HORA - AGENDA_INICIO_EXPEDIENTE_HORA) * 60 // AGENDA_SLOT_MINUTOS
+MASCARA_DIA_CHEIO = (1 << SLOTS_POR_DIA) - 1
+
+
+def local_sem_fuso(data_hora: datetime) -> datetime:
+    """
+    Converte para o formato de ``data_hora`` das consultas (horário local,
+    sem fuso), o mesmo da grade de expediente. Horários sem fuso são
+    considerados já locais.
+    """
+    if data_hora.tzinfo is None:
+        return data_hora
+    return data_hora.astimezone().replace(tzinfo=None)
+
+
+def _expediente(dia: date) -> tuple[datetime, datetime]:
+    inicio = datetime.combine(dia, time(AGENDA_INICIO_EXPEDIENTE_HORA))
+    return inicio, inicio + SLOT * SLOTS_POR_DIA
+
+
+Intervalo = tuple[datetime, datetime, int]  # (inicio, fim, consulta_id)
+
+
+def _dois_maiores(*grupos: tuple[tuple[datetime, int], ...]) -> tuple[tuple[datetime, int], ...]:
+    return tuple(sorted((m for grupo in grupos for m in grupo), reverse=True)[:2])
+
+
+class _No:
+    __slots__ = ("intervalo", "prioridade", "esquerda", "direita", "maiores")
+
+    def __init__(self, intervalo: Intervalo):
+        self.intervalo = intervalo
+        self.prioridade = random.random()
+        self.esquerda: Optional[_No] = None
+        self.direita: Optional[_No] = None
+        self.maiores = ((intervalo[1], intervalo[2]),)
+
+    def atualizar(self) -> None:
+        self.maiores = _dois_maiores(
+            ((self.intervalo[1], self.intervalo[2]),),
+            self.esquerda.maiores if self.esquerda else (),
+            self.direita.maiores if self.direita else (),
+        )
+
+
+def _dividir(no: Optional[_No], chave: Intervalo) -> tuple[Optional[_No], Optional[_No]]:
+    """Separa em (intervalos < chave, intervalos >= chave)."""
+    if no is None:
+        return None, None
+    if no.intervalo < chave:
+        no.direita, resto = _dividir(no.direita, chave)
+        no.atualizar()
+        return no, resto
+    menores, no.esquerda = _dividir(no.esquerda, chave)
+    no.atualizar()
+    return menores, no
+
+
+def _juntar(a: Optional[_No], b: Optional[_No]) -> Optional[_No]:
+    """Junta duas árvores em que todos os intervalos de ``a`` precedem os de ``b``."""
+    if a is None or b is None:
+        return a or b
+    if a.prioridade > b.prioridade:
+        a.direita = _juntar(a.direita, b)
+        a.atualizar()
+        return a
+    b.esquerda = _juntar(a, b.esquerda)
+    b.atualizar()
+    return b
+
+
+class _ArvoreIntervalos:
+    """
+    Árvore de intervalos (treap ordenada pelo início) em que cada nó guarda
+    os dois maiores fins da sua subárvore. Inclusão, remoção e a consulta
+    dos maiores fins entre os intervalos que começam antes de um instante
+    custam O(log n) esperado.
+    """
+
+    def __init__(self):
+        self._raiz: Optional[_No] = None
+
+    def inserir(self, intervalo: Intervalo) -> None:
+        menores, maiores = _dividir(self._raiz, intervalo)
+        self._raiz = _juntar(_juntar(menores, _No(intervalo)), maiores)
+
+    def remover(self, intervalo: Intervalo) -> None:
+        menores, resto = _dividir(self._raiz, intervalo)
+        # O sucessor imediato de ``intervalo`` na ordem das tuplas
+        _, maiores = _dividir(resto, (intervalo[0], intervalo[1], intervalo[2] + 1))
+        self._raiz = _juntar(menores, maiores)
+
+    def maiores_fins_antes(self, instante: datetime) -> tuple[tuple[datetime, int], ...]:
+        """Dois maiores (fim, id) entre os intervalos que começam antes de ``instante``."""
+        maiores: tuple[tuple[datetime, int], ...] = ()
+        no = self._raiz
+        while no is not None:
+            if no.intervalo[0] < instante:
+                maiores = _dois_maiores(
+                    maiores,
+                    ((no.intervalo[1], no.intervalo[2]),),
+                    no.esquerda.maiores if no.esquerda else (),
+                )
+                no = no.direita
+            else:
+                no = no.esquerda
+        return maiores
+
+    def sobrepostos(self, inicio: datetime, fim: datetime) -> list[Intervalo]:
+        """Intervalos que cruzam [inicio, fim), em qualquer ordem."""
+        encontrados = []
+        pendentes = [self._raiz]
+        while pendentes:
+            no = pendentes.pop()
+            # Nenhum intervalo da subárvore termina depois de ``inicio``
+            if no is None or no.maiores[0][0] <= inicio:
+                continue
+            pendentes.append(no.esquerda)
+            if no.intervalo[0] < fim:
+                if no.intervalo[1] > inicio:
+                    encontrados.append(no.intervalo)
+                pendentes.append(no.direita)
+        return encontrados
+
+
+class AgendaProfissional:
+    """
+    Intervalos [inicio, fim) ocupados por um profissional.
+
+    Os intervalos carregados do banco podem se sobrepor (agendamentos
+    anteriores à verificação de conflito), então os fins não seguem a
+    ordem dos inícios. Ficam em uma árvore de intervalos (``_arvore``):
+    há conflito com [inicio, fim) se algum intervalo que começa antes de
+    ``fim`` termina depois de ``inicio``, ou seja, se o maior fim entre
+    eles passa de ``inicio``. Os dois maiores fins permitem que
+    ``ignorar_id`` descarte um deles.
+
+    Mantém também, por dia, um bitmap dos slots ocupados do expediente
+    (bit i = slot i a partir de AGENDA_INICIO_EXPEDIENTE_HORA), atualizado
+    a cada inclusão/remoção apenas nos dias afetados.
+
+    ``versao`` é o ``profissionais.agenda_versao`` refletido pela cópia
+    (ver ``sincronizar_agenda``).
+    """
+
+    def __init__(self, intervalos: list[Intervalo], versao: Optional[int] = None):
+        # Serializa verificação + commit de agendamentos do mesmo profissional.
+        # As rotas rodam no event loop e esperam o commit com o lock tomado,
+        # por isso um asyncio.Lock (um lock de thread não isolaria corrotinas).
+        self.lock = asyncio.Lock()
+        self.substituir(intervalos, versao)
+
+    def substituir(self, intervalos: list[Intervalo], versao: Optional[int]) -> None:
+        self._arvore = _ArvoreIntervalos()
+        self._por_id: dict[int, Intervalo] = {}
+        self._ocupacao: dict[date, int] = {}
+        for inicio, fim, consulta_id in intervalos:
+            intervalo = (local_sem_fuso(inicio), local_sem_fuso(fim), consulta_id)
+            self._arvore.inserir(intervalo)
+            self._por_id[consulta_id] = intervalo
+            for dia in self._dias(intervalo[0], intervalo[1]):
+                self._ocupacao[dia] = self._ocupacao.get(dia, 0) | self._bits(dia, intervalo[0], intervalo[1])
+        self.versao = versao
+
+    def conflito(
+        self,
+        inicio: datetime,
+        fim: datetime,
+        ignorar_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Retorna o ID de uma consulta que se sobreponha a [inicio, fim), se houver.
+        """
+        inicio, fim = local_sem_fuso(inicio), local_sem_fuso(fim)
+        for fim_existente, consulta_id in self._arvore.maiores_fins_antes(fim):
+            if consulta_id != ignorar_id:
+                return consulta_id if fim_existente > inicio else None
+        return None
+
+    def adicionar(self, inicio: datetime, fim: datetime, consulta_id: int) -> None:
+        self.remover(consulta_id)
+        intervalo = (local_sem_fuso(inicio), local_sem_fuso(fim), consulta_id)
+        self._arvore.inserir(intervalo)
+        self._por_id[consulta_id] = intervalo
+        self._recalcular_ocupacao(intervalo[0], intervalo[1])
+
+    def remover(self, consulta_id: int) -> None:
+        intervalo = self._por_id.pop(consulta_id, None)
+        if intervalo is None:
+            return
+        self._arvore.remover(intervalo)
+        self._recalcular_ocupacao(intervalo[0], intervalo[1])
+
+    def slots_livres(self, de: datetime, ate: datetime, limite: int) -> list[tuple[datetime, datetime]]:
+        """
+        Primeiros ``limite`` slots livres entre ``de`` e ``ate``, lidos
+        direto dos bitmaps diários (sem percorrer as consultas).
+        """
+        de, ate = local_sem_fuso(de), local_sem_fuso(ate)
+        livres: list[tuple[datetime, datetime]] = []
+        dia = de.date()
+        while dia <= ate.date() and len(livres) < limite:
+            mascara = ~self._ocupacao.get(dia, 0) & MASCARA_DIA_CHEIO
+            inicio_expediente, _ = _expediente(dia)
+            while mascara and len(livres) < limite:
+                bit = mascara & -mascara
+                inicio = inicio_expediente + SLOT * (bit.bit_length() - 1)
+                if inicio >= de and inicio + SLOT <= ate:
+                    livres.append((inicio, inicio + SLOT))
+                mascara ^= bit
+            dia += timedelta(days=1)
+        return livres
+
+    @staticmethod
+    def _dias(inicio: datetime, fim: datetime) -> list[date]:
+        dias = []
+        dia = inicio.date()
+        while dia <= (fim - timedelta(microseconds=1)).date():
+            dias.append(dia)
+            dia += timedelta(days=1)
+        return dias
+
+    @staticmethod
+    def _bits(dia: date, inicio: datetime, fim: datetime) -> int:
+        inicio_expediente, fim_expediente = _expediente(dia)
+        inicio, fim = max(inicio, inicio_expediente), min(fim, fim_expediente)
+        if inicio >= fim:
+            return 0
+        primeiro = (inicio - inicio_expediente) // SLOT
+        ultimo = -((inicio_expediente - fim) // SLOT)  # arredonda para cima
+        return ((1 << (ultimo - primeiro)) - 1) << primeiro
+
+    def _recalcular_ocupacao(self, inicio: datetime, fim: datetime) -> None:
+        for dia in self._dias(inicio, fim):
+            inicio_expediente, fim_expediente = _expediente(dia)
+            mascara = 0
+            for intervalo in self._arvore.sobrepostos(inicio_expediente, fim_expediente):
+                mascara |= self._bits(dia, intervalo[0], intervalo[1])
+            if mascara:
+                self._ocupacao[dia] = mascara
+            else:
+                self._ocupacao.pop(dia, None)
+
+
+async def _ler_intervalos(db: AsyncSession, profissional_id: int) -> list[tuple[datetime, datetime, int]]:
+    # Usa o índice (profissional_id, data_hora) de consultas
+    linhas = (await db.execute(
+        select(Consulta.id, Consulta.data_hora, Consulta.duracao_minutos)
+        .where(Consulta.profissional_id == profissional_id)
+        .where(Consulta.status.notin_(STATUS_LIVRES))
+        .order_by(Consulta.data_hora)
+    )).all()
+    return [
+        (l.data_hora, l.data_hora + timedelta(minutes=l.duracao_minutos), l.id)
+        for l in linhas
+    ]
+
+
+class RegistroAgendas:
+    """
+    Agendas em memória, carregadas sob demanda por profissional.
+
+    O estado é local ao processo: com vários workers, cada um mantém a sua
+    cópia. As gravações chamam ``sincronizar_agenda`` e
+    ``confirmar_agenda``, que comparam a cópia com
+    ``profissionais.agenda_versao`` dentro da transação de escrita; as
+    leituras usam ``obter_atualizadas``.
+    """
+
+    def __init__(self):
+        self._agendas: dict[int, AgendaProfissional] = {}
+        self._lock = threading.Lock()
+
+    async def obter(self, db: AsyncSession, profissional_id: int) -> AgendaProfissional:
+        agenda = self._agendas.get(profissional_id)
+        if agenda is not None:
+            return agenda
+
+        # Versão antes das consultas: uma gravação entre as duas leituras
+        # deixa a versão atrasada, e a próxima sincronização recarrega
+        versao = await db.scalar(
+            select(Profissional.agenda_versao).where(Profissional.id == profissional_id)
+        )
+        carregada = AgendaProfissional(await _ler_intervalos(db, profissional_id), versao)
+
+        with self._lock:
+            return self._agendas.setdefault(profissional_id, carregada)
+
+    async def obter_atualizadas(
+        self, db: AsyncSession, profissional_ids: list[int]
+    ) -> dict[int, AgendaProfissional]:
+        """
+        Agendas para leitura (busca de disponibilidade), conferidas contra
+        ``profissionais.agenda_versao`` com uma consulta por lote de IDs: a
+        cópia cuja versão ficou para trás (gravação de outro worker) é
+        recarregada antes da resposta.
+        """
+        versoes: dict[int, int] = {}
+        for i in range(0, len(profissional_ids), TAMANHO_LOTE_IN):
+            lote = profissional_ids[i:i + TAMANHO_LOTE_IN]
+            versoes.update((await db.execute(
+                select(Profissional.id, Profissional.agenda_versao).where(Profissional.id.in_(lote))
+            )).all())
+
+        atualizadas = {}
+        for profissional_id, versao in versoes.items():
+            agenda = await self.obter(db, profissional_id)
+            if agenda.versao != versao:
+                # Sob o lock: não sobrescreve uma gravação deste worker em curso
+                async with agenda.lock:
+                    if agenda.versao != versao:
+                        agenda.substituir(await _ler_intervalos(db, profissional_id), versao)
+            atualizadas[profissional_id] = agenda
+        return atualizadas
+
+    def descartar(self, profissional_id: Optional[int] = None) -> None:
+        with self._lock:
+            if profissional_id is None:
+                self._agendas.clear()
+            else:
+                self._agendas.pop(profissional_id, None)
+
+
+agendas = RegistroAgendas()
+
+
+async def sincronizar_agenda(db: AsyncSession, agenda: AgendaProfissional, profissional_id: int) -> None:
+    """
+    Início da gravação de uma consulta, com ``agenda.lock`` tomado e antes
+    da verificação de conflito.
+
+    O UPDATE sem efeito em ``agenda_versao`` abre a transação de escrita:
+    no SQLite, gravações de outros workers esperam até o commit desta, e a
+    versão devolvida é a última gravada. Se ela não é a da cópia em
+    memória, outro processo mudou a agenda: recarrega dentro da transação.
+    """
+    profissionais = Profissional.__table__
+    versao = await db.scalar(
+        update(profissionais)
+        .where(profissionais.c.id == profissional_id)
+        .values(agenda_versao=profissionais.c.agenda_versao)
+        .returning(profissionais.c.agenda_versao)
+    )
+    if versao != agenda.versao:
+        agenda.substituir(await _ler_intervalos(db, profissional_id), versao)
+
+
+async def confirmar_agenda(db: AsyncSession, agenda: AgendaProfissional, profissional_id: int) -> None:
+    """
+    Commit da gravação iniciada por ``sincronizar_agenda``. A versão que a
+    cópia passa a refletir é lida depois do flush (o incremento vem dos
+    eventos de versionamento.py), ainda com a trava de escrita.
+    """
+    await db.flush()
+    versao = await db.scalar(
+        select(Profissional.agenda_versao).where(Profissional.id == profissional_id)
+    )
+    await db.commit()
+    agenda.versao = versao
+
+
+def garantir_horario_livre(
+    agenda: AgendaProfissional,
+    inicio: datetime,
+    fim: datetime,
+    ignorar_id: Optional[int] = None,
+) -> None:
+    conflito = agenda.conflito(inicio, fim, ignorar_id)
+    if conflito is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"O profissional já possui a consulta ID={conflito} nesse horário.",
+        )
@@ -0,0 +1,245 @@
+"""
+Retenção de logs_sistema com arquivamento compactado.
+
+Registros mais antigos que a retenção saem do banco para segmentos
+mensais ``logs-AAAA-MM.ndjson.gz`` (uma linha JSON por registro). Cada
+lote é acrescentado ao segmento como um novo membro gzip (o arquivo
+nunca é reescrito) e só depois removido do banco, em uma transação
+curta por lote para não segurar o lock de escrita do SQLite.
+
+Todo worker da aplicação tem o seu arquivador. A transação de cada lote
+começa com ``BEGIN IMMEDIATE``: o lote é lido já com a trava de escrita,
+e outro processo que arquive ao mesmo tempo espera o commit e encontra
+o lote seguinte, em vez de gravar os mesmos registros de novo.
+
+Só se o processo cair entre a gravação do segmento e o commit o lote é
+arquivado de novo na próxima execução; a leitura descarta esses IDs
+repetidos.
+
+Execução avulsa (ex.: cron, ou com a aplicação parada):
+
+    python -m app.services.arquivo_logs
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+from sqlalchemy import delete, select
+
+from app.core.config import (
+    LOGS_ARQUIVAMENTO_INTERVALO_SEGUNDOS,
+    LOGS_ARQUIVAMENTO_LOTE,
+    LOGS_ARQUIVO_DIR,
+    LOGS_RETENCAO_DIAS,
+)
+from app.database import SessionLocal
+from app.models.log import LogSistema
+from app.services.logs import utc_sem_fuso
+
+logger = logging.getLogger(__name__)
+
+_COLUNAS = (
+    LogSistema.id,
+    LogSistema.usuario_id,
+    LogSistema.acao,
+    LogSistema.detalhes,
+    LogSistema.criado_em,
+)
+
+
+def _mes(data: date) -> str:
+    return f"{data.year:04d}-{data.month:02d}"
+
+
+def caminho_segmento(diretorio: Path, mes: str) -> Path:
+    return diretorio / f"logs-{mes}.ndjson.gz"
+
+
+def _acrescentar(caminho: Path, registros: list[dict]) -> None:
+    conteudo = "".join(
+        json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in registros
+    ).encode()
+    with open(caminho, "ab") as arquivo:
+        arquivo.write(gzip.compress(conteudo))
+        arquivo.flush()
+        # O lote só pode sair do banco depois de estar no disco
+        os.fsync(arquivo.fileno())
+
+
+class ArquivadorLogs:
+    """
+    Move periodicamente os logs vencidos para o arquivo, em uma thread
+    própria (mesmo modelo do GravadorAuditoria).
+    """
+
+    def __init__(
+        self,
+        diretorio: str = LOGS_ARQUIVO_DIR,
+        retencao_dias: int = LOGS_RETENCAO_DIAS,
+        tamanho_lote: int = LOGS_ARQUIVAMENTO_LOTE,
+        intervalo: float = LOGS_ARQUIVAMENTO_INTERVALO_SEGUNDOS,
+    ):
+        self.diretorio = Path(diretorio)
+        self._retencao = timedelta(days=retencao_dias)
+        self._tamanho_lote = tamanho_lote
+        self._intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.execucoes = 0
+        self.arquivados = 0
+        self.falhas = 0
+        self.ultima_execucao: Optional[datetime] = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self) -> None:
+        if self.ativo or not self._retencao:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._executar,
+            name="arquivador-logs",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def parar(self, timeout: float = 10.0) -> None:
+        """
+        Interrompe a thread ao fim do lote em andamento.
+        """
+        if not self.ativo:
+            return
+        self._parar.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            try:
+                self.arquivar()
+            except Exception:
+                logger.exception("Falha no arquivamento de logs.")
+                with self._lock:
+                    self.falhas += 1
+            self._parar.wait(self._intervalo)
+
+    def arquivar(self, antes_de: Optional[datetime] = None) -> int:
+        """
+        Arquiva e remove, lote a lote, os logs criados antes de
+        ``antes_de`` (padrão: agora menos a retenção; retenção 0 não
+        arquiva nada). Retorna quantos registros foram arquivados.
+        """
+        if antes_de is None:
+            if not self._retencao:
+                return 0
+            antes_de = datetime.utcnow() - self._retencao
+
+        total = 0
+        while not self._parar.is_set():
+            with SessionLocal() as db:
+                # Trava de escrita antes de ler o lote (ver docstring do módulo)
+                db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+                linhas = db.execute(
+                    select(*_COLUNAS)
+                    .where(LogSistema.criado_em < antes_de)
+                    .order_by(LogSistema.criado_em, LogSistema.id)
+                    .limit(self._tamanho_lote)
+                ).all()
+                if not linhas:
+                    break
+                self.diretorio.mkdir(parents=True, exist_ok=True)
+
+                por_mes: dict[str, list[dict]] = {}
+                for linha in linhas:
+                    registro = linha._asdict()
+                    registro["criado_em"] = linha.criado_em.isoformat()
+                    por_mes.setdefault(_mes(linha.criado_em), []).append(registro)
+                for mes, registros in por_mes.items():
+                    _acrescentar(caminho_segmento(self.diretorio, mes), registros)
+
+                db.execute(delete(LogSistema).where(LogSistema.id.in_([l.id for l in linhas])))
+                db.commit()
+
+            total += len(linhas)
+            with self._lock:
+                self.arquivados += len(linhas)
+
+        with self._lock:
+            self.execucoes += 1
+            self.ultima_execucao = datetime.utcnow()
+        return total
+
+    def ler(
+        self,
+        de: datetime,
+        ate: datetime,
+        usuario_id: Optional[int] = None,
+        acao: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """
+        Registros arquivados com ``de <= criado_em < ate``, em ordem de
+        arquivamento, sem IDs repetidos. Só abre os segmentos dos meses
+        do período.
+        """
+        de, ate = utc_sem_fuso(de), utc_sem_fuso(ate)
+        vistos: set[int] = set()
+        mes = date(de.year, de.month, 1)
+        while mes <= ate.date():
+            caminho = caminho_segmento(self.diretorio, _mes(mes))
+            if caminho.exists():
+                with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+                    for linha in arquivo:
+                        registro = json.loads(linha)
+                        if registro["id"] in vistos:
+                            continue
+                        criado_em = datetime.fromisoformat(registro["criado_em"])
+                        if not de <= criado_em < ate:
+                            continue
+                        if usuario_id is not None and registro["usuario_id"] != usuario_id:
+                            continue
+                        if acao is not None and registro["acao"] != acao:
+                            continue
+                        vistos.add(registro["id"])
+                        registro["criado_em"] = criado_em
+                        yield registro
+            mes = (mes + timedelta(days=32)).replace(day=1)
+
+    def estatisticas(self) -> dict:
+        segmentos = sorted(self.diretorio.glob("logs-*.ndjson.gz")) if self.diretorio.exists() else []
+        with self._lock:
+            return {
+                "ativo": self.ativo,
+                "retencao_dias": self._retencao.days,
+                "execucoes": self.execucoes,
+                "arquivados": self.arquivados,
+                "falhas": self.falhas,
+                "ultima_execucao": self.ultima_execucao,
+                "segmentos": len(segmentos),
+                "bytes_arquivo": sum(s.stat().st_size for s in segmentos),
+            }
+
+
+arquivador_logs = ArquivadorLogs()
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(
+        description="Arquiva os logs_sistema mais antigos que a retenção configurada."
+    ).parse_args()
+    inicio = time.perf_counter()
+    total = arquivador_logs.arquivar()
+    print(
+        f"{total} logs arquivados em {arquivador_logs.diretorio} "
+        f"em {time.perf_counter() - inicio:.2f}s"
+    )
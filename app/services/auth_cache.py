@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import PRINCIPAIS_CACHE_CAPACIDADE, PRINCIPAIS_CACHE_TTL_SEGUNDOS
+from app.models.user import User
+
+
+class CachePrincipais:
+    """
+    Cache LRU com TTL dos usuários autenticados, indexado por (id, token).
+
+    Cada entrada expira no que vier primeiro: ``ttl`` segundos ou a
+    expiração do próprio token. Os objetos guardados estão desanexados
+    de qualquer sessão e devem ser tratados como somente leitura.
+    """
+
+    def __init__(
+        self,
+        capacidade: int = PRINCIPAIS_CACHE_CAPACIDADE,
+        ttl: float = PRINCIPAIS_CACHE_TTL_SEGUNDOS,
+    ):
+        self._capacidade = capacidade
+        self._ttl = ttl
+        self._entradas: OrderedDict[tuple[int, str], tuple[float, User]] = OrderedDict()
+        self._por_usuario: dict[int, set[tuple[int, str]]] = {}
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    def obter(self, user_id: int, token: str) -> Optional[User]:
+        chave = (user_id, token)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return None
+
+            expira_em, user = entrada
+            if expira_em <= time.time():
+                self._remover(chave)
+                self.falhas += 1
+                return None
+
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return user
+
+    def guardar(self, user_id: int, token: str, user: User, token_expira_em: float) -> None:
+        chave = (user_id, token)
+        expira_em = min(time.time() + self._ttl, token_expira_em)
+        with self._lock:
+            self._entradas[chave] = (expira_em, user)
+            self._entradas.move_to_end(chave)
+            self._por_usuario.setdefault(user_id, set()).add(chave)
+
+            while len(self._entradas) > self._capacidade:
+                antiga, _ = next(iter(self._entradas.items()))
+                self._remover(antiga)
+
+    def invalidar_usuario(self, user_id: int) -> None:
+        """
+        Remove todas as entradas (todos os tokens) de um usuário.
+        """
+        with self._lock:
+            for chave in self._por_usuario.pop(user_id, set()):
+                self._entradas.pop(chave, None)
+            self.invalidacoes += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._por_usuario.clear()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "entradas": len(self._entradas),
+                "capacidade": self._capacidade,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "invalidacoes": self.invalidacoes,
+            }
+
+    def _remover(self, chave: tuple[int, str]) -> None:
+        self._entradas.pop(chave, None)
+        chaves = self._por_usuario.get(chave[0])
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del self._por_usuario[chave[0]]
+
+
+cache_principais = CachePrincipais()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidar_usuario_alterado(mapper, connection, target: User) -> None:
+    # Qualquer alteração/remoção de usuário feita pelo ORM derruba o cache dele
+    cache_principais.invalidar_usuario(target.id)
@@ -0,0 +1,117 @@
+"""
+Busca de texto completo em prontuarios.descricao (FTS5).
+
+Reconstrução do índice (ex.: após restaurar um backup ou carregar dados
+com os gatilhos desativados):
+
+    python -m app.services.busca_prontuarios
+"""
+import argparse
+import re
+import time
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, Integer, String, column, func, literal_column, select, table
+
+from app.database import engine
+from app.models.medical_record import Prontuario, criar_indice_busca
+from app.models.professional import Profissional
+from app.services.serializacao import restringir
+
+MARCA_INICIO = "«"
+MARCA_FIM = "»"
+# Tamanho máximo do trecho, em tokens
+TAMANHO_TRECHO = 16
+
+# Palavra, opcionalmente seguida de * (busca por prefixo)
+_TERMO = re.compile(r"(\w+)(\*?)")
+_OPERADORES_FTS = {"AND", "OR", "NOT", "NEAR"}
+
+_fts = table("prontuarios_fts", column("rowid", Integer))
+_fts_tabela = literal_column("prontuarios_fts")
+
+
+def consulta_fts(q: str) -> str:
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: cada palavra
+    vira um termo entre aspas (todos obrigatórios) e ``*`` no fim de uma
+    palavra busca por prefixo. Operadores e pontuação são ignorados.
+    """
+    termos = [
+        f'"{palavra}"{prefixo}'
+        for palavra, prefixo in _TERMO.findall(q)
+        if palavra not in _OPERADORES_FTS
+    ]
+    if not termos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe ao menos um termo de busca.",
+        )
+    return " ".join(termos)
+
+
+def montar_busca(
+    q: str,
+    paciente_id: Optional[int] = None,
+    profissional_id: Optional[int] = None,
+    unidade_id: Optional[int] = None,
+    campos: Optional[tuple[str, ...]] = None,
+):
+    """
+    Subconsulta com os prontuários que casam com ``q``, o trecho
+    destacado e a relevância (BM25 com sinal invertido: maior = melhor).
+    Com ``campos``, só essas colunas (e a chave relevância, id): sem
+    ``trecho``, o ``snippet()`` não é calculado.
+    """
+    relevancia = (-func.bm25(_fts_tabela, type_=Float)).label("relevancia")
+    trecho = func.snippet(
+        _fts_tabela, 0, MARCA_INICIO, MARCA_FIM, "…", TAMANHO_TRECHO, type_=String
+    ).label("trecho")
+
+    stmt = (
+        select(
+            Prontuario.id,
+            Prontuario.paciente_id,
+            Prontuario.profissional_id,
+            Prontuario.consulta_id,
+            Prontuario.data_registro,
+            Prontuario.tipo_registro,
+            trecho,
+            relevancia,
+        )
+        .select_from(_fts)
+        .join(Prontuario, Prontuario.id == _fts.c.rowid)
+        .where(_fts_tabela.op("MATCH")(consulta_fts(q)))
+    )
+    stmt = restringir(stmt, campos, (relevancia, Prontuario.id))
+    if paciente_id is not None:
+        stmt = stmt.where(Prontuario.paciente_id == paciente_id)
+    if profissional_id is not None:
+        stmt = stmt.where(Prontuario.profissional_id == profissional_id)
+    if unidade_id is not None:
+        stmt = stmt.join(Profissional, Profissional.id == Prontuario.profissional_id).where(
+            Profissional.unidade_id == unidade_id
+        )
+    return stmt.subquery("busca")
+
+
+def reconstruir_indice() -> int:
+    """
+    Recria o índice a partir de prontuarios e o compacta. Retorna o
+    número de prontuários indexados.
+    """
+    with engine.begin() as conexao:
+        if not criar_indice_busca(conexao):
+            conexao.exec_driver_sql("INSERT INTO prontuarios_fts(prontuarios_fts) VALUES ('rebuild')")
+        conexao.exec_driver_sql("INSERT INTO prontuarios_fts(prontuarios_fts) VALUES ('optimize')")
+        return conexao.exec_driver_sql("SELECT count(*) FROM prontuarios").scalar()
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(
+        description="Reconstrói o índice de texto completo dos prontuários (FTS5)."
+    ).parse_args()
+    inicio = time.perf_counter()
+    total = reconstruir_indice()
+    print(f"{total} prontuários indexados em {time.perf_counter() - inicio:.2f}s")
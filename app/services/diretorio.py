@@ -0,0 +1,252 @@
+import asyncio
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import DIRETORIO_TTL_SEGUNDOS
+from app.models.professional import Profissional
+from app.models.unit import Unidade
+from app.models.user import User
+from app.schemas.professional import ProfissionalRead
+from app.schemas.unit import UnidadeRead
+from app.services.pagination import (
+    ParametrosPaginacao,
+    decodificar_cursor,
+    montar_pagina,
+)
+from app.services.serializacao import selecionar
+
+CHAVES_UNIDADE = (Unidade.id,)
+CHAVES_PROFISSIONAL = (Profissional.id,)
+
+
+def consulta_profissional_read():
+    """
+    Projeção de ProfissionalRead em uma única query, com JOIN em usuarios.
+    """
+    return select(
+        Profissional.id,
+        Profissional.usuario_id,
+        User.nome_completo,
+        User.email,
+        Profissional.cpf,
+        Profissional.registro_conselho,
+        Profissional.tipo_conselho,
+        Profissional.especialidade,
+        Profissional.unidade_id,
+    ).join(User, User.id == Profissional.usuario_id)
+
+
+class _Colecao:
+    """
+    Entradas de uma entidade por id, com os ids também mantidos em
+    ordem para paginar por chave sem ordenar a cada requisição.
+
+    ``geracao`` muda a cada alteração do conteúdo (ETag das listagens).
+    ``dados`` guarda cada item já convertido em dicionário, para as
+    listagens saírem direto para o JSON (serializacao.py).
+    """
+
+    def __init__(self):
+        self.itens: dict[int, BaseModel] = {}
+        self.dados: dict[int, dict] = {}
+        self.ids: list[int] = []
+        self.geracao = 0
+        self.acertos = 0
+        self.falhas = 0
+
+    def substituir(self, itens: list[BaseModel]) -> None:
+        self.itens = {item.id: item for item in itens}
+        self.dados = {item.id: item.model_dump() for item in itens}
+        self.ids = sorted(self.itens)
+        self.geracao += 1
+
+    def guardar(self, item: BaseModel) -> None:
+        if item.id not in self.itens:
+            insort(self.ids, item.id)
+        self.itens[item.id] = item
+        self.dados[item.id] = item.model_dump()
+        self.geracao += 1
+
+    def remover(self, item_id: int) -> None:
+        if self.itens.pop(item_id, None) is not None:
+            del self.dados[item_id]
+            del self.ids[bisect_left(self.ids, item_id)]
+            self.geracao += 1
+
+    def apos(self, item_id: Optional[int], quantidade: int) -> list[BaseModel]:
+        inicio = bisect_right(self.ids, item_id) if item_id is not None else 0
+        return [self.itens[i] for i in self.ids[inicio:inicio + quantidade]]
+
+    def pagina(
+        self,
+        chaves,
+        pagina: ParametrosPaginacao,
+        campos: Optional[tuple[str, ...]] = None,
+    ) -> dict:
+        apos = decodificar_cursor(pagina.cursor, chaves)[0] if pagina.cursor else None
+        conteudo = montar_pagina(self.apos(apos, pagina.limit + 1), chaves, pagina)
+        conteudo["itens"] = [selecionar(self.dados[item.id], campos) for item in conteudo["itens"]]
+        return conteudo
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.falhas
+        return {
+            "entradas": len(self.itens),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": self.acertos / total if total else 0.0,
+        }
+
+
+class DiretorioReferencia:
+    """
+    Cópia em memória de unidades e profissionais (dados de referência:
+    mudam pouco e são lidos o tempo todo).
+
+    É carregado inteiro na inicialização e mantido pelas rotas de escrita
+    de unidades e profissionais, que gravam aqui logo após o commit. Uma
+    consulta por ID que não esteja no diretório vai ao banco e, se achar,
+    guarda o resultado. Como o estado é local ao processo, gravações de
+    outros workers só aparecem na próxima recarga completa (a cada
+    ``ttl`` segundos ou via rota administrativa).
+
+    Todo acesso acontece no event loop, então não há lock além do que
+    evita duas recargas simultâneas.
+    """
+
+    def __init__(self, ttl: float = DIRETORIO_TTL_SEGUNDOS):
+        self._ttl = ttl
+        self._carregado_em: Optional[float] = None
+        self._lock_recarga = asyncio.Lock()
+        self.unidades = _Colecao()
+        self.profissionais = _Colecao()
+        self.recargas = 0
+
+    async def carregar(self, db: AsyncSession) -> None:
+        unidades = (await db.execute(select(Unidade))).scalars().all()
+        profissionais = (await db.execute(consulta_profissional_read())).all()
+
+        self.unidades.substituir([UnidadeRead.model_validate(u) for u in unidades])
+        self.profissionais.substituir(
+            [ProfissionalRead.model_validate(p) for p in profissionais]
+        )
+        self._carregado_em = time.monotonic()
+        self.recargas += 1
+
+    async def _garantir_atual(self, db: AsyncSession) -> None:
+        if self._carregado_em is not None and time.monotonic() - self._carregado_em < self._ttl:
+            return
+        async with self._lock_recarga:
+            # Outra corrotina pode ter recarregado enquanto esta esperava o lock
+            if self._carregado_em is None or time.monotonic() - self._carregado_em >= self._ttl:
+                await self.carregar(db)
+
+    # Unidades
+
+    async def obter_unidade(self, db: AsyncSession, unidade_id: int) -> Optional[UnidadeRead]:
+        await self._garantir_atual(db)
+        unidade = self.unidades.itens.get(unidade_id)
+        if unidade is not None:
+            self.unidades.acertos += 1
+            return unidade
+
+        self.unidades.falhas += 1
+        encontrada = await db.get(Unidade, unidade_id)
+        if encontrada is None:
+            return None
+        unidade = UnidadeRead.model_validate(encontrada)
+        self.unidades.guardar(unidade)
+        return unidade
+
+    async def geracao_unidades(self, db: AsyncSession) -> int:
+        await self._garantir_atual(db)
+        return self.unidades.geracao
+
+    async def listar_unidades(
+        self,
+        db: AsyncSession,
+        pagina: ParametrosPaginacao,
+        campos: Optional[tuple[str, ...]] = None,
+    ) -> dict:
+        await self._garantir_atual(db)
+        self.unidades.acertos += 1
+        return self.unidades.pagina(CHAVES_UNIDADE, pagina, campos)
+
+    def guardar_unidade(self, unidade: UnidadeRead) -> None:
+        self.unidades.guardar(unidade)
+
+    def remover_unidade(self, unidade_id: int) -> None:
+        self.unidades.remover(unidade_id)
+
+    # Profissionais
+
+    async def obter_profissional(
+        self, db: AsyncSession, profissional_id: int
+    ) -> Optional[ProfissionalRead]:
+        await self._garantir_atual(db)
+        profissional = self.profissionais.itens.get(profissional_id)
+        if profissional is not None:
+            self.profissionais.acertos += 1
+            return profissional
+
+        self.profissionais.falhas += 1
+        linha = (
+            await db.execute(
+                consulta_profissional_read().where(Profissional.id == profissional_id)
+            )
+        ).first()
+        if linha is None:
+            return None
+        profissional = ProfissionalRead.model_validate(linha)
+        self.profissionais.guardar(profissional)
+        return profissional
+
+    async def listar_profissionais(
+        self,
+        db: AsyncSession,
+        pagina: ParametrosPaginacao,
+        campos: Optional[tuple[str, ...]] = None,
+    ) -> dict:
+        await self._garantir_atual(db)
+        self.profissionais.acertos += 1
+        return self.profissionais.pagina(CHAVES_PROFISSIONAL, pagina, campos)
+
+    async def filtrar_profissionais(
+        self,
+        db: AsyncSession,
+        especialidade: str,
+        unidade_id: Optional[int] = None,
+    ) -> list[ProfissionalRead]:
+        await self._garantir_atual(db)
+        self.profissionais.acertos += 1
+        return [
+            p
+            for p in self.profissionais.apos(None, len(self.profissionais.ids))
+            if p.especialidade == especialidade
+            and (unidade_id is None or p.unidade_id == unidade_id)
+        ]
+
+    def guardar_profissional(self, profissional: ProfissionalRead) -> None:
+        self.profissionais.guardar(profissional)
+
+    def remover_profissional(self, profissional_id: int) -> None:
+        self.profissionais.remover(profissional_id)
+
+    def estatisticas(self) -> dict:
+        return {
+            "unidades": self.unidades.estatisticas(),
+            "profissionais": self.profissionais.estatisticas(),
+            "recargas": self.recargas,
+            "idade_segundos": (
+                time.monotonic() - self._carregado_em if self._carregado_em is not None else None
+            ),
+            "ttl_segundos": self._ttl,
+        }
+
+
+diretorio = DiretorioReferencia()
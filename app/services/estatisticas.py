@@ -0,0 +1,63 @@
+"""
+Relatórios de volume de consultas, respondidos a partir de
+estatisticas_consultas (sem ler a tabela consultas).
+
+Reconstrução da tabela (ex.: após cargas via Core ou restaurar um backup):
+
+    python -m app.services.estatisticas
+"""
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy import func, select
+
+from app.database import engine
+from app.models.estatistica import EstatisticaConsulta, reconstruir_estatisticas
+
+AGRUPAMENTOS = {
+    "unidade": EstatisticaConsulta.unidade_id,
+    "profissional": EstatisticaConsulta.profissional_id,
+    "dia": EstatisticaConsulta.dia,
+}
+
+
+def consulta_resumo(de: date, ate: date, agrupar: str):
+    """
+    Totais por grupo e status no período ``[de, ate]`` (percorre a
+    chave primária a partir de ``de``).
+    """
+    grupo = AGRUPAMENTOS[agrupar]
+    total = func.sum(EstatisticaConsulta.total)
+    return (
+        select(grupo.label("chave"), EstatisticaConsulta.status, total.label("total"))
+        .where(EstatisticaConsulta.dia.between(de, ate))
+        .group_by(grupo, EstatisticaConsulta.status)
+        .having(total > 0)
+        .order_by(grupo, EstatisticaConsulta.status)
+    )
+
+
+def montar_resumo(linhas, de: date, ate: date, agrupar: str) -> dict:
+    grupos: dict = {}
+    for chave, status_consulta, total in linhas:
+        grupo = grupos.setdefault(chave, {"chave": chave, "total": 0, "por_status": {}})
+        grupo["total"] += total
+        grupo["por_status"][status_consulta] = total
+    return {
+        "de": de,
+        "ate": ate,
+        "agrupar": agrupar,
+        "total": sum(g["total"] for g in grupos.values()),
+        "grupos": list(grupos.values()),
+    }
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(
+        description="Recalcula estatisticas_consultas a partir da tabela consultas."
+    ).parse_args()
+    inicio = time.perf_counter()
+    with engine.begin() as conexao:
+        linhas = reconstruir_estatisticas(conexao)
+    print(f"{linhas} linhas agregadas em {time.perf_counter() - inicio:.2f}s")
@@ -0,0 +1,51 @@
+import hashlib
+import secrets
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Identifica o processo: ETags derivadas de estado em memória (diretório)
+# não podem coincidir com as de outro worker ou de uma execução anterior
+NONCE_PROCESSO = secrets.token_hex(4)
+
+# 304 em rotas que validam If-None-Match (documentação OpenAPI)
+RESPOSTA_304 = {304: {"description": "Não modificado (If-None-Match confere com a ETag)."}}
+
+
+def gerar_etag(*partes, campos: Optional[tuple[str, ...]] = None) -> str:
+    """
+    ETag forte a partir das partes que identificam a versão do recurso.
+
+    ``campos`` é a seleção de ``?fields=`` já normalizada (ordem do
+    schema, ver ``parametro_campos``): cada seleção é uma representação
+    diferente e ganha um sufixo próprio; sem seleção a ETag não muda.
+    """
+    if campos is not None:
+        resumo = hashlib.blake2s(",".join(campos).encode(), digest_size=4).hexdigest()
+        partes = (*partes, f"f{resumo}")
+    return '"' + "-".join(str(p) for p in partes) + '"'
+
+
+def etag_confere(request: Request, etag: str) -> bool:
+    """
+    Compara If-None-Match com a ETag atual (comparação forte; ETags
+    fracas ``W/"..."`` nunca conferem).
+    """
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+    return etag in (t.strip() for t in cabecalho.split(","))
+
+
+def aplicar_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Dados de saúde: só cache do próprio cliente, sempre revalidado
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def nao_modificado(etag: str) -> Response:
+    resposta = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    aplicar_etag(resposta, etag)
+    return resposta
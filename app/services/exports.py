@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.database import ReadSessionLocal
+
+FormatoExportacao = Literal["ndjson", "csv"]
+
+# Quantidade de linhas buscadas do cursor a cada ida ao banco
+TAMANHO_LOTE = 1000
+
+
+def _valor(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def _gerar_ndjson(stmt: Select) -> Iterator[str]:
+    with ReadSessionLocal() as db:
+        resultado = db.execute(stmt.execution_options(yield_per=TAMANHO_LOTE))
+        for lote in resultado.partitions():
+            yield "".join(
+                json.dumps(
+                    {k: _valor(v) for k, v in linha._mapping.items()},
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for linha in lote
+            )
+
+
+def _gerar_csv(stmt: Select) -> Iterator[str]:
+    with ReadSessionLocal() as db:
+        resultado = db.execute(stmt.execution_options(yield_per=TAMANHO_LOTE))
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+
+        # O cabeçalho sai antes do primeiro lote
+        escritor.writerow(resultado.keys())
+        yield buffer.getvalue()
+
+        for lote in resultado.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            escritor.writerows([_valor(v) for v in linha] for linha in lote)
+            yield buffer.getvalue()
+
+
+def resposta_exportacao(
+    stmt: Select,
+    formato: FormatoExportacao,
+    nome_arquivo: str,
+) -> StreamingResponse:
+    """
+    Transmite o resultado de ``stmt`` em NDJSON ou CSV, lote a lote.
+
+    O gerador abre a própria sessão, pois roda enquanto a resposta é
+    enviada, depois que o endpoint já retornou. A memória usada fica
+    limitada a um lote, qualquer que seja o tamanho da tabela.
+    """
+    if formato == "csv":
+        return StreamingResponse(
+            _gerar_csv(stmt),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}.csv"'},
+        )
+    return StreamingResponse(_gerar_ndjson(stmt), media_type="application/x-ndjson")
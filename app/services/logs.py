@@ -1,24 +1,182 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import (
+    AUDITORIA_INTERVALO_FLUSH_SEGUNDOS,
+    AUDITORIA_TAMANHO_FILA,
+    AUDITORIA_TAMANHO_LOTE,
+)
+from app.database import SessionLocal
 from app.models.log import LogSistema
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
 
-def registrar_log(
-    db: Session,
+
+class GravadorAuditoria:
+    """
+    Grava os logs de auditoria fora do caminho da requisição.
+
+    ``registrar_log`` apenas enfileira o registro; uma thread em segundo
+    plano junta até ``tamanho_lote`` registros (ou o que chegar em
+    ``intervalo`` segundos) e os insere com um único executemany/commit.
+    Com a fila cheia o registro é descartado (e contado) na hora: quem
+    enfileira roda no event loop e não pode esperar por espaço.
+    """
+
+    def __init__(
+        self,
+        tamanho_fila: int = AUDITORIA_TAMANHO_FILA,
+        tamanho_lote: int = AUDITORIA_TAMANHO_LOTE,
+        intervalo: float = AUDITORIA_INTERVALO_FLUSH_SEGUNDOS,
+    ):
+        self._fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+        self._tamanho_lote = tamanho_lote
+        self._intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.enfileirados = 0
+        self.gravados = 0
+        self.descartados = 0
+        self.falhas = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self) -> None:
+        if self.ativo:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._executar,
+            name="gravador-auditoria",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def parar(self, timeout: float = 10.0) -> None:
+        """
+        Sinaliza a thread para esvaziar a fila e aguarda o último lote.
+        """
+        if not self.ativo:
+            return
+        self._parar.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enfileirar(self, registro: dict) -> bool:
+        try:
+            self._fila.put_nowait(registro)
+        except queue.Full:
+            with self._lock:
+                self.descartados += 1
+            logger.warning("Fila de auditoria cheia; log %s descartado.", registro["acao"])
+            return False
+
+        with self._lock:
+            self.enfileirados += 1
+        return True
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "ativo": self.ativo,
+                "na_fila": self._fila.qsize(),
+                "enfileirados": self.enfileirados,
+                "gravados": self.gravados,
+                "descartados": self.descartados,
+                "falhas": self.falhas,
+            }
+
+    def _executar(self) -> None:
+        while True:
+            lote = self._coletar_lote()
+            if lote:
+                self._gravar(lote)
+            elif self._parar.is_set():
+                return
+
+    def _coletar_lote(self) -> list[dict]:
+        lote: list[dict] = []
+        prazo = time.monotonic() + self._intervalo
+        while len(lote) < self._tamanho_lote:
+            # No desligamento não espera novos registros, só drena a fila
+            espera = 0 if self._parar.is_set() else prazo - time.monotonic()
+            try:
+                if espera <= 0:
+                    lote.append(self._fila.get_nowait())
+                else:
+                    lote.append(self._fila.get(timeout=espera))
+            except queue.Empty:
+                break
+        return lote
+
+    def _gravar(self, lote: list[dict]) -> None:
+        try:
+            with SessionLocal() as db:
+                db.execute(insert(LogSistema), lote)
+                db.commit()
+        except Exception:
+            logger.exception("Falha ao gravar lote de %d logs de auditoria.", len(lote))
+            with self._lock:
+                self.falhas += len(lote)
+            return
+
+        with self._lock:
+            self.gravados += len(lote)
+
+
+gravador_auditoria = GravadorAuditoria()
+
+
+def utc_sem_fuso(data_hora: datetime) -> datetime:
+    """
+    Converte para o formato de ``criado_em`` (UTC, sem fuso). Horários
+    sem fuso são considerados já em UTC.
+    """
+    if data_hora.tzinfo is None:
+        return data_hora
+    return data_hora.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _gravar_direto(registro: dict) -> None:
+    with SessionLocal() as sessao:
+        sessao.add(LogSistema(**registro))
+        sessao.commit()
+
+
+async def registrar_log(
     acao: str,
     usuario: Optional[User] = None,
     detalhes: Optional[str] = None,
 ) -> None:
     """
     Registra um log simples no banco, associado ou não a um usuário.
+
+    O registro não faz parte da transação de quem chama: com o gravador
+    de auditoria em execução ele só é enfileirado, sem esperar; fora da
+    aplicação (scripts, shell) é gravado na hora, em uma sessão de escrita
+    própria no threadpool, para não travar o event loop.
     """
-    log = LogSistema(
-        usuario_id=usuario.id if usuario else None,
-        acao=acao,
-        detalhes=detalhes,
-    )
-    db.add(log)
-    db.commit()
+    registro = {
+        "usuario_id": usuario.id if usuario else None,
+        "acao": acao,
+        "detalhes": detalhes,
+        "criado_em": datetime.utcnow(),
+    }
+
+    if gravador_auditoria.ativo:
+        gravador_auditoria.enfileirar(registro)
+        return
+
+    await run_in_threadpool(_gravar_direto, registro)
@@ -0,0 +1,298 @@
+"""
+Instrumentação por requisição: tempo total, tempo e número de
+instruções SQL e tamanho da resposta, por rota (template do caminho).
+
+Cada requisição recebe uma ``Medicao`` guardada em uma ContextVar. Os
+eventos das engines somam nela o SQL executado; a ContextVar acompanha
+a requisição no greenlet da AsyncSession e nas chamadas ao threadpool
+(modo sync), que copiam o contexto. SQL fora de uma requisição (thread
+de auditoria, arquivamento) não é contado.
+
+Os valores vão para o cabeçalho ``Server-Timing`` e para histogramas
+expostos em /metrics no formato texto do Prometheus. Tudo é atualizado
+no event loop, sem locks. Os mesmos eventos alimentam o log de SQL
+lenta e o trace por requisição (perfil_sql.py).
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.database import async_engine, async_read_engine, engine, read_engine
+from app.services.perfil_sql import CABECALHO_TRACE, ocultar_parametros, perfil_sql
+
+# Requisições sem rota correspondente (404) ficam em uma única série
+ROTA_DESCONHECIDA = "desconhecida"
+
+_LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+_LIMITES_BYTES = (256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216)
+
+
+class Medicao:
+    __slots__ = ("sql_segundos", "sql_consultas", "escopo", "trace")
+
+    def __init__(self, escopo: dict):
+        self.sql_segundos = 0.0
+        self.sql_consultas = 0
+        self.escopo = escopo
+        # Lista de instruções quando o trace SQL foi pedido (perfil_sql)
+        self.trace: Optional[list] = None
+
+
+def _rota(escopo: Optional[dict]) -> Optional[str]:
+    return getattr(escopo.get("route"), "path", None) if escopo else None
+
+
+medicao_atual: ContextVar[Optional[Medicao]] = ContextVar("medicao_atual", default=None)
+
+
+def _antes_sql(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._metricas_inicio = time.perf_counter()
+
+
+def _depois_sql(conn, cursor, statement, parameters, context, executemany) -> None:
+    inicio = getattr(context, "_metricas_inicio", None)
+    if inicio is None:
+        return
+    segundos = time.perf_counter() - inicio
+    medicao = medicao_atual.get()
+    if medicao is not None:
+        medicao.sql_segundos += segundos
+        medicao.sql_consultas += 1
+        if medicao.trace is not None:
+            medicao.trace.append((
+                segundos,
+                statement,
+                ocultar_parametros(parameters, executemany),
+                perfil_sql.plano(conn, statement, parameters, executemany),
+            ))
+    if perfil_sql.limite_segundos is not None and segundos >= perfil_sql.limite_segundos:
+        perfil_sql.registrar_lenta(
+            conn, statement, parameters, executemany, segundos,
+            _rota(medicao.escopo if medicao is not None else None),
+        )
+
+
+def instalar_eventos_sql() -> None:
+    for e in (engine, read_engine, async_engine, async_read_engine):
+        if e is None:
+            continue
+        e = getattr(e, "sync_engine", e)
+        if not event.contains(e, "before_cursor_execute", _antes_sql):
+            event.listen(e, "before_cursor_execute", _antes_sql)
+            event.listen(e, "after_cursor_execute", _depois_sql)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(nomes: tuple[str, ...], valores: tuple, extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(str(v))}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Histograma:
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...], limites: tuple):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.limites = limites
+        # rótulos -> [contagem por faixa (não acumulada) + faixa +Inf, soma]
+        self._series: dict[tuple, list] = {}
+
+    def observar(self, rotulos: tuple, valor: float) -> None:
+        serie = self._series.get(rotulos)
+        if serie is None:
+            serie = self._series[rotulos] = [[0] * (len(self.limites) + 1), 0]
+        serie[0][bisect_left(self.limites, valor)] += 1
+        serie[1] += valor
+
+    def exportar(self) -> list[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        for rotulos, (faixas, soma) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, quantidade in zip((*self.limites, "+Inf"), faixas):
+                acumulado += quantidade
+                le = f'le="{limite}"'
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, rotulos, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, rotulos)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, rotulos)} {acumulado}")
+        return linhas
+
+
+class Contador:
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...]):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores: dict[tuple, int] = {}
+
+    def incrementar(self, rotulos: tuple) -> None:
+        self._valores[rotulos] = self._valores.get(rotulos, 0) + 1
+
+    def exportar(self) -> list[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        for rotulos, valor in sorted(self._valores.items()):
+            linhas.append(f"{self.nome}{_rotulos(self.rotulos, rotulos)} {valor}")
+        return linhas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        rotulos = ("metodo", "rota")
+        self.requisicoes = Contador(
+            "vida_plus_requisicoes_total",
+            "Requisições HTTP atendidas.",
+            ("metodo", "rota", "status"),
+        )
+        self.duracao = Histograma(
+            "vida_plus_requisicao_segundos",
+            "Tempo total da requisição, do recebimento ao fim da resposta.",
+            rotulos,
+            _LIMITES_SEGUNDOS,
+        )
+        self.sql_duracao = Histograma(
+            "vida_plus_requisicao_sql_segundos",
+            "Tempo gasto em instruções SQL durante a requisição.",
+            rotulos,
+            _LIMITES_SEGUNDOS,
+        )
+        self.sql_consultas = Histograma(
+            "vida_plus_requisicao_sql_consultas",
+            "Instruções SQL executadas durante a requisição.",
+            rotulos,
+            _LIMITES_CONSULTAS,
+        )
+        self.resposta_bytes = Histograma(
+            "vida_plus_resposta_bytes",
+            "Tamanho do corpo da resposta.",
+            rotulos,
+            _LIMITES_BYTES,
+        )
+
+    def registrar(
+        self,
+        metodo: str,
+        rota: str,
+        status: int,
+        segundos: float,
+        medicao: Medicao,
+        tamanho: int,
+    ) -> None:
+        rotulos = (metodo, rota)
+        self.requisicoes.incrementar((metodo, rota, status))
+        self.duracao.observar(rotulos, segundos)
+        self.sql_duracao.observar(rotulos, medicao.sql_segundos)
+        self.sql_consultas.observar(rotulos, medicao.sql_consultas)
+        self.resposta_bytes.observar(rotulos, tamanho)
+
+    def exportar(self, estatisticas: dict[str, dict]) -> str:
+        """
+        Texto no formato do Prometheus. ``estatisticas`` são os contadores
+        já mantidos pelos componentes (ex.: ``{"auditoria": {...}}``),
+        exportados como gauges ``vida_plus_<componente>_<chave>``.
+        """
+        linhas: list[str] = []
+        for metrica in (
+            self.requisicoes,
+            self.duracao,
+            self.sql_duracao,
+            self.sql_consultas,
+            self.resposta_bytes,
+        ):
+            linhas.extend(metrica.exportar())
+        for nome, valor in sorted(_achatar(estatisticas, "vida_plus").items()):
+            linhas.append(f"# TYPE {nome} gauge")
+            linhas.append(f"{nome} {_numero(valor)}")
+        return "\n".join(linhas) + "\n"
+
+
+def _achatar(valores: dict, prefixo: str) -> dict[str, float]:
+    # Só valores numéricos (bool vira 0/1); dicionários aninhados viram prefixos
+    resultado = {}
+    for chave, valor in valores.items():
+        nome = f"{prefixo}_{chave}"
+        if isinstance(valor, dict):
+            resultado.update(_achatar(valor, nome))
+        elif isinstance(valor, bool):
+            resultado[nome] = int(valor)
+        elif isinstance(valor, (int, float)):
+            resultado[nome] = valor
+    return resultado
+
+
+metricas = RegistroMetricas()
+
+
+def _cabecalho(escopo: dict, nome: str) -> Optional[str]:
+    chave = nome.encode()
+    for nome_cabecalho, valor in escopo.get("headers", ()):
+        if nome_cabecalho == chave:
+            return valor.decode("latin-1")
+    return None
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware, que cria uma tarefa e
+    filas por requisição): mede a requisição, acrescenta Server-Timing e
+    registra nos histogramas quando o corpo termina de ser enviado.
+    """
+
+    def __init__(self, app, registro: RegistroMetricas = metricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        medicao = Medicao(scope)
+        if perfil_sql.trace_solicitado(_cabecalho(scope, CABECALHO_TRACE)):
+            medicao.trace = []
+        token = medicao_atual.set(medicao)
+        status = 500
+        tamanho = 0
+
+        async def enviar(mensagem):
+            nonlocal status, tamanho
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                decorrido = (time.perf_counter() - inicio) * 1000
+                valor = (
+                    f"app;dur={decorrido:.2f}, "
+                    f'db;dur={medicao.sql_segundos * 1000:.2f};desc="{medicao.sql_consultas} SQL"'
+                )
+                mensagem["headers"] = [*mensagem.get("headers", []), (b"server-timing", valor.encode())]
+            elif mensagem["type"] == "http.response.body":
+                tamanho += len(mensagem.get("body", b""))
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            medicao_atual.reset(token)
+            rota = _rota(scope)
+            self.registro.registrar(
+                scope["method"],
+                rota or ROTA_DESCONHECIDA,
+                status,
+                time.perf_counter() - inicio,
+                medicao,
+                tamanho,
+            )
+            if medicao.trace is not None:
+                perfil_sql.registrar_trace(scope["method"], scope["path"], rota, medicao.trace)
@@ -0,0 +1,103 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import literal, tuple_
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+@dataclass
+class ParametrosPaginacao:
+    limit: int
+    cursor: Optional[str]
+
+
+def parametros_paginacao(
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = Query(None),
+) -> ParametrosPaginacao:
+    return ParametrosPaginacao(limit=limit, cursor=cursor)
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """
+    Gera um cursor opaco a partir dos valores da chave de ordenação da última linha.
+    """
+    serializados = [
+        v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores
+    ]
+    bruto = json.dumps(serializados, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, chaves: Sequence) -> list[Any]:
+    """
+    Reconstrói os valores da chave de ordenação, convertendo cada um
+    para o tipo Python da coluna correspondente.
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(bruto)
+        if not isinstance(valores, list) or len(valores) != len(chaves):
+            raise ValueError(cursor)
+
+        resultado = []
+        for valor, coluna in zip(valores, chaves):
+            tipo = coluna.type.python_type
+            if tipo is datetime:
+                resultado.append(datetime.fromisoformat(valor))
+            elif tipo is date:
+                resultado.append(date.fromisoformat(valor))
+            else:
+                resultado.append(tipo(valor))
+        return resultado
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido.",
+        )
+
+
+def aplicar_cursor(
+    consulta,
+    chaves: Sequence,
+    pagina: ParametrosPaginacao,
+    descendente: bool = False,
+):
+    """
+    Aplica paginação por chave (keyset) a uma Query/Select.
+
+    A página seguinte é filtrada por comparação de row values sobre as
+    colunas de ``chaves``, o que permite ao SQLite percorrer um índice
+    composto a partir do ponto de parada em vez de usar OFFSET.
+    Busca ``limit + 1`` linhas para saber se existe próxima página.
+    """
+    if pagina.cursor:
+        valores = decodificar_cursor(pagina.cursor, chaves)
+        chave = tuple_(*chaves)
+        ponto = tuple_(*[literal(v, c.type) for v, c in zip(valores, chaves)])
+        consulta = consulta.filter(chave < ponto if descendente else chave > ponto)
+
+    ordem = [c.desc() if descendente else c.asc() for c in chaves]
+    return consulta.order_by(*ordem).limit(pagina.limit + 1)
+
+
+def montar_pagina(
+    linhas: Sequence,
+    chaves: Sequence,
+    pagina: ParametrosPaginacao,
+) -> dict:
+    """
+    Corta a linha excedente e gera o cursor da próxima página, se houver.
+    """
+    itens = list(linhas[: pagina.limit])
+    proximo_cursor = None
+    if len(linhas) > pagina.limit:
+        ultima = itens[-1]
+        proximo_cursor = codificar_cursor([getattr(ultima, c.key) for c in chaves])
+    return {"itens": itens, "proximo_cursor": proximo_cursor}
@@ -0,0 +1,240 @@
+import csv
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import PACIENTES_BULK_MAX_BYTES, PACIENTES_BULK_MAX_LINHAS
+from app.core.security import get_password_hashes_async
+from app.models.patient import Paciente
+from app.models.user import User
+from app.schemas.patient import PacienteCreate
+
+# Limite de parâmetros por "IN (...)" para não estourar o máximo do SQLite
+TAMANHO_LOTE_IN = 500
+
+CAMPOS_OPCIONAIS = ("plano_saude", "numero_carteirinha")
+
+
+def _lote_grande_demais(detalhe: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detalhe)
+
+
+def _conferir_linhas(quantidade: int) -> None:
+    if quantidade > PACIENTES_BULK_MAX_LINHAS:
+        raise _lote_grande_demais(f"O lote excede o limite de {PACIENTES_BULK_MAX_LINHAS} pacientes.")
+
+
+async def _pedacos_do_corpo(request: Request) -> AsyncIterator[bytes]:
+    """
+    Pedaços do corpo, recusando (413) o que passar de
+    ``PACIENTES_BULK_MAX_BYTES``: pelo Content-Length antes de ler e pelo
+    total lido quando o cabeçalho não vem (transferência em partes).
+    """
+    excesso = f"O corpo excede o limite de {PACIENTES_BULK_MAX_BYTES} bytes."
+    declarado = request.headers.get("content-length")
+    if declarado and declarado.isdigit() and int(declarado) > PACIENTES_BULK_MAX_BYTES:
+        raise _lote_grande_demais(excesso)
+    lidos = 0
+    async for pedaco in request.stream():
+        lidos += len(pedaco)
+        if lidos > PACIENTES_BULK_MAX_BYTES:
+            raise _lote_grande_demais(excesso)
+        yield pedaco
+
+
+async def _linhas_do_corpo(request: Request) -> AsyncIterator[str]:
+    """
+    Lê o corpo da requisição em pedaços e devolve linha a linha,
+    sem montar o corpo inteiro em memória.
+    """
+    # bytearray: uma linha longa, espalhada por muitos pedaços, não é
+    # copiada de novo a cada pedaço
+    pendente = bytearray()
+    async for pedaco in _pedacos_do_corpo(request):
+        inicio = 0
+        while (fim := pedaco.find(b"\n", inicio)) != -1:
+            pendente += pedaco[inicio:fim]
+            yield pendente.decode("utf-8") + "\n"
+            pendente.clear()
+            inicio = fim + 1
+        pendente += pedaco[inicio:]
+    if pendente:
+        yield pendente.decode("utf-8")
+
+
+async def _registros_ndjson(request: Request) -> list[dict]:
+    registros = []
+    async for linha in _linhas_do_corpo(request):
+        if linha.strip():
+            registros.append(json.loads(linha))
+            _conferir_linhas(len(registros))
+    return registros
+
+
+async def _registros_csv(request: Request) -> list[dict]:
+    linhas: list[str] = []
+    # Registros completos até aqui (o cabeçalho conta como um). Campo entre
+    # aspas pode ter quebra de linha: o registro só termina quando o total
+    # de aspas lidas é par ("" escapado soma duas)
+    registros = 0
+    aspas = 0
+    async for linha in _linhas_do_corpo(request):
+        linhas.append(linha)
+        aspas += linha.count('"')
+        if aspas % 2 == 0 and linha.strip():
+            registros += 1
+            _conferir_linhas(registros - 1)
+    return [
+        {
+            k: (None if k in CAMPOS_OPCIONAIS and v == "" else v)
+            for k, v in linha.items()
+        }
+        for linha in csv.DictReader(linhas)
+    ]
+
+
+async def ler_registros(request: Request) -> list[dict]:
+    """
+    Converte o corpo (JSON array, NDJSON ou CSV) em uma lista de dicts,
+    conforme o Content-Type enviado. NDJSON e CSV são contados durante a
+    leitura: o lote acima de ``PACIENTES_BULK_MAX_LINHAS`` é recusado (413)
+    assim que passa do limite, sem ler o restante do corpo.
+    """
+    tipo = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    try:
+        if tipo in ("application/x-ndjson", "application/ndjson"):
+            registros = await _registros_ndjson(request)
+        elif tipo == "text/csv":
+            registros = await _registros_csv(request)
+        elif tipo in ("application/json", ""):
+            registros = json.loads(b"".join([p async for p in _pedacos_do_corpo(request)]))
+            if not isinstance(registros, list):
+                raise ValueError("O corpo JSON deve ser uma lista.")
+            _conferir_linhas(len(registros))
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Use application/json, application/x-ndjson ou text/csv.",
+            )
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Corpo inválido: {exc}",
+        )
+    return registros
+
+
+async def _existentes(db: AsyncSession, coluna, valores: set[str]) -> set[str]:
+    encontrados: set[str] = set()
+    valores = list(valores)
+    for i in range(0, len(valores), TAMANHO_LOTE_IN):
+        lote = valores[i:i + TAMANHO_LOTE_IN]
+        encontrados.update((await db.execute(select(coluna).where(coluna.in_(lote)))).scalars())
+    return encontrados
+
+
+async def importar_pacientes(db: AsyncSession, registros: list[dict]) -> dict:
+    """
+    Cadastra um lote de pacientes e devolve um relatório por linha.
+
+    E-mails e CPFs são verificados contra o lote inteiro com consultas
+    por conjunto, os hashes são gerados em paralelo no pool de processos
+    e usuarios + pacientes são inseridos com executemany em uma única
+    transação.
+    """
+    itens: list[dict] = [{"linha": i + 1, "sucesso": False} for i in range(len(registros))]
+
+    # 1) Validação individual e duplicidades dentro do próprio lote
+    validos: list[tuple[int, PacienteCreate]] = []
+    emails_lote: set[str] = set()
+    cpfs_lote: set[str] = set()
+    for i, registro in enumerate(registros):
+        try:
+            paciente = PacienteCreate.model_validate(registro)
+        except ValidationError as exc:
+            itens[i]["erro"] = "; ".join(
+                f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors()
+            )
+            continue
+
+        if paciente.email in emails_lote:
+            itens[i]["erro"] = "E-mail repetido no lote."
+            continue
+        if paciente.cpf in cpfs_lote:
+            itens[i]["erro"] = "CPF repetido no lote."
+            continue
+        emails_lote.add(paciente.email)
+        cpfs_lote.add(paciente.cpf)
+        validos.append((i, paciente))
+
+    # 2) Verificação contra o banco em poucas consultas por conjunto
+    emails_existentes = await _existentes(db, User.email, emails_lote)
+    cpfs_existentes = await _existentes(db, Paciente.cpf, cpfs_lote)
+
+    aceitos: list[tuple[int, PacienteCreate]] = []
+    for i, paciente in validos:
+        if paciente.email in emails_existentes:
+            itens[i]["erro"] = "E-mail já cadastrado."
+        elif paciente.cpf in cpfs_existentes:
+            itens[i]["erro"] = "CPF já cadastrado."
+        else:
+            aceitos.append((i, paciente))
+
+    if aceitos:
+        # 3) Hash das senhas em paralelo
+        hashes = await get_password_hashes_async([p.senha for _, p in aceitos])
+
+        # 4) Inserção em lote, em uma única transação
+        try:
+            usuarios = (await db.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "nome_completo": p.nome_completo,
+                        "email": p.email,
+                        "senha_hash": h,
+                        "tipo": "PACIENTE",
+                    }
+                    for (_, p), h in zip(aceitos, hashes)
+                ],
+            )).scalars().all()
+
+            pacientes = (await db.execute(
+                insert(Paciente).returning(Paciente.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "usuario_id": usuario_id,
+                        "cpf": p.cpf,
+                        "data_nascimento": p.data_nascimento,
+                        "telefone": p.telefone,
+                        "endereco": p.endereco,
+                        "plano_saude": p.plano_saude,
+                        "numero_carteirinha": p.numero_carteirinha,
+                    }
+                    for (_, p), usuario_id in zip(aceitos, usuarios)
+                ],
+            )).scalars().all()
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Conflito ao gravar o lote (cadastro concorrente); nenhum paciente foi criado.",
+            )
+
+        for (i, _), paciente_id in zip(aceitos, pacientes):
+            itens[i].update(sucesso=True, id=paciente_id)
+
+    criados = len(aceitos)
+    return {
+        "total": len(registros),
+        "criados": criados,
+        "erros": len(registros) - criados,
+        "itens": itens,
+    }
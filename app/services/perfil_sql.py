@@ -0,0 +1,171 @@
+"""
+Perfil de SQL: log de instruções lentas e trace por requisição.
+
+Os tempos vêm dos eventos de engine instalados em metricas.py; este
+módulo só decide o que registrar. Uma instrução acima de
+``SQL_LENTA_MS`` vai para o logger ``app.sql`` com os parâmetros
+ocultados (apenas os tipos) e o resultado de ``EXPLAIN QUERY PLAN``,
+marcando as varreduras completas de tabela (``SCAN tabela`` sem
+índice) — o sinal de índice faltando.
+
+O plano é obtido uma vez por texto de instrução (cache limitado) e
+executado direto na conexão DBAPI, sem passar pelos eventos da engine.
+"""
+import logging
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.core.config import SQL_LENTA_MS, SQL_PLANOS_CACHE, SQL_TRACE_TOKEN
+from app.database import Base
+
+logger = logging.getLogger("app.sql")
+
+CABECALHO_TRACE = "x-debug-sql"
+
+_EXPLICAVEL = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+_VARREDURA = re.compile(r"^SCAN (\w+)$")
+
+
+@dataclass
+class Plano:
+    linhas: list[str] = field(default_factory=list)
+    # Tabelas lidas inteiras, sem índice
+    varreduras: list[str] = field(default_factory=list)
+
+
+def ocultar_parametros(parametros, executemany: bool) -> str:
+    """
+    Descreve os parâmetros sem revelar valores (CPF, nomes, textos
+    clínicos): só o tipo de cada um.
+    """
+    if executemany:
+        return f"<{len(parametros)} conjuntos>"
+    if isinstance(parametros, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parametros.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in parametros or ()) + ")"
+
+
+def _tabelas() -> frozenset:
+    return frozenset(Base.metadata.tables)
+
+
+class PerfilSQL:
+    def __init__(
+        self,
+        limite_ms: int = SQL_LENTA_MS,
+        token_trace: Optional[str] = SQL_TRACE_TOKEN,
+        capacidade_planos: int = SQL_PLANOS_CACHE,
+    ):
+        self.limite_segundos = limite_ms / 1000 if limite_ms > 0 else None
+        self._token_trace = token_trace
+        self._capacidade = capacidade_planos
+        self._planos: OrderedDict[str, Plano] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.lentas = 0
+        self.varreduras_completas = 0
+        self.traces = 0
+
+    def trace_solicitado(self, valor_cabecalho: Optional[str]) -> bool:
+        if not self._token_trace or valor_cabecalho is None:
+            return False
+        return secrets.compare_digest(valor_cabecalho.encode(), self._token_trace.encode())
+
+    def plano(self, conn, statement: str, parametros, executemany: bool) -> Optional[Plano]:
+        """
+        ``EXPLAIN QUERY PLAN`` da instrução (do cache quando possível).
+        None para o que não é consulta (INSERT, DDL, PRAGMA) e executemany.
+        """
+        if executemany or not _EXPLICAVEL.match(statement):
+            return None
+        with self._lock:
+            plano = self._planos.get(statement)
+            if plano is not None:
+                self._planos.move_to_end(statement)
+                return plano
+
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute("EXPLAIN QUERY PLAN " + statement, parametros)
+                detalhes = [linha[3] for linha in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception:
+            logger.debug("EXPLAIN QUERY PLAN falhou para: %s", statement, exc_info=True)
+            return None
+
+        tabelas = _tabelas()
+        plano = Plano(linhas=detalhes)
+        for detalhe in detalhes:
+            varredura = _VARREDURA.match(detalhe)
+            if varredura and varredura.group(1) in tabelas:
+                plano.varreduras.append(varredura.group(1))
+
+        with self._lock:
+            self._planos[statement] = plano
+            if len(self._planos) > self._capacidade:
+                self._planos.popitem(last=False)
+        return plano
+
+    def registrar_lenta(
+        self,
+        conn,
+        statement: str,
+        parametros,
+        executemany: bool,
+        segundos: float,
+        rota: Optional[str],
+    ) -> None:
+        plano = self.plano(conn, statement, parametros, executemany)
+        with self._lock:
+            self.lentas += 1
+            if plano is not None and plano.varreduras:
+                self.varreduras_completas += 1
+
+        partes = [
+            f"SQL lenta: {segundos * 1000:.1f} ms",
+            f"rota={rota or '-'}",
+            f"parametros={ocultar_parametros(parametros, executemany)}",
+        ]
+        if plano is not None and plano.varreduras:
+            partes.append(f"VARREDURA COMPLETA: {', '.join(plano.varreduras)}")
+        texto = " | ".join(partes) + "\n  " + " ".join(statement.split())
+        if plano is not None:
+            texto += "".join(f"\n  plano: {linha}" for linha in plano.linhas)
+        logger.warning(texto)
+
+    def registrar_trace(self, metodo: str, caminho: str, rota: Optional[str], trace: list) -> None:
+        """
+        Loga as instruções executadas por uma requisição, na ordem.
+        ``trace``: (segundos, instrução, parâmetros ocultados, plano).
+        """
+        with self._lock:
+            self.traces += 1
+        total = sum(t[0] for t in trace) * 1000
+        linhas = [f"Trace SQL {metodo} {caminho} (rota={rota or '-'}): {len(trace)} instruções, {total:.2f} ms"]
+        for i, (segundos, statement, parametros, plano) in enumerate(trace, 1):
+            marca = f" [VARREDURA COMPLETA: {', '.join(plano.varreduras)}]" if plano and plano.varreduras else ""
+            linhas.append(f"  #{i} {segundos * 1000:.2f} ms{marca} {parametros}\n     {' '.join(statement.split())}")
+            if plano is not None:
+                linhas.extend(f"     plano: {linha}" for linha in plano.linhas)
+        # WARNING: o trace foi pedido explicitamente e precisa aparecer sem
+        # configuração extra de logging (uvicorn não configura o logger raiz)
+        logger.warning("\n".join(linhas))
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "limite_ms": self.limite_segundos * 1000 if self.limite_segundos else 0,
+                "lentas": self.lentas,
+                "varreduras_completas": self.varreduras_completas,
+                "traces": self.traces,
+                "planos_em_cache": len(self._planos),
+            }
+
+
+perfil_sql = PerfilSQL()
@@ -0,0 +1,141 @@
+"""
+Serialização direta das listagens.
+
+As listagens já buscam no SQL exatamente os campos do schema de leitura.
+Devolvidas ao FastAPI, essas linhas seriam validadas de novo contra o
+``response_model`` (``from_attributes``, campo a campo, inclusive
+EmailStr) antes de virar JSON — trabalho repetido sobre dados que vêm do
+próprio banco e foram validados na gravação. Aqui cada linha vira um
+dicionário por posição (``zip`` com os nomes das colunas) e o corpo é
+codificado pelo orjson em uma passada, devolvido como ``Response`` pronta
+(o FastAPI não a valida).
+
+As rotas mantêm o ``response_model`` para a documentação OpenAPI; a
+comparação das colunas do resultado com os campos do schema garante que
+a projeção e o schema não divergem.
+
+``?fields=id,status`` restringe a resposta a alguns campos do schema. A
+restrição vale para o próprio SELECT (``restringir``): colunas não
+pedidas, como textos longos, nem são lidas do banco.
+"""
+from functools import cache
+from typing import Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+
+from app.services.pagination import ParametrosPaginacao, montar_pagina
+
+_CAMPOS: dict[type[BaseModel], tuple[str, ...]] = {}
+
+
+class RespostaJSON(Response):
+    media_type = "application/json"
+
+    def render(self, conteudo) -> bytes:
+        return orjson.dumps(conteudo)
+
+
+def campos(schema: type[BaseModel]) -> tuple[str, ...]:
+    nomes = _CAMPOS.get(schema)
+    if nomes is None:
+        nomes = _CAMPOS[schema] = tuple(schema.model_fields)
+    return nomes
+
+
+def projecao(schema: type[BaseModel], modelo) -> list:
+    """
+    Colunas de ``modelo`` com os nomes dos campos de ``schema``, na mesma
+    ordem (substitui ``select(Modelo)``, que carregaria entidades ORM).
+    """
+    return [getattr(modelo, nome) for nome in campos(schema)]
+
+
+@cache
+def parametro_campos(schema: type[BaseModel]):
+    """
+    Dependência do parâmetro ``fields``: devolve os campos pedidos na
+    ordem do schema, ou None (todos). Campo desconhecido é erro 400.
+    """
+    permitidos = campos(schema)
+
+    def campos_pedidos(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Campos da resposta, separados por vírgula ({', '.join(permitidos)})",
+        ),
+    ) -> Optional[tuple[str, ...]]:
+        if fields is None:
+            return None
+        pedidos = {c.strip() for c in fields.split(",") if c.strip()}
+        desconhecidos = pedidos.difference(permitidos)
+        if not pedidos or desconhecidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"Campos inválidos: {', '.join(sorted(desconhecidos)) or fields!r}. "
+                    f"Disponíveis: {', '.join(permitidos)}."
+                ),
+            )
+        return tuple(c for c in permitidos if c in pedidos)
+
+    return campos_pedidos
+
+
+def restringir(consulta, campos_pedidos: Optional[tuple[str, ...]], chaves: Sequence = ()):
+    """
+    Reduz uma projeção completa do schema aos campos pedidos. As colunas
+    da chave de paginação continuam no SELECT (o cursor é lido das
+    linhas), depois dos campos pedidos, e ficam fora da resposta.
+    """
+    if campos_pedidos is None:
+        return consulta
+    por_nome = {c.key: c for c in consulta.selected_columns}
+    nomes = campos_pedidos + tuple(c.key for c in chaves if c.key not in campos_pedidos)
+    return consulta.with_only_columns(*(por_nome[n] for n in nomes))
+
+
+def dicionarios(
+    colunas: Sequence[str],
+    linhas: Sequence,
+    schema: type[BaseModel],
+    campos_pedidos: Optional[tuple[str, ...]] = None,
+) -> list[dict]:
+    """
+    Linhas como dicionários dos campos de ``schema`` (ou só dos pedidos).
+    Colunas excedentes no fim da linha (chave de paginação, versões para
+    a ETag) são descartadas pelo ``zip``.
+    """
+    colunas = tuple(colunas)
+    esperados = campos_pedidos or campos(schema)
+    if colunas[: len(esperados)] != esperados:
+        raise RuntimeError(
+            f"Colunas {colunas} não correspondem aos campos de {schema.__name__}."
+        )
+    return [dict(zip(esperados, linha)) for linha in linhas]
+
+
+def selecionar(dados: dict, campos_pedidos: Optional[tuple[str, ...]]) -> dict:
+    """
+    Campos pedidos de um item já serializado (caches em memória).
+    """
+    if campos_pedidos is None:
+        return dados
+    return {c: dados[c] for c in campos_pedidos}
+
+
+def pagina_json(
+    resultado,
+    chaves: Sequence,
+    pagina: ParametrosPaginacao,
+    schema: type[BaseModel],
+    campos_pedidos: Optional[tuple[str, ...]] = None,
+) -> RespostaJSON:
+    """
+    ``montar_pagina`` sobre as linhas de ``resultado`` (o cursor é lido
+    das próprias linhas), com os itens já como dicionários.
+    """
+    conteudo = montar_pagina(resultado.all(), chaves, pagina)
+    conteudo["itens"] = dicionarios(resultado.keys(), conteudo["itens"], schema, campos_pedidos)
+    return RespostaJSON(conteudo)
@@ -0,0 +1,133 @@
+"""
+Linha do tempo do paciente: consultas e prontuários intercalados por
+data, do mais recente para o mais antigo.
+
+Cada tipo é um ramo que percorre o próprio índice ``(paciente_id, data,
+id)`` a partir do cursor e para em ``limit + 1`` linhas; o UNION ALL
+ordena no máximo ``2 * (limit + 1)`` linhas. O custo de uma página não
+depende do tamanho do histórico.
+
+``consultas.data_hora`` está em horário local e ``prontuarios.data_registro``
+em UTC (ambos sem fuso). A timeline usa o horário local: o ramo de
+prontuários converte a data na projeção e o cursor de volta para UTC ao
+percorrer o próprio índice, que segue a mesma ordem (exceto na hora
+repetida do fim de um horário de verão, em que vale a ordem em UTC).
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    String,
+    column,
+    func,
+    literal,
+    null,
+    select,
+    tuple_,
+    type_coerce,
+    union_all,
+)
+
+from app.models.consultation import Consulta
+from app.models.medical_record import Prontuario
+from app.services.logs import utc_sem_fuso
+from app.services.pagination import ParametrosPaginacao, decodificar_cursor
+from app.services.serializacao import restringir
+
+
+def _registro_local(coluna):
+    # 'localtime' do SQLite descarta a fração; os microssegundos (sempre
+    # presentes desde a migração 9) voltam do texto original
+    return type_coerce(
+        func.strftime("%Y-%m-%d %H:%M:%S", coluna, "localtime").concat(func.substr(coluna, 20)),
+        DateTime,
+    )
+
+
+def _local_para_utc(data: datetime) -> datetime:
+    return utc_sem_fuso(data.astimezone())
+
+
+def _ramo_consultas(paciente_id: int):
+    return select(
+        literal("CONSULTA", String).label("tipo"),
+        Consulta.id.label("id"),
+        Consulta.data_hora.label("data"),
+        Consulta.profissional_id.label("profissional_id"),
+        Consulta.tipo_atendimento.label("categoria"),
+        Consulta.status.label("status"),
+        Consulta.unidade_id.label("unidade_id"),
+        null().label("consulta_id"),
+        Consulta.observacoes.label("texto"),
+    ).where(Consulta.paciente_id == paciente_id)
+
+
+def _ramo_prontuarios(paciente_id: int):
+    return select(
+        literal("PRONTUARIO", String).label("tipo"),
+        Prontuario.id.label("id"),
+        _registro_local(Prontuario.data_registro).label("data"),
+        Prontuario.profissional_id.label("profissional_id"),
+        Prontuario.tipo_registro.label("categoria"),
+        null().label("status"),
+        null().label("unidade_id"),
+        Prontuario.consulta_id.label("consulta_id"),
+        Prontuario.descricao.label("texto"),
+    ).where(Prontuario.paciente_id == paciente_id)
+
+
+# tipo -> (ramo, colunas de data e id do índice percorrido pelo ramo,
+# conversão do cursor, em horário local, para o relógio da coluna)
+_RAMOS = {
+    "CONSULTA": (_ramo_consultas, Consulta.data_hora, Consulta.id, None),
+    "PRONTUARIO": (_ramo_prontuarios, Prontuario.data_registro, Prontuario.id, _local_para_utc),
+}
+
+# Chave de ordenação (data, tipo, id), com os tipos para decodificar o cursor
+_CHAVES_CURSOR = (column("data", DateTime), column("tipo", String), column("id", Integer))
+
+
+def montar_timeline(
+    paciente_id: int,
+    pagina: ParametrosPaginacao,
+    tipo: Optional[str] = None,
+    campos: Optional[tuple[str, ...]] = None,
+):
+    """
+    Devolve ``(consulta, chaves)``: a query da página e as colunas da
+    chave de ordenação ``(data, tipo, id)``, para ``montar_pagina``.
+    Com ``campos``, os dois ramos leem só essas colunas (e as da chave).
+    """
+    apos = decodificar_cursor(pagina.cursor, _CHAVES_CURSOR) if pagina.cursor else None
+
+    ramos = []
+    for tipo_ramo, (montar, data, id_, converter) in _RAMOS.items():
+        if tipo is not None and tipo != tipo_ramo:
+            continue
+        ramo = restringir(montar(paciente_id), campos, _CHAVES_CURSOR)
+        if apos is not None:
+            data_cursor, tipo_cursor, id_cursor = apos
+            if converter is not None:
+                data_cursor = converter(data_cursor)
+            # Em (data, tipo, id) decrescente, o tipo é constante dentro do
+            # ramo: a condição vira um intervalo simples no índice do ramo
+            if tipo_ramo < tipo_cursor:
+                ramo = ramo.where(data <= data_cursor)
+            elif tipo_ramo > tipo_cursor:
+                ramo = ramo.where(data < data_cursor)
+            else:
+                ramo = ramo.where(tuple_(data, id_) < (data_cursor, id_cursor))
+        # O LIMIT precisa ficar dentro do ramo; por isso a subquery
+        limitado = ramo.order_by(data.desc(), id_.desc()).limit(pagina.limit + 1).subquery()
+        ramos.append(select(limitado))
+
+    timeline = (ramos[0] if len(ramos) == 1 else union_all(*ramos)).subquery("timeline")
+    chaves = (timeline.c.data, timeline.c.tipo, timeline.c.id)
+    consulta = (
+        select(timeline)
+        .order_by(*(c.desc() for c in chaves))
+        .limit(pagina.limit + 1)
+    )
+    return consulta, chaves
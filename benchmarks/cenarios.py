@@ -0,0 +1,284 @@
+"""
+Executa cenários de carga contra a API e grava os resultados em JSON.
+
+Uso (em processo, via ASGI, com contagem de SQL):
+    python -m benchmarks.cenarios --bd sqlite:///./bench.db --saida resultado.json
+
+Contra um servidor já em execução (sem contagem de SQL):
+    python -m benchmarks.cenarios --url http://localhost:8000 --saida resultado.json
+
+A base deve ter sido criada com ``python -m benchmarks.gerador``.
+Para comparar duas execuções: ``python -m benchmarks.cenarios --comparar a.json b.json``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.gerador import EMAIL_ADMIN, ESPECIALIDADES, PRIMEIROS_NOMES, SENHA_PADRAO
+
+
+@dataclass
+class Cenario:
+    nome: str
+    metodo: str
+    # Recebe o gerador aleatório e o contexto (totais da base) e devolve (caminho, corpo)
+    requisicao: Callable[[random.Random, dict], tuple[str, Optional[dict]]]
+    autenticado: bool = True
+
+
+CENARIOS = [
+    Cenario(
+        "auth_login",
+        "POST",
+        lambda rnd, ctx: ("/auth/login", {"email": EMAIL_ADMIN, "senha": SENHA_PADRAO}),
+        autenticado=False,
+    ),
+    Cenario(
+        "consultas_listar",
+        "GET",
+        lambda rnd, ctx: ("/consultas/?limit=50", None),
+    ),
+    Cenario(
+        "consultas_por_profissional",
+        "GET",
+        lambda rnd, ctx: (f"/consultas/profissionais/{rnd.randint(1, ctx['profissionais'])}?limit=50", None),
+    ),
+    Cenario(
+        "consultas_obter",
+        "GET",
+        lambda rnd, ctx: (f"/consultas/{rnd.randint(1, ctx['consultas'])}", None),
+    ),
+    Cenario(
+        "prontuarios_por_paciente",
+        "GET",
+        lambda rnd, ctx: (f"/prontuarios/paciente/{rnd.randint(1, ctx['pacientes'])}?limit=50", None),
+    ),
+    Cenario(
+        "pacientes_listar",
+        "GET",
+        lambda rnd, ctx: ("/pacientes/?limit=100", None),
+    ),
+    Cenario(
+        "pacientes_obter",
+        "GET",
+        lambda rnd, ctx: (f"/pacientes/{rnd.randint(1, ctx['pacientes'])}", None),
+    ),
+    Cenario(
+        "pacientes_busca_nome",
+        "GET",
+        lambda rnd, ctx: (f"/pacientes/busca?nome={quote(rnd.choice(PRIMEIROS_NOMES)[:3])}", None),
+    ),
+    Cenario(
+        "unidades_listar",
+        "GET",
+        lambda rnd, ctx: ("/unidades/", None),
+    ),
+    Cenario(
+        "agenda_disponibilidade",
+        "GET",
+        lambda rnd, ctx: (
+            f"/agenda/disponibilidade?especialidade={rnd.choice(ESPECIALIDADES)}"
+            f"&de={ctx['agora']}&limite=10",
+            None,
+        ),
+    ),
+]
+
+
+class ContadorSQL:
+    """
+    Conta as instruções SQL emitidas pelas engines da aplicação (modo em processo).
+    """
+
+    def __init__(self):
+        self.total = 0
+
+    def instalar(self, *engines) -> None:
+        from sqlalchemy import event
+
+        # AsyncEngine expõe os eventos pela engine síncrona subjacente
+        sincronas = {getattr(e, "sync_engine", e) for e in engines if e is not None}
+        for engine in sincronas:
+            event.listen(engine, "before_cursor_execute", self._contar)
+
+    def _contar(self, *args) -> None:
+        self.total += 1
+
+
+def _percentil(ordenados: list[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p
+    i = int(k)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+
+async def _executar_cenario(
+    cliente: httpx.AsyncClient,
+    cenario: Cenario,
+    ctx: dict,
+    headers: dict,
+    requisicoes: int,
+    concorrencia: int,
+    contador: Optional[ContadorSQL],
+    semente: int,
+) -> dict:
+    rnd = random.Random(f"{semente}-{cenario.nome}")
+    pedidos = [cenario.requisicao(rnd, ctx) for _ in range(requisicoes)]
+    latencias: list[float] = []
+    erros = 0
+    fila = iter(pedidos)
+
+    async def trabalhador():
+        nonlocal erros
+        for caminho, corpo in fila:
+            t0 = time.perf_counter()
+            resposta = await cliente.request(
+                cenario.metodo,
+                caminho,
+                json=corpo,
+                headers=headers if cenario.autenticado else None,
+            )
+            latencias.append((time.perf_counter() - t0) * 1000)
+            if resposta.status_code >= 400:
+                erros += 1
+
+    sql_antes = contador.total if contador else 0
+    inicio = time.perf_counter()
+    await asyncio.gather(*[trabalhador() for _ in range(concorrencia)])
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    resultado = {
+        "requisicoes": requisicoes,
+        "erros": erros,
+        "p50_ms": round(_percentil(latencias, 0.50), 3),
+        "p95_ms": round(_percentil(latencias, 0.95), 3),
+        "p99_ms": round(_percentil(latencias, 0.99), 3),
+        "media_ms": round(sum(latencias) / len(latencias), 3),
+        "vazao_rps": round(requisicoes / duracao, 1),
+    }
+    if contador:
+        resultado["sql_por_requisicao"] = round((contador.total - sql_antes) / requisicoes, 2)
+    return resultado
+
+
+async def executar(args) -> dict:
+    contador: Optional[ContadorSQL] = None
+
+    if args.url:
+        cliente = httpx.AsyncClient(base_url=args.url, timeout=60)
+        ciclo_de_vida = None
+    else:
+        os.environ["VIDA_PLUS_DATABASE_URL"] = args.bd
+        from app.database import async_engine, async_read_engine, engine, read_engine
+        from app.main import app
+
+        contador = ContadorSQL()
+        contador.instalar(engine, read_engine, async_engine, async_read_engine)
+        cliente = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            timeout=60,
+        )
+        ciclo_de_vida = app.router.lifespan_context(app)
+
+    async with cliente:
+        if ciclo_de_vida:
+            await ciclo_de_vida.__aenter__()
+        try:
+            login = await cliente.post("/auth/login", json={"email": EMAIL_ADMIN, "senha": SENHA_PADRAO})
+            login.raise_for_status()
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            ctx = {
+                "pacientes": args.pacientes,
+                "profissionais": args.profissionais,
+                "consultas": args.consultas,
+                "agora": (datetime(2025, 1, 6) + timedelta(days=30)).isoformat(),
+            }
+
+            selecionados = [c for c in CENARIOS if not args.cenarios or c.nome in args.cenarios]
+            resultados = {}
+            for cenario in selecionados:
+                # Aquecimento: popula caches e agendas antes da medição
+                await _executar_cenario(cliente, cenario, ctx, headers, args.aquecimento, 1, None, args.semente + 1)
+                resultados[cenario.nome] = await _executar_cenario(
+                    cliente, cenario, ctx, headers, args.requisicoes, args.concorrencia, contador, args.semente
+                )
+                print(cenario.nome, resultados[cenario.nome])
+        finally:
+            if ciclo_de_vida:
+                await ciclo_de_vida.__aexit__(None, None, None)
+
+    return {
+        "execucao": {
+            "data": datetime.utcnow().isoformat(),
+            "alvo": args.url or args.bd,
+            "python": platform.python_version(),
+            "requisicoes": args.requisicoes,
+            "concorrencia": args.concorrencia,
+            "semente": args.semente,
+        },
+        "cenarios": resultados,
+    }
+
+
+def comparar(base: str, atual: str) -> None:
+    """
+    Imprime a variação percentual de p50/p95/p99 e vazão entre duas execuções.
+    """
+    with open(base) as f:
+        a = json.load(f)["cenarios"]
+    with open(atual) as f:
+        b = json.load(f)["cenarios"]
+
+    for nome in sorted(set(a) & set(b)):
+        linha = [nome.ljust(28)]
+        for metrica in ("p50_ms", "p95_ms", "p99_ms", "vazao_rps"):
+            antes, depois = a[nome][metrica], b[nome][metrica]
+            variacao = (depois - antes) / antes * 100 if antes else 0.0
+            linha.append(f"{metrica}={depois:.2f} ({variacao:+.1f}%)")
+        print("  ".join(linha))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bd", default="sqlite:///./bench.db")
+    parser.add_argument("--url", help="Servidor em execução (ex.: http://localhost:8000)")
+    parser.add_argument("--saida", default="resultado_benchmark.json")
+    parser.add_argument("--requisicoes", type=int, default=500)
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--aquecimento", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--cenarios", nargs="*", help="Executa só os cenários informados")
+    # Totais usados para sortear IDs; devem bater com os do gerador
+    parser.add_argument("--pacientes", type=int, default=10_000)
+    parser.add_argument("--profissionais", type=int, default=200)
+    parser.add_argument("--consultas", type=int, default=100_000)
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "ATUAL"))
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    resultado = asyncio.run(executar(args))
+    with open(args.saida, "w") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Gerador determinístico de uma base hospitalar sintética para benchmarks.
+
+Uso:
+    python -m benchmarks.gerador --bd sqlite:///./bench.db \\
+        --unidades 20 --profissionais 400 --pacientes 50000 \\
+        --consultas 500000 --prontuarios 300000
+
+Com a mesma semente, gera sempre os mesmos dados. Todos os usuários
+usam a senha ``SENHA_PADRAO``; o administrador é ``EMAIL_ADMIN``.
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+SENHA_PADRAO = "senha123"
+EMAIL_ADMIN = "admin@bench.example.com"
+
+ESPECIALIDADES = [
+    "Cardiologia",
+    "Clínica Geral",
+    "Dermatologia",
+    "Ortopedia",
+    "Pediatria",
+    "Neurologia",
+    "Ginecologia",
+    "Psiquiatria",
+]
+TIPOS_UNIDADE = ["HOSPITAL", "CLINICA", "LABORATORIO", "HOMECARE"]
+TIPOS_REGISTRO = ["EVOLUCAO", "PRESCRICAO", "ALTA", "EXAME"]
+TERMOS_CLINICOS = [
+    "alergia", "penicilina", "hipertensão", "diabetes", "dor torácica",
+    "cefaleia", "febre", "dispneia", "retorno", "exame de sangue",
+    "raio-x", "fratura", "curativo", "antibiótico", "analgésico",
+]
+PRIMEIROS_NOMES = ["Ana", "João", "Maria", "José", "Luiza", "Pedro", "Júlia", "Lucas", "Fernanda", "Tiago"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Araújo", "Gonçalves", "Ribeiro"]
+
+# Datas fixas para que o resultado não dependa do dia da execução
+INICIO_AGENDA = datetime(2025, 1, 6, 7, 0)
+TAMANHO_LOTE = 5_000
+
+
+def _em_lotes(conn, tabela, linhas):
+    for i in range(0, len(linhas), TAMANHO_LOTE):
+        conn.execute(tabela.insert(), linhas[i:i + TAMANHO_LOTE])
+
+
+def gerar(
+    unidades: int,
+    profissionais: int,
+    pacientes: int,
+    consultas: int,
+    prontuarios: int,
+    semente: int = 42,
+) -> dict:
+    """
+    Aplica as migrações (se preciso) e insere a base sintética.
+    Deve ser chamada com ``VIDA_PLUS_DATABASE_URL`` já definido.
+    """
+    from app.core.security import get_password_hash
+    from app.database import engine
+    from app.migracoes import migrar
+    from app.models import Consulta, Paciente, Profissional, Prontuario, Unidade, User
+    from app.models.estatistica import reconstruir_estatisticas
+
+    rnd = random.Random(semente)
+    migrar(engine)
+    senha_hash = get_password_hash(SENHA_PADRAO)
+    inicio = time.perf_counter()
+
+    def nome():
+        return f"{rnd.choice(PRIMEIROS_NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+
+    with engine.begin() as conn:
+        _em_lotes(conn, Unidade.__table__, [
+            {
+                "id": i,
+                "nome": f"Unidade {i}",
+                "tipo_unidade": rnd.choice(TIPOS_UNIDADE),
+                "endereco": f"Rua {i}, {rnd.randint(1, 999)}",
+                "telefone": f"11{rnd.randint(10**7, 10**8 - 1)}",
+            }
+            for i in range(1, unidades + 1)
+        ])
+
+        usuarios = [{
+            "id": 1,
+            "nome_completo": "Administrador Benchmark",
+            "email": EMAIL_ADMIN,
+            "senha_hash": senha_hash,
+            "tipo": "ADMIN",
+        }]
+        for i in range(1, profissionais + 1):
+            usuarios.append({
+                "id": 1 + i,
+                "nome_completo": nome(),
+                "email": f"profissional{i}@bench.example.com",
+                "senha_hash": senha_hash,
+                "tipo": "PROFISSIONAL",
+            })
+        for i in range(1, pacientes + 1):
+            usuarios.append({
+                "id": 1 + profissionais + i,
+                "nome_completo": nome(),
+                "email": f"paciente{i}@bench.example.com",
+                "senha_hash": senha_hash,
+                "tipo": "PACIENTE",
+            })
+        _em_lotes(conn, User.__table__, usuarios)
+
+        _em_lotes(conn, Profissional.__table__, [
+            {
+                "id": i,
+                "usuario_id": 1 + i,
+                "cpf": f"9{i:010d}",
+                "registro_conselho": str(100000 + i),
+                "tipo_conselho": "CRM",
+                "especialidade": rnd.choice(ESPECIALIDADES),
+                "unidade_id": rnd.randint(1, unidades),
+            }
+            for i in range(1, profissionais + 1)
+        ])
+
+        _em_lotes(conn, Paciente.__table__, [
+            {
+                "id": i,
+                "usuario_id": 1 + profissionais + i,
+                "cpf": f"{i:011d}",
+                "data_nascimento": datetime(1940, 1, 1).date() + timedelta(days=rnd.randint(0, 30000)),
+                "telefone": f"11{rnd.randint(10**8, 10**9 - 1)}",
+                "endereco": f"Avenida {rnd.randint(1, 5000)}, {rnd.randint(1, 999)}",
+                "plano_saude": rnd.choice([None, "VidaPlus Ouro", "VidaPlus Prata"]),
+                "numero_carteirinha": f"VP{i:09d}",
+            }
+            for i in range(1, pacientes + 1)
+        ])
+
+        # Consultas distribuídas em horários sem sobreposição por profissional
+        unidade_de = dict(
+            conn.execute(Profissional.__table__.select().with_only_columns(
+                Profissional.__table__.c.id, Profissional.__table__.c.unidade_id,
+            )).all()
+        )
+        proximo_horario = {p: INICIO_AGENDA for p in range(1, profissionais + 1)}
+        linhas_consultas = []
+        for i in range(1, consultas + 1):
+            profissional_id = rnd.randint(1, profissionais)
+            data_hora = proximo_horario[profissional_id]
+            proximo = data_hora + timedelta(minutes=30 * rnd.randint(1, 3))
+            if proximo.hour >= 19:
+                proximo = datetime.combine(proximo.date() + timedelta(days=1), INICIO_AGENDA.time())
+            proximo_horario[profissional_id] = proximo
+            linhas_consultas.append({
+                "id": i,
+                "paciente_id": rnd.randint(1, pacientes),
+                "profissional_id": profissional_id,
+                "unidade_id": unidade_de[profissional_id],
+                "data_hora": data_hora,
+                "duracao_minutos": 30,
+                "tipo_atendimento": rnd.choice(["PRESENCIAL", "TELEMEDICINA"]),
+                "status": rnd.choices(["AGENDADA", "REALIZADA", "CANCELADA"], [5, 4, 1])[0],
+                "observacoes": rnd.choice([None, "Retorno", "Primeira consulta"]),
+            })
+        _em_lotes(conn, Consulta.__table__, linhas_consultas)
+        # Inserções via Core não passam pelos eventos que mantêm os agregados
+        reconstruir_estatisticas(conn)
+
+        _em_lotes(conn, Prontuario.__table__, [
+            {
+                "id": i,
+                "paciente_id": rnd.randint(1, pacientes),
+                "profissional_id": rnd.randint(1, profissionais),
+                "consulta_id": None,
+                "data_registro": INICIO_AGENDA + timedelta(minutes=rnd.randint(0, 60 * 24 * 365)),
+                "descricao": " ".join(rnd.choices(TERMOS_CLINICOS, k=rnd.randint(3, 12))),
+                "tipo_registro": rnd.choice(TIPOS_REGISTRO),
+            }
+            for i in range(1, prontuarios + 1)
+        ])
+
+    return {
+        "unidades": unidades,
+        "profissionais": profissionais,
+        "pacientes": pacientes,
+        "consultas": consultas,
+        "prontuarios": prontuarios,
+        "semente": semente,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bd", default="sqlite:///./bench.db", help="URL do banco a popular")
+    parser.add_argument("--unidades", type=int, default=10)
+    parser.add_argument("--profissionais", type=int, default=200)
+    parser.add_argument("--pacientes", type=int, default=10_000)
+    parser.add_argument("--consultas", type=int, default=100_000)
+    parser.add_argument("--prontuarios", type=int, default=50_000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ["VIDA_PLUS_DATABASE_URL"] = args.bd
+    resumo = gerar(
+        args.unidades,
+        args.profissionais,
+        args.pacientes,
+        args.consultas,
+        args.prontuarios,
+        args.semente,
+    )
+    print(resumo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Mede a partida a frio de um worker, em processos novos (o cache de
+módulos do Python não é reaproveitado entre execuções):
+
+- ``bibliotecas``: importação de FastAPI, SQLAlchemy e Pydantic;
+- ``app``: restante de ``import app.main`` (modelos, routers, rotas);
+- ``inicializacao``: lifespan (checagem do esquema, diretório em memória);
+- ``primeira_requisicao``: primeira resposta de cada caminho, via ASGI;
+- ``processo``: do início do subprocesso até a saída.
+
+Para referência, cada execução mede também a checagem de versão do
+esquema feita na inicialização e o ``create_all`` que rodava antes na
+importação (sobre o mesmo banco, já migrado).
+
+Uso (base criada com ``python -m benchmarks.gerador``):
+    python -m benchmarks.inicializacao --bd sqlite:///./bench.db --execucoes 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CAMINHOS = ("/health", "/pacientes/?limit=20")
+
+
+def _ms(inicio: float) -> float:
+    return round((time.perf_counter() - inicio) * 1000, 2)
+
+
+async def _medir_processo() -> dict:
+    medidas = {}
+
+    inicio = time.perf_counter()
+    import fastapi  # noqa: F401
+    import pydantic  # noqa: F401
+    import sqlalchemy  # noqa: F401
+    medidas["bibliotecas_ms"] = _ms(inicio)
+
+    inicio = time.perf_counter()
+    from app.main import app
+    medidas["app_ms"] = _ms(inicio)
+
+    inicio = time.perf_counter()
+    ciclo_de_vida = app.router.lifespan_context(app)
+    await ciclo_de_vida.__aenter__()
+    medidas["inicializacao_ms"] = _ms(inicio)
+
+    # httpx só depois das medidas de importação, para não adiantar dependências
+    import httpx
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as cliente:
+            for caminho in CAMINHOS:
+                inicio = time.perf_counter()
+                resposta = await cliente.get(caminho)
+                medidas[f"primeira_requisicao_ms {caminho}"] = _ms(inicio)
+                resposta.raise_for_status()
+                inicio = time.perf_counter()
+                await cliente.get(caminho)
+                medidas[f"segunda_requisicao_ms {caminho}"] = _ms(inicio)
+    finally:
+        await ciclo_de_vida.__aexit__(None, None, None)
+
+    from app.database import Base, engine
+    from app.migracoes import verificar_esquema
+
+    inicio = time.perf_counter()
+    verificar_esquema(engine)
+    medidas["checagem_esquema_ms"] = _ms(inicio)
+    inicio = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    medidas["create_all_legado_ms"] = _ms(inicio)
+    return medidas
+
+
+def executar(args) -> dict:
+    os.environ["VIDA_PLUS_DATABASE_URL"] = args.bd
+    from app.migracoes import migrar
+
+    # Base no esquema atual antes das medidas (as execuções só leem)
+    migrar()
+
+    execucoes = []
+    for _ in range(args.execucoes):
+        inicio = time.perf_counter()
+        saida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.inicializacao", "--bd", args.bd, "--filho"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        medidas = json.loads(saida.stdout.strip().splitlines()[-1])
+        medidas["processo_ms"] = _ms(inicio)
+        execucoes.append(medidas)
+
+    return {
+        nome: {
+            "mediana": round(statistics.median(e[nome] for e in execucoes), 2),
+            "min": min(e[nome] for e in execucoes),
+            "max": max(e[nome] for e in execucoes),
+        }
+        for nome in execucoes[0]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bd", default="sqlite:///./bench.db")
+    parser.add_argument("--execucoes", type=int, default=10)
+    parser.add_argument("--saida", help="Grava o resultado em JSON")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        os.environ["VIDA_PLUS_DATABASE_URL"] = args.bd
+        print(json.dumps(asyncio.run(_medir_processo())))
+        return
+
+    resultado = executar(args)
+    for nome, valores in resultado.items():
+        print(
+            f"{nome:<45} mediana {valores['mediana']:>8.2f} ms  "
+            f"(min {valores['min']:.2f}, max {valores['max']:.2f})"
+        )
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
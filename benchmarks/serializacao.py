@@ -0,0 +1,143 @@
+"""
+Mede o custo por linha de transformar o resultado de uma listagem no
+corpo JSON da resposta, comparando:
+
+- ``response_model``: o que o FastAPI faz com o retorno da rota —
+  ``validate_python(from_attributes=True)`` contra ``Pagina[Schema]`` e
+  ``dump_json`` (a listagem de consultas carrega entidades ORM);
+- ``response_model_legado``: a mesma validação seguida de
+  ``jsonable_encoder``/``json.dumps`` (JSONResponse, versões anteriores
+  do FastAPI);
+- ``direto``: projeção das colunas do schema, dicionários por ``zip`` e
+  orjson (app/services/serializacao.py).
+
+Cada medida inclui executar a query e ler as linhas, para que a
+hidratação das entidades ORM entre na conta.
+
+Uso (base criada com ``python -m benchmarks.gerador``):
+    python -m benchmarks.serializacao --bd sqlite:///./bench.db --linhas 500
+"""
+import argparse
+import json
+import os
+import time
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    funcao()  # aquecimento (caches de compilação do SQLAlchemy)
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        funcao()
+        melhor = min(melhor, time.process_time() - inicio)
+    return melhor
+
+
+def executar(args) -> dict:
+    os.environ["VIDA_PLUS_DATABASE_URL"] = args.bd
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    from app.database import SessionLocal
+    from app.models.consultation import Consulta
+    from app.models.patient import Paciente
+    from app.routers.consultations import CHAVES_CONSULTA
+    from app.routers.patients import _consulta_paciente_read
+    from app.schemas.consultation import ConsultaRead
+    from app.schemas.pagination import Pagina
+    from app.schemas.patient import PacienteRead
+    from app.services.pagination import ParametrosPaginacao, aplicar_cursor, montar_pagina
+    from app.services.serializacao import pagina_json, projecao
+
+    pagina = ParametrosPaginacao(limit=args.linhas, cursor=None)
+    chaves_paciente = (Paciente.id,)
+    casos = {
+        "pacientes": (
+            PacienteRead,
+            chaves_paciente,
+            aplicar_cursor(_consulta_paciente_read(), chaves_paciente, pagina),
+            aplicar_cursor(_consulta_paciente_read(), chaves_paciente, pagina),
+            False,
+        ),
+        "consultas": (
+            ConsultaRead,
+            CHAVES_CONSULTA,
+            aplicar_cursor(select(Consulta), CHAVES_CONSULTA, pagina),
+            aplicar_cursor(select(*projecao(ConsultaRead, Consulta)), CHAVES_CONSULTA, pagina),
+            True,
+        ),
+    }
+
+    resultados = {}
+    with SessionLocal() as db:
+        for nome, (schema, chaves, consulta_atual, consulta_direta, entidades) in casos.items():
+            adaptador = TypeAdapter(Pagina[schema])
+
+            def linhas_atuais():
+                resultado = db.execute(consulta_atual)
+                linhas = resultado.scalars().all() if entidades else resultado.all()
+                # Sem expunge, o identity map devolveria as entidades já carregadas
+                db.expunge_all()
+                return montar_pagina(linhas, chaves, pagina)
+
+            def response_model():
+                return adaptador.dump_json(
+                    adaptador.validate_python(linhas_atuais(), from_attributes=True)
+                )
+
+            def response_model_legado():
+                valor = adaptador.validate_python(linhas_atuais(), from_attributes=True)
+                return json.dumps(
+                    jsonable_encoder(adaptador.dump_python(valor, mode="json")),
+                    ensure_ascii=False,
+                    allow_nan=False,
+                    indent=None,
+                    separators=(",", ":"),
+                ).encode()
+
+            def direto():
+                return pagina_json(db.execute(consulta_direta), chaves, pagina, schema).body
+
+            corpo = direto()
+            if json.loads(corpo) != json.loads(response_model()):
+                raise SystemExit(f"{nome}: corpos diferentes entre os caminhos")
+            quantidade = len(json.loads(corpo)["itens"])
+            if not quantidade:
+                raise SystemExit(f"{nome}: base vazia (rode benchmarks.gerador)")
+
+            caso = {"linhas": quantidade, "bytes": len(corpo)}
+            for rotulo, funcao in (
+                ("response_model", response_model),
+                ("response_model_legado", response_model_legado),
+                ("direto", direto),
+            ):
+                caso[f"{rotulo}_us_por_linha"] = round(
+                    _medir(funcao, args.repeticoes) / quantidade * 1e6, 2
+                )
+            caso["reducao"] = round(
+                1 - caso["direto_us_por_linha"] / caso["response_model_us_por_linha"], 3
+            )
+            resultados[nome] = caso
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bd", default="sqlite:///./bench.db")
+    parser.add_argument("--linhas", type=int, default=500, help="Tamanho da página (máx. da API: 500)")
+    parser.add_argument("--repeticoes", type=int, default=30)
+    args = parser.parse_args()
+
+    for nome, caso in executar(args).items():
+        print(
+            f"{nome:<10} {caso['linhas']:>5} linhas  "
+            f"response_model {caso['response_model_us_por_linha']:>6.2f} µs/linha  "
+            f"legado {caso['response_model_legado_us_por_linha']:>6.2f}  "
+            f"direto {caso['direto_us_por_linha']:>6.2f}  "
+            f"(-{caso['reducao']:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Fixtures da suíte: um banco SQLite temporário, migrado uma vez por
+sessão, e um cliente HTTP com o ciclo de vida da aplicação. Os testes
+compartilham o banco; cada um cria os próprios registros (e-mails e CPFs
+únicos) em vez de depender de uma base vazia.
+"""
+import itertools
+import os
+import re
+import tempfile
+import time
+
+# Lidas na importação de app.core.config/app.database: precisam vir antes de app.*
+_DIRETORIO = tempfile.mkdtemp(prefix="vida_plus_testes_")
+os.environ["VIDA_PLUS_DATABASE_URL"] = f"sqlite:///{_DIRETORIO}/testes.db"
+os.environ["VIDA_PLUS_LOGS_RETENCAO_DIAS"] = "0"
+os.environ["VIDA_PLUS_LOGS_ARQUIVO_DIR"] = os.path.join(_DIRETORIO, "arquivo_logs")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import engine
+from app.main import app
+from app.migracoes import migrar
+
+SENHA = "senha-de-teste"
+
+_sequencia = itertools.count(1)
+
+
+def unico() -> int:
+    return next(_sequencia)
+
+
+def consultas_sql(resposta) -> int:
+    """
+    Número de instruções SQL da requisição, lido do Server-Timing.
+    """
+    encontrado = re.search(r'db;dur=[\d.]+;desc="(\d+) SQL"', resposta.headers["server-timing"])
+    return int(encontrado.group(1))
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    migrar(engine)
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def admin(cliente):
+    n = unico()
+    email = f"admin{n}@testes.example.com"
+    resposta = cliente.post(
+        "/auth/register",
+        json={"nome_completo": f"Admin {n}", "email": email, "senha": SENHA, "tipo": "ADMIN"},
+    )
+    assert resposta.status_code == 201, resposta.text
+    token = cliente.post("/auth/login", json={"email": email, "senha": SENHA}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def criar_unidade(cliente):
+    def criar() -> dict:
+        n = unico()
+        resposta = cliente.post(
+            "/unidades/",
+            json={"nome": f"Unidade {n}", "tipo_unidade": "CLINICA", "endereco": "Rua A", "telefone": "0000"},
+        )
+        assert resposta.status_code == 201, resposta.text
+        return resposta.json()
+
+    return criar
+
+
+@pytest.fixture
+def criar_profissional(cliente):
+    def criar(unidade_id: int) -> dict:
+        n = unico()
+        resposta = cliente.post(
+            "/profissionais/",
+            json={
+                "nome_completo": f"Profissional {n}",
+                "email": f"prof{n}@testes.example.com",
+                "cpf": f"P{n:010d}",
+                "registro_conselho": str(n),
+                "tipo_conselho": "CRM",
+                "especialidade": "Clínica geral",
+                "unidade_id": unidade_id,
+                "senha": SENHA,
+            },
+        )
+        assert resposta.status_code == 201, resposta.text
+        return resposta.json()
+
+    return criar
+
+
+@pytest.fixture
+def criar_paciente(cliente):
+    def criar() -> dict:
+        n = unico()
+        resposta = cliente.post(
+            "/pacientes/",
+            json={
+                "nome_completo": f"Paciente {n}",
+                "email": f"pac{n}@testes.example.com",
+                "cpf": f"C{n:010d}",
+                "data_nascimento": "1990-01-01",
+                "telefone": "0000",
+                "endereco": "Rua B",
+                "senha": SENHA,
+            },
+        )
+        assert resposta.status_code == 201, resposta.text
+        return resposta.json()
+
+    return criar
+
+
+@pytest.fixture
+def fuso(monkeypatch):
+    """Troca o fuso local do processo (TZ); o original volta no fim do teste."""
+    def aplicar(nome: str) -> None:
+        monkeypatch.setenv("TZ", nome)
+        time.tzset()
+
+    yield aplicar
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,147 @@
+"""
+Verificação de conflito de horário: intervalos sobrepostos já gravados
+e agendamentos feitos por outro processo (worker).
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.consultation import Consulta
+from app.services.agenda import AgendaProfissional
+
+
+def _h(hora: int, minuto: int = 0) -> datetime:
+    return datetime(2030, 1, 7, hora, minuto)
+
+
+def test_conflito_com_intervalos_sobrepostos():
+    agenda = AgendaProfissional([(_h(10), _h(11), 1), (_h(10, 15), _h(10, 30), 2)])
+
+    assert agenda.conflito(_h(10, 40), _h(10, 50)) == 1
+    assert agenda.conflito(_h(10, 20), _h(10, 25), ignorar_id=1) == 2
+    assert agenda.conflito(_h(10, 40), _h(10, 50), ignorar_id=1) is None
+    assert agenda.conflito(_h(9), _h(10)) is None
+    assert agenda.conflito(_h(11), _h(11, 30)) is None
+
+    agenda.adicionar(_h(11), _h(12), 3)
+    assert agenda.conflito(_h(11, 30), _h(11, 45)) == 3
+    agenda.remover(1)
+    assert agenda.conflito(_h(10, 40), _h(10, 50)) is None
+    assert agenda.conflito(_h(10, 20), _h(10, 25)) == 2
+
+
+def test_ocupacao_com_intervalo_anterior_sobreposto():
+    # O intervalo mais longo começa antes do vizinho e entra no expediente (7h)
+    agenda = AgendaProfissional([(_h(6), _h(9), 1), (_h(6, 30), _h(6, 45), 2)])
+    # Inclusão no mesmo dia recalcula o bitmap a partir dos intervalos
+    agenda.adicionar(_h(15), _h(15, 30), 3)
+    livres = agenda.slots_livres(_h(7), _h(10), limite=10)
+    assert livres == [(_h(9), _h(9, 30)), (_h(9, 30), _h(10))]
+
+
+@pytest.fixture
+def profissional_e_paciente(criar_unidade, criar_profissional, criar_paciente):
+    unidade = criar_unidade()
+    return unidade["id"], criar_profissional(unidade["id"])["id"], criar_paciente()["id"]
+
+
+def _agendar(cliente, admin, unidade_id, profissional_id, paciente_id, inicio: datetime):
+    return cliente.post(
+        "/consultas/",
+        json={
+            "paciente_id": paciente_id,
+            "profissional_id": profissional_id,
+            "unidade_id": unidade_id,
+            "data_hora": inicio.isoformat(),
+            "tipo_atendimento": "PRESENCIAL",
+        },
+        headers=admin,
+    )
+
+
+def test_agendamento_de_outro_worker_gera_conflito(cliente, admin, profissional_e_paciente):
+    unidade_id, profissional_id, paciente_id = profissional_e_paciente
+    # Carrega a agenda deste processo
+    assert _agendar(cliente, admin, unidade_id, profissional_id, paciente_id, _h(9)).status_code == 201
+
+    # Outro worker grava pelo ORM (incrementa profissionais.agenda_versao)
+    with SessionLocal() as db:
+        db.add(
+            Consulta(
+                paciente_id=paciente_id,
+                profissional_id=profissional_id,
+                unidade_id=unidade_id,
+                data_hora=_h(10),
+                duracao_minutos=60,
+                tipo_atendimento="PRESENCIAL",
+                status="AGENDADA",
+            )
+        )
+        db.commit()
+        outra = db.query(Consulta.id).filter(Consulta.data_hora == _h(10)).filter(
+            Consulta.profissional_id == profissional_id
+        ).scalar()
+
+    resposta = _agendar(cliente, admin, unidade_id, profissional_id, paciente_id, _h(10, 30))
+    assert resposta.status_code == 409, resposta.text
+    assert f"ID={outra}" in resposta.json()["detail"]
+    assert _agendar(cliente, admin, unidade_id, profissional_id, paciente_id, _h(11)).status_code == 201
+
+
+def test_intervalos_sobrepostos_no_banco_geram_conflito(cliente, admin, profissional_e_paciente):
+    unidade_id, profissional_id, paciente_id = profissional_e_paciente
+    # Sobreposição anterior à verificação de conflito, gravada antes da carga da agenda
+    with SessionLocal() as db:
+        for inicio, duracao in ((_h(14), 60), (_h(14, 15), 15)):
+            db.add(
+                Consulta(
+                    paciente_id=paciente_id,
+                    profissional_id=profissional_id,
+                    unidade_id=unidade_id,
+                    data_hora=inicio,
+                    duracao_minutos=duracao,
+                    tipo_atendimento="PRESENCIAL",
+                    status="AGENDADA",
+                )
+            )
+        db.commit()
+
+    resposta = _agendar(cliente, admin, unidade_id, profissional_id, paciente_id, _h(14, 40))
+    assert resposta.status_code == 409, resposta.text
+
+
+def test_arvore_confere_com_varredura_completa():
+    # Inclusões, remoções e reagendamentos aleatórios, com sobreposições,
+    # comparados a uma varredura de todos os intervalos
+    sorteio = random.Random(7)
+    agenda = AgendaProfissional([])
+    ativos: dict[int, tuple[datetime, datetime]] = {}
+    for passo in range(600):
+        consulta_id = sorteio.randrange(60)
+        if consulta_id in ativos and sorteio.random() < 0.4:
+            agenda.remover(consulta_id)
+            del ativos[consulta_id]
+        else:
+            inicio = _h(7) + timedelta(minutes=15 * sorteio.randrange(60))
+            fim = inicio + timedelta(minutes=15 * sorteio.randint(1, 8))
+            agenda.adicionar(inicio, fim, consulta_id)
+            ativos[consulta_id] = (inicio, fim)
+
+        inicio = _h(7) + timedelta(minutes=5 * sorteio.randrange(180))
+        fim = inicio + timedelta(minutes=5 * sorteio.randint(1, 12))
+        ignorar = sorteio.choice([None, *ativos])
+        candidatos = [
+            (f, i) for i, (c, f) in ativos.items() if c < fim and f > inicio and i != ignorar
+        ]
+        encontrado = agenda.conflito(inicio, fim, ignorar_id=ignorar)
+        assert encontrado == (max(candidatos)[1] if candidatos else None), passo
+
+    livres = agenda.slots_livres(_h(0), _h(23), limite=100)
+    esperados = [
+        (s, s + timedelta(minutes=30))
+        for s in (_h(7) + timedelta(minutes=30 * k) for k in range(24))
+        if not any(c < s + timedelta(minutes=30) and f > s for c, f in ativos.values())
+    ]
+    assert livres == esperados
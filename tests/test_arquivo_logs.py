@@ -0,0 +1,52 @@
+"""
+Arquivamento de logs com vários workers: cada lote é arquivado por um
+único processo, sem segmentos com registros repetidos.
+"""
+import gzip
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from app.database import engine
+from app.services import arquivo_logs
+
+
+def test_arquivadores_simultaneos_nao_duplicam(tmp_path, monkeypatch):
+    with engine.begin() as conexao:
+        for i in range(40):
+            conexao.exec_driver_sql(
+                "INSERT INTO logs_sistema (acao, detalhes, criado_em) "
+                f"VALUES ('TESTE_ARQUIVO', '{i}', '2001-01-01 00:00:{i:02d}.000000')"
+            )
+
+    acrescentar = arquivo_logs._acrescentar
+
+    def _acrescentar_lento(caminho, registros):
+        # fsync lento: o outro arquivador tenta o mesmo lote nesse intervalo
+        time.sleep(0.02)
+        acrescentar(caminho, registros)
+
+    monkeypatch.setattr(arquivo_logs, "_acrescentar", _acrescentar_lento)
+
+    arquivadores = [arquivo_logs.ArquivadorLogs(str(tmp_path), tamanho_lote=5) for _ in range(2)]
+    totais = []
+    threads = [
+        threading.Thread(target=lambda a=a: totais.append(a.arquivar(antes_de=datetime(2002, 1, 1))))
+        for a in arquivadores
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with gzip.open(arquivo_logs.caminho_segmento(tmp_path, "2001-01"), "rt", encoding="utf-8") as arquivo:
+        ids = Counter(json.loads(linha)["id"] for linha in arquivo)
+    assert len(ids) == 40
+    assert max(ids.values()) == 1
+    assert sum(totais) == 40
+    with engine.connect() as conexao:
+        assert not conexao.exec_driver_sql(
+            "SELECT COUNT(*) FROM logs_sistema WHERE criado_em < '2002-01-01'"
+        ).scalar()
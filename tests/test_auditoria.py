@@ -0,0 +1,48 @@
+"""
+registrar_log roda no event loop: não pode esperar por espaço na fila de
+auditoria nem gravar no banco na thread do loop.
+"""
+import asyncio
+import threading
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.log import LogSistema
+from app.services import logs
+
+
+def test_fila_cheia_descarta_sem_esperar():
+    gravador = logs.GravadorAuditoria(tamanho_fila=1)
+    registro = {"usuario_id": None, "acao": "TESTE", "detalhes": None}
+    assert gravador.enfileirar(registro)
+
+    inicio = time.perf_counter()
+    assert not gravador.enfileirar(registro)
+    assert time.perf_counter() - inicio < 0.01
+    assert gravador.estatisticas()["descartados"] == 1
+
+
+def test_sem_gravador_grava_fora_do_event_loop(cliente, monkeypatch):
+    # Gravador parado (scripts, shell): gravação direta, no threadpool
+    monkeypatch.setattr(logs, "gravador_auditoria", logs.GravadorAuditoria())
+    threads = []
+    gravar_direto = logs._gravar_direto
+
+    def _gravar(registro):
+        threads.append(threading.current_thread())
+        gravar_direto(registro)
+
+    monkeypatch.setattr(logs, "_gravar_direto", _gravar)
+
+    async def _registrar():
+        await logs.registrar_log("TESTE_SEM_GRAVADOR", detalhes="fora do loop")
+        return threading.current_thread()
+
+    thread_do_loop = asyncio.run(_registrar())
+    assert threads and threads[0] is not thread_do_loop
+    with SessionLocal() as db:
+        assert db.scalar(
+            select(LogSistema.detalhes).where(LogSistema.acao == "TESTE_SEM_GRAVADOR")
+        ) == "fora do loop"
@@ -0,0 +1,95 @@
+"""
+Linhas gravadas pelo default do banco (CURRENT_TIMESTAMP, sem
+microssegundos) precisam continuar paginando: a migração 9 reescreve o
+formato e os gatilhos corrigem gravações futuras pelo mesmo caminho.
+"""
+from sqlalchemy import create_engine, select
+
+from app.database import engine
+from app.migracoes import MIGRACOES, migrar
+from app.models.log import LogSistema
+from app.models.medical_record import Prontuario
+from app.services.pagination import ParametrosPaginacao, aplicar_cursor, montar_pagina
+
+LEGADO = "2024-05-01 12:00:00"
+VERSAO_NORMALIZACAO = 9
+
+
+def _paginar(conexao, consulta, chaves, descendente=False) -> list[int]:
+    ids, cursor = [], None
+    for _ in range(20):
+        pagina = ParametrosPaginacao(limit=1, cursor=cursor)
+        linhas = conexao.execute(aplicar_cursor(consulta, chaves, pagina, descendente)).all()
+        resultado = montar_pagina(linhas, chaves, pagina)
+        ids += [linha.id for linha in resultado["itens"]]
+        cursor = resultado["proximo_cursor"]
+        if cursor is None:
+            return ids
+    raise AssertionError(f"paginação não terminou: {ids}")
+
+
+def test_migracao_normaliza_datas_legadas(tmp_path):
+    motor = create_engine(f"sqlite:///{tmp_path}/legado.db")
+    # Banco na versão anterior à normalização, com linhas no formato curto
+    with motor.begin() as conexao:
+        for migracao in MIGRACOES:
+            if migracao.versao < VERSAO_NORMALIZACAO:
+                migracao.aplicar(conexao)
+        conexao.exec_driver_sql(f"PRAGMA user_version = {VERSAO_NORMALIZACAO - 1}")
+        for _ in range(4):
+            conexao.exec_driver_sql(
+                "INSERT INTO prontuarios (paciente_id, profissional_id, data_registro, descricao, tipo_registro) "
+                f"VALUES (7, 1, '{LEGADO}', 'texto', 'EVOLUCAO')"
+            )
+            conexao.exec_driver_sql(
+                f"INSERT INTO logs_sistema (acao, criado_em) VALUES ('LEGADO', '{LEGADO}')"
+            )
+        conexao.exec_driver_sql(
+            "INSERT INTO usuarios (nome_completo, email, senha_hash, tipo, criado_em) "
+            f"VALUES ('Legado', 'legado@testes.example.com', 'x', 'PACIENTE', '{LEGADO}')"
+        )
+
+    migrar(motor)
+
+    with motor.connect() as conexao:
+        datas = conexao.exec_driver_sql(
+            "SELECT data_registro FROM prontuarios UNION ALL SELECT criado_em FROM logs_sistema "
+            "UNION ALL SELECT criado_em FROM usuarios"
+        ).scalars().all()
+        assert datas == [f"{LEGADO}.000000"] * 9
+
+        chaves = (Prontuario.data_registro, Prontuario.id)
+        consulta = select(Prontuario.id, Prontuario.data_registro).where(Prontuario.paciente_id == 7)
+        assert _paginar(conexao, consulta, chaves, descendente=True) == [4, 3, 2, 1]
+
+        chaves = (LogSistema.criado_em, LogSistema.id)
+        assert _paginar(conexao, select(LogSistema.id, LogSistema.criado_em), chaves) == [1, 2, 3, 4]
+    motor.dispose()
+
+
+def test_prontuarios_legados_paginam(cliente, admin, criar_unidade, criar_profissional, criar_paciente):
+    paciente = criar_paciente()
+    profissional = criar_profissional(criar_unidade()["id"])
+    with engine.begin() as conexao:
+        for _ in range(4):
+            # Gravação pelo default do banco: o gatilho acrescenta os microssegundos
+            conexao.exec_driver_sql(
+                "INSERT INTO prontuarios (paciente_id, profissional_id, descricao, tipo_registro) "
+                f"VALUES ({paciente['id']}, {profissional['id']}, 'texto', 'EVOLUCAO')"
+            )
+        esperados = conexao.execute(
+            select(Prontuario.id)
+            .where(Prontuario.paciente_id == paciente["id"])
+            .order_by(Prontuario.data_registro.desc(), Prontuario.id.desc())
+        ).scalars().all()
+
+    vistos, cursor = [], None
+    for _ in range(10):
+        params = {"limit": 1} | ({"cursor": cursor} if cursor else {})
+        resposta = cliente.get(f"/prontuarios/paciente/{paciente['id']}", params=params, headers=admin)
+        assert resposta.status_code == 200, resposta.text
+        vistos += [item["id"] for item in resposta.json()["itens"]]
+        cursor = resposta.json()["proximo_cursor"]
+        if cursor is None:
+            break
+    assert vistos == esperados
@@ -0,0 +1,32 @@
+"""
+Diretório em memória de unidades e profissionais mantido pelas rotas de
+escrita.
+"""
+
+
+def test_excluir_unidade_remove_seus_profissionais(cliente, admin, criar_unidade, criar_profissional, criar_paciente):
+    unidade = criar_unidade()
+    profissionais = [criar_profissional(unidade["id"]) for _ in range(2)]
+    paciente = criar_paciente()
+    for p in profissionais:
+        assert cliente.get(f"/profissionais/{p['id']}").status_code == 200
+
+    assert cliente.delete(f"/unidades/{unidade['id']}").status_code == 204
+
+    assert cliente.get(f"/unidades/{unidade['id']}").status_code == 404
+    ids = {p["id"] for p in cliente.get("/profissionais/", params={"limit": 500}).json()["itens"]}
+    for p in profissionais:
+        assert cliente.get(f"/profissionais/{p['id']}").status_code == 404
+        assert p["id"] not in ids
+        resposta = cliente.post(
+            "/consultas/",
+            json={
+                "paciente_id": paciente["id"],
+                "profissional_id": p["id"],
+                "unidade_id": unidade["id"],
+                "data_hora": "2030-01-07T10:00:00",
+                "tipo_atendimento": "PRESENCIAL",
+            },
+            headers=admin,
+        )
+        assert resposta.status_code == 400, resposta.text
@@ -0,0 +1,88 @@
+"""
+Busca de disponibilidade e data_hora das consultas no horário local do
+servidor (a grade de expediente e o SQLite usam horário sem fuso).
+"""
+from datetime import datetime
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.consultation import Consulta
+
+
+@pytest.fixture
+def profissional(criar_unidade, criar_profissional):
+    unidade = criar_unidade()
+    return criar_profissional(unidade["id"])
+
+
+def _disponibilidade(cliente, admin, profissional, **params):
+    resposta = cliente.get(
+        "/agenda/disponibilidade",
+        params={
+            "especialidade": profissional["especialidade"],
+            "unidade_id": profissional["unidade_id"],
+            **params,
+        },
+        headers=admin,
+    )
+    assert resposta.status_code == 200, resposta.text
+    return [slot["inicio"] for slot in resposta.json()]
+
+
+def test_horarios_com_fuso_convertidos_para_local(cliente, admin, profissional, criar_paciente, fuso):
+    fuso("America/Sao_Paulo")  # UTC-3, sem horário de verão
+    resposta = cliente.post(
+        "/consultas/",
+        json={
+            "paciente_id": criar_paciente()["id"],
+            "profissional_id": profissional["id"],
+            "unidade_id": profissional["unidade_id"],
+            "data_hora": "2030-01-08T13:00:00+00:00",
+            "tipo_atendimento": "PRESENCIAL",
+        },
+        headers=admin,
+    )
+    assert resposta.status_code == 201, resposta.text
+    assert resposta.json()["data_hora"] == "2030-01-08T10:00:00"
+
+    livres = _disponibilidade(
+        cliente, admin, profissional, de="2030-01-08T12:00:00Z", ate="2030-01-08T14:00:00Z"
+    )
+    assert livres == ["2030-01-08T09:00:00", "2030-01-08T09:30:00", "2030-01-08T10:30:00"]
+
+
+def test_inicio_padrao_e_o_horario_local(cliente, admin, profissional, fuso):
+    # 14 horas à frente de UTC: o intervalo entre utcnow() e o horário local
+    # sempre contém horários da grade (expediente de 12 horas)
+    fuso("Pacific/Kiritimati")
+    agora = datetime.now().replace(microsecond=0)
+    livres = _disponibilidade(cliente, admin, profissional, limite=5)
+    assert livres
+    assert all(datetime.fromisoformat(inicio) >= agora for inicio in livres)
+
+
+def test_agendamento_de_outro_worker_sai_da_disponibilidade(cliente, admin, profissional, criar_paciente):
+    intervalo = {"de": "2030-01-09T07:00:00", "ate": "2030-01-09T09:00:00"}
+    # Carrega a agenda deste processo
+    assert _disponibilidade(cliente, admin, profissional, **intervalo)[0] == "2030-01-09T07:00:00"
+
+    # Outro worker grava pelo ORM (incrementa profissionais.agenda_versao)
+    with SessionLocal() as db:
+        db.add(
+            Consulta(
+                paciente_id=criar_paciente()["id"],
+                profissional_id=profissional["id"],
+                unidade_id=profissional["unidade_id"],
+                data_hora=datetime(2030, 1, 9, 7),
+                duracao_minutos=60,
+                tipo_atendimento="PRESENCIAL",
+                status="AGENDADA",
+            )
+        )
+        db.commit()
+
+    assert _disponibilidade(cliente, admin, profissional, **intervalo) == [
+        "2030-01-09T08:00:00",
+        "2030-01-09T08:30:00",
+    ]
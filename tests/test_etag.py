@@ -0,0 +1,35 @@
+"""
+ETags fortes por representação: a seleção de ``?fields=`` faz parte do
+validador, e seleções equivalentes (mesmos campos, outra ordem)
+compartilham a mesma ETag.
+"""
+
+
+def _get(cliente, admin, caminho: str, etag: str | None = None, **params):
+    cabecalhos = admin | ({"If-None-Match": etag} if etag else {})
+    return cliente.get(caminho, params=params, headers=cabecalhos)
+
+
+def test_etag_do_paciente_depende_dos_campos(cliente, admin, criar_paciente):
+    caminho = f"/pacientes/{criar_paciente()['id']}"
+    completo = _get(cliente, admin, caminho).headers["ETag"]
+    parcial = _get(cliente, admin, caminho, fields="nome_completo,email").headers["ETag"]
+
+    assert parcial != completo
+    assert _get(cliente, admin, caminho, fields="email, nome_completo").headers["ETag"] == parcial
+
+    # A ETag da representação completa não valida a parcial, e vice-versa
+    resposta = _get(cliente, admin, caminho, completo, fields="nome_completo,email")
+    assert resposta.status_code == 200
+    assert set(resposta.json()) == {"nome_completo", "email"}
+    assert _get(cliente, admin, caminho, parcial).status_code == 200
+    assert _get(cliente, admin, caminho, parcial, fields="email,nome_completo").status_code == 304
+    assert _get(cliente, admin, caminho, completo).status_code == 304
+
+
+def test_etag_da_lista_de_unidades_depende_dos_campos(cliente, admin, criar_unidade):
+    criar_unidade()
+    completo = _get(cliente, admin, "/unidades/").headers["ETag"]
+    resposta = _get(cliente, admin, "/unidades/", completo, fields="nome")
+    assert resposta.status_code == 200
+    assert resposta.headers["ETag"] != completo
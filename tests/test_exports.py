@@ -0,0 +1,71 @@
+"""
+Filtros de período das exportações: cada limite é convertido para o
+relógio da coluna filtrada (cadastro e prontuários em UTC, consultas em
+horário local) e o segundo exato do limite entra no resultado.
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from app.database import engine
+
+
+def _exportar(cliente, admin, recurso: str, formato: str = "ndjson", **params) -> list[int]:
+    resposta = cliente.get(f"/export/{recurso}", params={"formato": formato, **params}, headers=admin)
+    assert resposta.status_code == 200, resposta.text
+    if formato == "csv":
+        return [int(linha["id"]) for linha in csv.DictReader(io.StringIO(resposta.text))]
+    return [json.loads(linha)["id"] for linha in resposta.text.splitlines()]
+
+
+@pytest.fixture
+def consulta_e_prontuario(criar_unidade, criar_profissional, criar_paciente):
+    unidade = criar_unidade()
+    profissional = criar_profissional(unidade["id"])
+    paciente = criar_paciente()
+    with engine.begin() as conexao:
+        consulta = conexao.exec_driver_sql(
+            "INSERT INTO consultas (paciente_id, profissional_id, unidade_id, data_hora, tipo_atendimento, status) "
+            f"VALUES ({paciente['id']}, {profissional['id']}, {unidade['id']}, "
+            "'2031-02-03 10:00:00.000000', 'PRESENCIAL', 'AGENDADA')"
+        ).lastrowid
+        prontuario = conexao.exec_driver_sql(
+            "INSERT INTO prontuarios (paciente_id, profissional_id, data_registro, descricao, tipo_registro) "
+            f"VALUES ({paciente['id']}, {profissional['id']}, '2031-02-03 13:00:00.000000', 'texto', 'EVOLUCAO')"
+        ).lastrowid
+    return consulta, prontuario
+
+
+@pytest.mark.parametrize("formato", ["ndjson", "csv"])
+def test_pacientes_no_segundo_do_limite(cliente, admin, criar_paciente, formato):
+    paciente = criar_paciente()
+    # Cadastro gravado pelo default do banco (CURRENT_TIMESTAMP, sem microssegundos)
+    with engine.begin() as conexao:
+        conexao.exec_driver_sql(
+            f"UPDATE usuarios SET criado_em = '2019-03-04 12:00:00' WHERE id = {paciente['usuario_id']}"
+        )
+
+    for de, ate in (
+        ("2019-03-04T12:00:00", "2019-03-04T12:00:00"),
+        ("2019-03-04T09:00:00-03:00", "2019-03-04T09:00:00-03:00"),
+    ):
+        assert paciente["id"] in _exportar(cliente, admin, "pacientes", formato, de=de, ate=ate)
+    assert paciente["id"] not in _exportar(cliente, admin, "pacientes", formato, de="2019-03-04T12:00:01")
+
+
+def test_consultas_com_fuso_no_horario_local(cliente, admin, consulta_e_prontuario, fuso):
+    fuso("America/Sao_Paulo")  # UTC-3, sem horário de verão
+    consulta, _ = consulta_e_prontuario
+    assert consulta in _exportar(cliente, admin, "consultas", de="2031-02-03T10:00:00", ate="2031-02-03T10:00:00")
+    assert consulta in _exportar(cliente, admin, "consultas", de="2031-02-03T13:00:00Z", ate="2031-02-03T13:00:00Z")
+    assert consulta not in _exportar(cliente, admin, "consultas", de="2031-02-03T10:00:00Z", ate="2031-02-03T10:00:00Z")
+
+
+def test_prontuarios_com_fuso_em_utc(cliente, admin, consulta_e_prontuario, fuso):
+    fuso("America/Sao_Paulo")
+    _, prontuario = consulta_e_prontuario
+    for limite in ("2031-02-03T13:00:00", "2031-02-03T10:00:00-03:00"):
+        assert prontuario in _exportar(cliente, admin, "prontuarios", "csv", de=limite, ate=limite)
+    assert prontuario not in _exportar(cliente, admin, "prontuarios", de="2031-02-03T10:00:00", ate="2031-02-03T10:00:00")
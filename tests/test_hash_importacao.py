@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+
+
+@pytest.fixture
+def pool_de_threads(monkeypatch):
+    """Pool de threads no lugar dos processos, com vagas e limite novos."""
+    estado = {"em_execucao": 0, "maximo": 0, "lotes": 0}
+    trava = threading.Lock()
+
+    def _hash_lote(senhas):
+        with trava:
+            estado["em_execucao"] += 1
+            estado["lotes"] += 1
+            estado["maximo"] = max(estado["maximo"], estado["em_execucao"])
+        time.sleep(0.02)
+        with trava:
+            estado["em_execucao"] -= 1
+        return [f"hash:{s}" for s in senhas]
+
+    pool = ThreadPoolExecutor(max_workers=8)
+    monkeypatch.setattr(security, "_obter_hash_pool", lambda: pool)
+    monkeypatch.setattr(security, "_hash_lote", _hash_lote)
+    monkeypatch.setattr(security, "_hash_vagas", threading.BoundedSemaphore(4))
+    monkeypatch.setattr(security, "HASH_IMPORTACAO_LOTES", 2)
+    monkeypatch.setattr(security, "_importacao_vagas", None)
+    yield estado
+    pool.shutdown(wait=True)
+
+
+def test_importacoes_simultaneas_dividem_o_limite(pool_de_threads):
+    senhas = [str(i) for i in range(20)]
+
+    async def _duas_importacoes():
+        return await asyncio.gather(
+            security.get_password_hashes_async(senhas, tamanho_lote=2),
+            security.get_password_hashes_async(senhas, tamanho_lote=2),
+        )
+
+    for hashes in asyncio.run(_duas_importacoes()):
+        assert hashes == [f"hash:{s}" for s in senhas]
+    # 20 lotes no total, nunca mais que o limite compartilhado no pool
+    assert pool_de_threads["maximo"] == 2
+
+
+def test_lotes_de_importacao_ocupam_vagas_de_hash(pool_de_threads):
+    vagas_livres = []
+
+    async def _importar_e_observar():
+        importacao = asyncio.create_task(
+            security.get_password_hashes_async([str(i) for i in range(8)], tamanho_lote=1)
+        )
+        await asyncio.sleep(0.01)
+        # Com 2 lotes em execução, restam 2 das 4 vagas para logins
+        livres = 0
+        while security._hash_vagas.acquire(blocking=False):
+            livres += 1
+        vagas_livres.append(livres)
+        for _ in range(livres):
+            security._hash_vagas.release()
+        return await importacao
+
+    assert len(asyncio.run(_importar_e_observar())) == 8
+    assert vagas_livres == [2]
+
+
+def test_importacao_com_fila_cheia_responde_503(pool_de_threads):
+    for _ in range(4):
+        security._hash_vagas.acquire()
+    with pytest.raises(HTTPException) as erro:
+        asyncio.run(security.get_password_hashes_async(["a", "b"]))
+    assert erro.value.status_code == 503
+
+
+def test_semaforo_de_importacao_por_event_loop(pool_de_threads):
+    async def _vagas():
+        return security._vagas_importacao()
+
+    # Cada asyncio.run cria um loop; o semáforo não fica preso ao primeiro
+    assert asyncio.run(_vagas()) is not asyncio.run(_vagas())
+    assert len(asyncio.run(security.get_password_hashes_async(["a"] * 6, tamanho_lote=1))) == 6
+
+
+def test_falha_em_um_lote_cancela_os_pendentes(pool_de_threads, monkeypatch):
+    hash_lote = security._hash_lote
+
+    def _hash_lote(senhas):
+        if senhas == ["falha"]:
+            raise RuntimeError("falha no processo de hash")
+        return hash_lote(senhas)
+
+    monkeypatch.setattr(security, "_hash_lote", _hash_lote)
+
+    async def _importar():
+        with pytest.raises(RuntimeError):
+            await security.get_password_hashes_async(["falha"] + [str(i) for i in range(9)], tamanho_lote=1)
+        # Tempo para os lotes restantes rodarem, se não tivessem sido cancelados
+        await asyncio.sleep(0.3)
+
+    asyncio.run(_importar())
+    # Só os lotes que já estavam no pool (limite 2, mais o que ocupou a vaga
+    # liberada pelo lote com falha) chegam a ser processados, não os 9
+    assert pool_de_threads["lotes"] <= 3
@@ -0,0 +1,86 @@
+"""
+Leitura do corpo da importação em lote: o limite de linhas é conferido
+durante a leitura (NDJSON/CSV) e o de bytes pelo Content-Length, sem
+consumir o corpo inteiro de um lote grande demais.
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.services import patient_import
+
+
+def _requisicao(tipo: str, pedacos: list[bytes], content_length: int | None = None):
+    """Request com o corpo em ``pedacos``; ``lidos`` conta as partes consumidas."""
+    lidos = []
+    restantes = list(pedacos)
+
+    async def receive():
+        if not restantes:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        lidos.append(1)
+        return {"type": "http.request", "body": restantes.pop(0), "more_body": bool(restantes)}
+
+    cabecalhos = [(b"content-type", tipo.encode())]
+    if content_length is not None:
+        cabecalhos.append((b"content-length", str(content_length).encode()))
+    escopo = {"type": "http", "method": "POST", "path": "/pacientes/bulk", "headers": cabecalhos}
+    return Request(escopo, receive), lidos
+
+
+def _ler(requisicao):
+    return asyncio.run(patient_import.ler_registros(requisicao))
+
+
+@pytest.fixture
+def limite_de_tres(monkeypatch):
+    monkeypatch.setattr(patient_import, "PACIENTES_BULK_MAX_LINHAS", 3)
+
+
+def test_ndjson_acima_do_limite_para_na_leitura(limite_de_tres):
+    pedacos = [json.dumps({"n": i}).encode() + b"\n" for i in range(100)]
+    requisicao, lidos = _requisicao("application/x-ndjson", pedacos)
+    with pytest.raises(HTTPException) as erro:
+        _ler(requisicao)
+    assert erro.value.status_code == 413
+    assert len(lidos) == 4
+
+
+def test_csv_conta_registros_com_quebra_de_linha_entre_aspas(limite_de_tres):
+    cabecalho = b"nome_completo,endereco\n"
+    registros = [b'Ana,"Rua A\nBloco 2"\n', b'Bia,"Rua ""B"""\n', b"Caio,Rua C\n"]
+    requisicao, _ = _requisicao("text/csv", [cabecalho, *registros])
+    assert [r["endereco"] for r in _ler(requisicao)] == ["Rua A\nBloco 2", 'Rua "B"', "Rua C"]
+
+    requisicao, lidos = _requisicao("text/csv", [cabecalho, *registros * 10])
+    with pytest.raises(HTTPException) as erro:
+        _ler(requisicao)
+    assert erro.value.status_code == 413
+    assert len(lidos) == 5
+
+
+def test_json_recusado_pelo_content_length(monkeypatch):
+    monkeypatch.setattr(patient_import, "PACIENTES_BULK_MAX_BYTES", 1_000)
+    requisicao, lidos = _requisicao("application/json", [b"[]"], content_length=1_001)
+    with pytest.raises(HTTPException) as erro:
+        _ler(requisicao)
+    assert erro.value.status_code == 413
+    assert lidos == []
+
+    # Sem Content-Length (em partes): recusado ao passar do limite lido
+    requisicao, lidos = _requisicao("application/json", [b" " * 600] * 10)
+    with pytest.raises(HTTPException):
+        _ler(requisicao)
+    assert len(lidos) == 2
+
+
+def test_linhas_longas_e_utf8_divididos_entre_pedacos():
+    linha = json.dumps({"nome": "João " + "x" * 5_000}, ensure_ascii=False).encode()
+    # Pedaços de 7 bytes: cortam a linha e o "ã" (2 bytes) em partes
+    corpo = linha + b"\n" + linha
+    pedacos = [corpo[i:i + 7] for i in range(0, len(corpo), 7)]
+    requisicao, _ = _requisicao("application/x-ndjson", pedacos)
+    assert [r["nome"][:4] for r in _ler(requisicao)] == ["João", "João"]
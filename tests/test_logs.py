@@ -0,0 +1,61 @@
+"""
+Consulta de auditoria sobre logs gravados pelo default do banco
+(CURRENT_TIMESTAMP, sem microssegundos): nenhum registro pode sumir na
+paginação nem nos limites do período.
+"""
+import json
+
+import pytest
+
+from app.database import engine
+from tests.conftest import unico
+
+
+def _inserir_legados(acao: str, criado_em: str | None = None, quantidade: int = 4) -> list[int]:
+    valor = f"'{criado_em}'" if criado_em else "CURRENT_TIMESTAMP"
+    with engine.begin() as conexao:
+        return [
+            conexao.exec_driver_sql(
+                f"INSERT INTO logs_sistema (acao, detalhes, criado_em) VALUES ('{acao}', 'legado', {valor})"
+            ).lastrowid
+            for _ in range(quantidade)
+        ]
+
+
+def _paginar(cliente, admin, **params) -> list[int]:
+    vistos, cursor = [], None
+    for _ in range(20):
+        pedido = {"limit": 1, **params} | ({"cursor": cursor} if cursor else {})
+        resposta = cliente.get("/logs/", params=pedido, headers=admin)
+        assert resposta.status_code == 200, resposta.text
+        vistos += [item["id"] for item in resposta.json()["itens"]]
+        cursor = resposta.json()["proximo_cursor"]
+        if cursor is None:
+            return vistos
+    raise AssertionError(f"paginação não terminou: {vistos}")
+
+
+def test_paginacao_nao_perde_logs_do_mesmo_segundo(cliente, admin):
+    acao = f"LEGADO{unico()}"
+    ids = _inserir_legados(acao)
+    assert _paginar(cliente, admin, acao=acao) == ids
+
+
+@pytest.mark.parametrize("formato", ["json", "ndjson"])
+def test_limites_do_periodo_incluem_registros_legados(cliente, admin, formato):
+    acao = f"LEGADO{unico()}"
+    ids = _inserir_legados(acao, "2024-06-01 12:00:00")
+    params = {
+        "acao": acao,
+        "de": "2024-06-01T12:00:00",
+        "ate": "2024-06-01T12:00:00",
+        "formato": formato,
+        "limit": 500,
+    }
+    resposta = cliente.get("/logs/", params=params, headers=admin)
+    assert resposta.status_code == 200, resposta.text
+    if formato == "json":
+        itens = resposta.json()["itens"]
+    else:
+        itens = [json.loads(linha) for linha in resposta.text.splitlines() if linha]
+    assert [item["id"] for item in itens] == ids
@@ -0,0 +1,67 @@
+"""
+Leituras de pacientes e profissionais carregam o usuário vinculado no
+mesmo SELECT: o número de instruções SQL por requisição não depende do
+número de linhas devolvidas.
+"""
+import pytest
+
+from tests.conftest import consultas_sql
+
+N = 8
+
+
+@pytest.fixture
+def pacientes(criar_paciente):
+    return [criar_paciente() for _ in range(N)]
+
+
+@pytest.fixture
+def profissionais(criar_unidade, criar_profissional):
+    unidade = criar_unidade()
+    return [criar_profissional(unidade["id"]) for _ in range(N)]
+
+
+def _sql_listagem(cliente, caminho: str, limite: int) -> int:
+    resposta = cliente.get(caminho, params={"limit": limite})
+    assert resposta.status_code == 200, resposta.text
+    assert len(resposta.json()["itens"]) == limite
+    return consultas_sql(resposta)
+
+
+@pytest.mark.parametrize("caminho", ["/pacientes/", "/profissionais/"])
+def test_listagem_com_sql_constante(cliente, pacientes, profissionais, caminho):
+    _sql_listagem(cliente, caminho, 1)  # aquecimento (diretório em memória)
+    assert _sql_listagem(cliente, caminho, 1) == _sql_listagem(cliente, caminho, N)
+
+
+@pytest.mark.parametrize("recurso", ["pacientes", "profissionais"])
+def test_leitura_por_id_com_sql_constante(cliente, pacientes, profissionais, recurso):
+    itens = pacientes if recurso == "pacientes" else profissionais
+    contagens = set()
+    for item in itens:
+        resposta = cliente.get(f"/{recurso}/{item['id']}")
+        assert resposta.status_code == 200, resposta.text
+        assert resposta.json()["nome_completo"] == item["nome_completo"]
+        contagens.add(consultas_sql(resposta))
+    assert len(contagens) == 1
+    assert contagens.pop() <= 2
+
+
+def test_atualizacao_de_paciente_com_sql_constante(cliente, pacientes):
+    contagens = set()
+    for item in pacientes:
+        resposta = cliente.put(f"/pacientes/{item['id']}", json={"telefone": "1111"})
+        assert resposta.status_code == 200, resposta.text
+        assert resposta.json()["email"] == item["email"]
+        contagens.add(consultas_sql(resposta))
+    assert len(contagens) == 1
+
+
+def test_atualizacao_de_profissional_com_sql_constante(cliente, profissionais):
+    contagens = set()
+    for item in profissionais:
+        resposta = cliente.put(f"/profissionais/{item['id']}", json={"especialidade": "Pediatria"})
+        assert resposta.status_code == 200, resposta.text
+        assert resposta.json()["nome_completo"] == item["nome_completo"]
+        contagens.add(consultas_sql(resposta))
+    assert len(contagens) == 1
@@ -0,0 +1,79 @@
+"""
+Paginação da linha do tempo com prontuários gravados no mesmo segundo
+pelo default do banco (formato sem microssegundos, corrigido pelos
+gatilhos da migração 9).
+"""
+import pytest
+
+from app.database import engine
+
+LEGADO = "2024-05-01 12:00:00"
+
+
+@pytest.fixture
+def historico(criar_unidade, criar_profissional, criar_paciente):
+    unidade = criar_unidade()
+    profissional = criar_profissional(unidade["id"])
+    paciente = criar_paciente()
+    with engine.begin() as conexao:
+        prontuarios = []
+        for _ in range(4):
+            cursor = conexao.exec_driver_sql(
+                "INSERT INTO prontuarios (paciente_id, profissional_id, data_registro, descricao, tipo_registro) "
+                f"VALUES ({paciente['id']}, {profissional['id']}, '{LEGADO}', 'texto', 'EVOLUCAO')"
+            )
+            prontuarios.append(cursor.lastrowid)
+        consulta = conexao.exec_driver_sql(
+            "INSERT INTO consultas (paciente_id, profissional_id, unidade_id, data_hora, tipo_atendimento, status) "
+            f"VALUES ({paciente['id']}, {profissional['id']}, {unidade['id']}, '{LEGADO}.000000', 'PRESENCIAL', 'REALIZADA')"
+        ).lastrowid
+    return paciente["id"], prontuarios, consulta
+
+
+def _paginar(cliente, admin, paciente_id: int, **params) -> list[tuple[str, int]]:
+    vistos, cursor = [], None
+    for _ in range(10):
+        pedido = {"limit": 1, **params} | ({"cursor": cursor} if cursor else {})
+        resposta = cliente.get(f"/pacientes/{paciente_id}/timeline", params=pedido, headers=admin)
+        assert resposta.status_code == 200, resposta.text
+        vistos += [(item["tipo"], item["id"]) for item in resposta.json()["itens"]]
+        cursor = resposta.json()["proximo_cursor"]
+        if cursor is None:
+            return vistos
+    raise AssertionError(f"paginação não terminou: {vistos}")
+
+
+def test_timeline_de_prontuarios_legados(cliente, admin, historico):
+    paciente_id, prontuarios, _ = historico
+    vistos = _paginar(cliente, admin, paciente_id, tipo="PRONTUARIO")
+    assert vistos == [("PRONTUARIO", i) for i in sorted(prontuarios, reverse=True)]
+
+
+def test_timeline_intercalada_no_mesmo_segundo(cliente, admin, historico):
+    paciente_id, prontuarios, consulta = historico
+    # (data, tipo, id) decrescente: no mesmo instante, PRONTUARIO antes de CONSULTA
+    esperado = [("PRONTUARIO", i) for i in sorted(prontuarios, reverse=True)] + [("CONSULTA", consulta)]
+    assert _paginar(cliente, admin, paciente_id) == esperado
+
+
+def test_timeline_no_horario_local_fora_de_utc(cliente, admin, historico, fuso):
+    fuso("America/Sao_Paulo")  # UTC-3, sem horário de verão
+    paciente_id, prontuarios, consulta = historico
+    # Prontuários às 12:00 UTC = 09:00 locais; consulta às 12:00 locais e
+    # outra às 10:00 locais, entre as duas
+    with engine.begin() as conexao:
+        intermediaria = conexao.exec_driver_sql(
+            "INSERT INTO consultas (paciente_id, profissional_id, unidade_id, data_hora, tipo_atendimento, status) "
+            "SELECT paciente_id, profissional_id, unidade_id, '2024-05-01 10:00:00.000000', tipo_atendimento, status "
+            f"FROM consultas WHERE id = {consulta}"
+        ).lastrowid
+
+    esperado = [("CONSULTA", consulta), ("CONSULTA", intermediaria)] + [
+        ("PRONTUARIO", i) for i in sorted(prontuarios, reverse=True)
+    ]
+    assert _paginar(cliente, admin, paciente_id) == esperado
+
+    resposta = cliente.get(
+        f"/pacientes/{paciente_id}/timeline", params={"tipo": "PRONTUARIO", "limit": 1}, headers=admin
+    )
+    assert resposta.json()["itens"][0]["data"] == "2024-05-01T09:00:00"